@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from almacen_sentimiento import existen_sentimientos, leer_sentimientos
+
 print("=" * 70)
 print("VALIDACIÓN DE CALIDAD DE DATOS")
 print("=" * 70)
@@ -131,15 +133,15 @@ class ValidadorDatos:
         print(f"  ✓ Predicciones validadas: {len(df)} registros")
         return df
     
-    def validar_sentimientos(self, ruta='base_datos_csv/sentimientos.csv'):
+    def validar_sentimientos(self, ruta='base_datos_csv/sentimientos.npz'):
         """Valida análisis de sentimiento"""
         print("\n[4/5] Validando sentimientos...")
         
-        if not os.path.exists(ruta):
+        if not existen_sentimientos(ruta):
             self.advertencias.append(f"⚠️  Sentimientos no generados aún: {ruta}")
             return None
         
-        df = pd.read_csv(ruta)
+        df = leer_sentimientos(ruta)
         
         # Check 1: Scores en rango [-1, +1]
         if 'score_compound' in df.columns:
@@ -67,6 +67,11 @@ brent_df = pd.DataFrame({
 brent_df.to_csv('base_datos_csv/petroleo/brent.csv', index=False)
 print(f"  ✓ Tabla Brent: {len(brent_df)} registros")
 
+# Spread Brent-WTI precalculado (solo se procesan las fechas nuevas)
+from spread_petroleo import actualizar_spread
+spread_df = actualizar_spread()
+print(f"  ✓ Spread Brent-WTI: {len(spread_df)} días | régimen actual: {spread_df['regimen'].iloc[-1]}")
+
 # ========== 2. TABLA: EMPRESAS_USA ==========
 print("\n[2/5] Creando tabla EMPRESAS_USA (petroleras)...")
 
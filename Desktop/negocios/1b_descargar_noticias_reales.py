@@ -10,10 +10,6 @@ from datetime import datetime, timedelta
 import time
 import re
 
-print("=" * 70)
-print("DESCARGA DE NOTICIAS REALES SOBRE PETRÓLEO")
-print("=" * 70)
-
 # ========== FUNCIÓN 1: Google News RSS ==========
 def obtener_google_news(tema="oil prices", max_noticias=30):
     """Descarga noticias de Google News RSS"""
@@ -152,6 +148,10 @@ def filtrar_noticias_relevantes(noticias):
 # ========== EJECUCIÓN PRINCIPAL ==========
 if __name__ == "__main__":
     
+    print("=" * 70)
+    print("DESCARGA DE NOTICIAS REALES SOBRE PETRÓLEO")
+    print("=" * 70)
+    
     todas_noticias = []
     
     # Descargar de múltiples fuentes
@@ -5,7 +5,8 @@ Lee datos desde archivos CSV y genera predicciones
 
 import pandas as pd
 import matplotlib.pyplot as plt
-from prophet import Prophet
+from cache_modelos import ajustar_prophet
+from registro_pronosticos import registrar_pronostico
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -40,15 +41,17 @@ print(f"  ✓ Datos preparados: {len(df_prophet)} registros")
 # ========== 3. ENTRENAR MODELO ==========
 print("\n[3/4] Entrenando modelo Prophet...")
 
-model = Prophet(
+# Reutiliza el modelo guardado si los datos no cambiaron; con días nuevos
+# reajusta partiendo de los parámetros anteriores
+model, modo = ajustar_prophet(
+    df_prophet,
+    nombre='wti',
     daily_seasonality=True,
     weekly_seasonality=True,
     yearly_seasonality=True,
     changepoint_prior_scale=0.05
 )
-
-model.fit(df_prophet)
-print("  ✓ Modelo entrenado")
+print(f"  ✓ Modelo entrenado (modo: {modo})")
 
 # ========== 4. GENERAR PREDICCIONES ==========
 print("\n[4/4] Generando predicciones...")
@@ -62,6 +65,12 @@ predicciones_csv.columns = ['fecha', 'precio_predicho', 'limite_inferior', 'limi
 predicciones_csv.to_csv('base_datos_csv/predicciones_prophet.csv', index=False)
 print(f"  ✓ Predicciones guardadas en CSV: {len(predicciones_csv)} registros")
 
+# Registrar las fechas futuras en el historial de pronósticos (se comparan
+# con el precio real en ejecuciones posteriores)
+nuevas = registrar_pronostico(predicciones_csv, 'WTI', 'prophet_script2',
+                              df_prophet['ds'].max(), df_prophet['y'].iloc[-1])
+print(f"  ✓ Registro de pronósticos: {nuevas} nuevas filas")
+
 # ========== RESULTADOS ==========
 print("\n" + "=" * 70)
 print("RESULTADOS DE LA PREDICCIÓN")
@@ -5,173 +5,183 @@ Lee noticias_reales.csv generado por 1b_descargar_noticias_reales.py
 
 import pandas as pd
 import numpy as np
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from sentimiento_lotes import clasificar_compound
+from cache_sentimiento import puntuar_con_cache
+from almacen_sentimiento import guardar_sentimientos_compacto
+from registro_pronosticos import actualizar_registro, confianza_medida
+from tensor_pronosticos import ruta_tensor, pronostico_horizonte
 from datetime import datetime
 import os
 
-print("=" * 70)
-print("ANÁLISIS DE SENTIMIENTO - NOTICIAS REALES")
-print("=" * 70)
-
-# ========== 1. LEER NOTICIAS REALES ==========
-print("\n[1/4] Leyendo noticias reales...")
-
-# Intentar leer noticias reales, si no existe usar sintéticas
-archivo_noticias = 'base_datos_csv/noticias_reales.csv'
-
-if os.path.exists(archivo_noticias):
-    df_noticias = pd.read_csv(archivo_noticias)
-    print(f"  ✓ Noticias REALES cargadas: {len(df_noticias)} registros")
-    print(f"  Fuentes: {', '.join(df_noticias['fuente'].unique())}")
-    print(f"  Rango de fechas: {df_noticias['fecha'].min()} a {df_noticias['fecha'].max()}")
-else:
-    print(f"  ⚠️ No se encontró {archivo_noticias}")
-    print("     Ejecuta primero: python 1b_descargar_noticias_reales.py")
-    print("     Usando noticias sintéticas como fallback...")
-    
-    # Cargar noticias sintéticas
-    df_noticias = pd.read_csv('base_datos_csv/noticias.csv')
-    print(f"  ✓ Noticias sintéticas cargadas: {len(df_noticias)} registros")
-
-# ========== 2. ANÁLISIS DE SENTIMIENTO CON VADER ==========
-print("\n[2/4] Analizando sentimiento con VADER...")
-
-analyzer = SentimentIntensityAnalyzer()
-
-resultados = []
-for idx, row in df_noticias.iterrows():
-    # Usar 'titulo' si existe, sino 'texto'
-    texto = row.get('titulo', row.get('texto', ''))
-    
-    # Analizar
-    scores = analyzer.polarity_scores(texto)
-    
-    # Clasificar
-    if scores['compound'] >= 0.05:
-        clasificacion = "POSITIVO"
-    elif scores['compound'] <= -0.05:
-        clasificacion = "NEGATIVO"
+
+def main():
+    """Puntúa las noticias reales con VADER y las integra con la predicción Prophet
+
+    El pool de procesos de puntuar_textos (lotes grandes) exige que el
+    script corra solo bajo `if __name__ == "__main__":` (spawn en
+    Windows/macOS vuelve a importar este módulo en cada proceso).
+    """
+    print("=" * 70)
+    print("ANÁLISIS DE SENTIMIENTO - NOTICIAS REALES")
+    print("=" * 70)
+
+    # ========== 1. LEER NOTICIAS REALES ==========
+    print("\n[1/4] Leyendo noticias reales...")
+
+    # Intentar leer noticias reales, si no existe usar sintéticas
+    archivo_noticias = 'base_datos_csv/noticias_reales.csv'
+
+    if os.path.exists(archivo_noticias):
+        df_noticias = pd.read_csv(archivo_noticias)
+        print(f"  ✓ Noticias REALES cargadas: {len(df_noticias)} registros")
+        print(f"  Fuentes: {', '.join(df_noticias['fuente'].unique())}")
+        print(f"  Rango de fechas: {df_noticias['fecha'].min()} a {df_noticias['fecha'].max()}")
     else:
-        clasificacion = "NEUTRAL"
-    
-    resultados.append({
-        'noticia_id': row.get('noticia_id', f"NOT{idx:04d}"),
-        'fuente': row.get('fuente', 'Desconocida'),
-        'fecha': row.get('fecha', datetime.now().strftime('%Y-%m-%d')),
-        'texto': texto[:200],  # Primeros 200 caracteres
-        'link': row.get('link', ''),
+        print(f"  ⚠️ No se encontró {archivo_noticias}")
+        print("     Ejecuta primero: python 1b_descargar_noticias_reales.py")
+        print("     Usando noticias sintéticas como fallback...")
+
+        # Cargar noticias sintéticas
+        df_noticias = pd.read_csv('base_datos_csv/noticias.csv')
+        print(f"  ✓ Noticias sintéticas cargadas: {len(df_noticias)} registros")
+
+    # ========== 2. ANÁLISIS DE SENTIMIENTO CON VADER ==========
+    print("\n[2/4] Analizando sentimiento con VADER...")
+
+    # Usar 'titulo' si existe, sino 'texto'
+    columna_texto = 'titulo' if 'titulo' in df_noticias.columns else 'texto'
+    textos = df_noticias[columna_texto].fillna('').astype(str)
+
+    # Analizar todo el lote de una vez (solo se puntúan titulares nuevos)
+    scores = puntuar_con_cache(textos)
+
+    def columna_o_defecto(columna, defecto):
+        if columna in df_noticias.columns:
+            return df_noticias[columna].fillna(defecto).values
+        return defecto
+
+    df_sentimientos = pd.DataFrame({
+        'noticia_id': df_noticias['noticia_id'].values if 'noticia_id' in df_noticias.columns
+                      else [f"NOT{idx:04d}" for idx in df_noticias.index],
+        'fuente': columna_o_defecto('fuente', 'Desconocida'),
+        'fecha': columna_o_defecto('fecha', datetime.now().strftime('%Y-%m-%d')),
+        'texto': textos.str[:200].values,  # Primeros 200 caracteres
+        'link': columna_o_defecto('link', ''),
         'score_compound': scores['compound'],
         'score_positivo': scores['pos'],
         'score_neutral': scores['neu'],
         'score_negativo': scores['neg'],
-        'clasificacion': clasificacion
+        'clasificacion': clasificar_compound(scores['compound'])
     })
 
-df_sentimientos = pd.DataFrame(resultado)
-
-print(f"  ✓ {len(df_sentimientos)} noticias analizadas")
-
-# ========== 3. CALCULAR ESTADÍSTICAS ==========
-print("\n[3/4] Calculando estadísticas de sentimiento...")
-
-sentimiento_promedio = df_sentimientos['score_compound'].mean()
-distribucion = df_sentimientos['clasificacion'].value_counts()
-
-print(f"\n  Sentimiento promedio: {sentimiento_promedio:+.3f}")
-print(f"  Distribución:")
-for clasificacion, cantidad in distribucion.items():
-    porcentaje = (cantidad / len(df_sentimientos)) * 100
-    print(f"    {clasificacion}: {cantidad} ({porcentaje:.1f}%)")
-
-# ========== 4. GUARDAR RESULTADOS ==========
-print("\n[4/4] Guardando resultados...")
-
-# Guardar CSV completo
-df_sentimientos.to_csv('base_datos_csv/sentimientos_reales.csv', index=False, encoding='utf-8')
-print(f"  ✓ Guardado: base_datos_csv/sentimientos_reales.csv")
-
-# Guardar top noticias positivas/negativas
-print(f"\n  📊 Top 5 Noticias MÁS POSITIVAS:")
-top_positivas = df_sentimientos.nlargest(5, 'score_compound')
-for i, row in top_positivas.iterrows():
-    print(f"    {row['score_compound']:+.3f} | {row['texto'][:60]}...")
-
-print(f"\n  📉 Top 5 Noticias MÁS NEGATIVAS:")
-top_negativas = df_sentimientos.nsmallest(5, 'score_compound')
-for i, row in top_negativas.iterrows():
-    print(f"    {row['score_compound']:+.3f} | {row['texto'][:60]}...")
-
-# ========== 5. INTEGRAR CON PREDICCIÓN ==========
-print("\n[5/5] Integrando con predicción Prophet...")
-
-# Leer predicción si existe
-archivo_pred = 'base_datos_csv/predicciones_prophet.csv'
-
-if os.path.exists(archivo_pred):
-    df_pred = pd.read_csv(archivo_pred)
-    
-    if len(df_pred) > 0:
-        # Leer precio actual
-        df_wti = pd.read_csv('base_datos_csv/petroleo/wti.csv')
-        precio_actual = df_wti['precio_cierre'].iloc[-1]
-        
-        # Última predicción
-        ultima_pred = df_pred.iloc[-1]
-        precio_predicho = ultima_pred['precio_predicho']
-        cambio_porcentual = ((precio_predicho - precio_actual) / precio_actual) * 100
-        
-        # Aplicar fórmula de integración
-        P = (cambio_porcentual + 10) / 20  # Normalizar [-10, +10] → [0, 1]
-        V = (sentimiento_promedio + 1) / 2  # Normalizar [-1, +1] → [0, 1]
-        C = 0.87  # Confianza (calculada del modelo)
-        
-        S = 0.50 * P + 0.35 * V + 0.15 * C
-        
-        # Decidir señal
-        if S >= 0.70:
-            señal, recomendacion = "BULLISH", "COMPRA FUERTE"
-        elif S >= 0.60:
-            señal, recomendacion = "BULLISH", "COMPRAR"
-        elif S > 0.40:
-            señal, recomendacion = "NEUTRAL", "MANTENER"
-        elif S > 0.30:
-            señal, recomendacion = "BEARISH", "VENDER"
-        else:
-            señal, recomendacion = "BEARISH", "VENTA FUERTE"
-        
-        # Guardar señal de mercado
-        df_señal = pd.DataFrame([{
-            'fecha': datetime.now().strftime('%Y-%m-%d'),
-            'precio_actual': precio_actual,
-            'precio_predicho': precio_predicho,
-            'cambio_porcentual': cambio_porcentual,
-            'sentimiento_promedio': sentimiento_promedio,
-            'noticias_analizadas': len(df_sentimientos),
-            'fuentes': ', '.join(df_sentimientos['fuente'].unique()),
-            'señal': señal,
-            'recomendacion': recomendacion,
-            'score_integracion': S
-        }])
-        
-        df_señal.to_csv('base_datos_csv/señal_mercado.csv', index=False)
-        
-        print(f"\n  ✅ SEÑAL DE MERCADO INTEGRADA:")
-        print(f"     Precio actual: ${precio_actual:.2f}")
-        print(f"     Predicción: ${precio_predicho:.2f} ({cambio_porcentual:+.1f}%)")
-        print(f"     Sentimiento: {sentimiento_promedio:+.3f} (de {len(df_sentimientos)} noticias REALES)")
-        print(f"     Score final: {S:.3f}")
-        print(f"     🎯 SEÑAL: {señal} → {recomendacion}")
-
-else:
-    print(f"  ⚠️ Predicciones no encontradas, ejecuta primero: python 2_prediccion_prophet.py")
-
-# ========== RESUMEN FINAL ==========
-print("\n" + "=" * 70)
-print("✅ ANÁLISIS DE SENTIMIENTO COMPLETADO")
-print("=" * 70)
-print(f"\nArchivos generados:")
-print(f"  • base_datos_csv/sentimientos_reales.csv ({len(df_sentimientos)} análisis)")
-print(f"  • base_datos_csv/señal_mercado.csv (decisión integrada)")
-print(f"\nPróximo paso:")
-print(f"  python generar_graficas.py   (generar visualizaciones)")
-print("=" * 70)
+    print(f"  ✓ {len(df_sentimientos)} noticias analizadas")
+
+    # ========== 3. CALCULAR ESTADÍSTICAS ==========
+    print("\n[3/4] Calculando estadísticas de sentimiento...")
+
+    sentimiento_promedio = df_sentimientos['score_compound'].mean()
+    distribucion = df_sentimientos['clasificacion'].value_counts()
+
+    print(f"\n  Sentimiento promedio: {sentimiento_promedio:+.3f}")
+    print(f"  Distribución:")
+    for clasificacion, cantidad in distribucion.items():
+        porcentaje = (cantidad / len(df_sentimientos)) * 100
+        print(f"    {clasificacion}: {cantidad} ({porcentaje:.1f}%)")
+
+    # ========== 4. GUARDAR RESULTADOS ==========
+    print("\n[4/4] Guardando resultados...")
+
+    # Formato compacto (float32 + códigos categóricos + tabla de textos deduplicada);
+    # los lectores usan almacen_sentimiento.leer_sentimientos
+    guardar_sentimientos_compacto(df_sentimientos, 'base_datos_csv/sentimientos_reales.npz')
+    print(f"  ✓ Guardado: base_datos_csv/sentimientos_reales.npz (formato compacto)")
+
+    # Guardar top noticias positivas/negativas
+    print(f"\n  📊 Top 5 Noticias MÁS POSITIVAS:")
+    top_positivas = df_sentimientos.nlargest(5, 'score_compound')
+    for i, row in top_positivas.iterrows():
+        print(f"    {row['score_compound']:+.3f} | {row['texto'][:60]}...")
+
+    print(f"\n  📉 Top 5 Noticias MÁS NEGATIVAS:")
+    top_negativas = df_sentimientos.nsmallest(5, 'score_compound')
+    for i, row in top_negativas.iterrows():
+        print(f"    {row['score_compound']:+.3f} | {row['texto'][:60]}...")
+
+    # ========== 5. INTEGRAR CON PREDICCIÓN ==========
+    print("\n[5/5] Integrando con predicción Prophet...")
+
+    # Leer predicción si existe (tensor de pronósticos que mantiene el script 2)
+    archivo_pred = ruta_tensor('prophet_script2')
+
+    if os.path.exists(archivo_pred):
+        # Pronóstico a 10 días de la emisión más reciente
+        precio_predicho = pronostico_horizonte('WTI', 10, modelo='prophet_script2')
+
+        if not np.isnan(precio_predicho):
+            # Leer precio actual
+            df_wti = pd.read_csv('base_datos_csv/petroleo/wti.csv')
+            precio_actual = df_wti['precio_cierre'].iloc[-1]
+
+            cambio_porcentual = ((precio_predicho - precio_actual) / precio_actual) * 100
+
+            # Aplicar fórmula de integración
+            P = (cambio_porcentual + 10) / 20  # Normalizar [-10, +10] → [0, 1]
+            V = (sentimiento_promedio + 1) / 2  # Normalizar [-1, +1] → [0, 1]
+            # Confianza medida: 1 - MAPE de los pronósticos ya resueltos (0.87 sin historial)
+            actualizar_registro()
+            C = confianza_medida('WTI', 'prophet_script2', defecto=0.87)
+
+            S = 0.50 * P + 0.35 * V + 0.15 * C
+
+            # Decidir señal
+            if S >= 0.70:
+                señal, recomendacion = "BULLISH", "COMPRA FUERTE"
+            elif S >= 0.60:
+                señal, recomendacion = "BULLISH", "COMPRAR"
+            elif S > 0.40:
+                señal, recomendacion = "NEUTRAL", "MANTENER"
+            elif S > 0.30:
+                señal, recomendacion = "BEARISH", "VENDER"
+            else:
+                señal, recomendacion = "BEARISH", "VENTA FUERTE"
+
+            # Guardar señal de mercado
+            df_señal = pd.DataFrame([{
+                'fecha': datetime.now().strftime('%Y-%m-%d'),
+                'precio_actual': precio_actual,
+                'precio_predicho': precio_predicho,
+                'cambio_porcentual': cambio_porcentual,
+                'sentimiento_promedio': sentimiento_promedio,
+                'noticias_analizadas': len(df_sentimientos),
+                'fuentes': ', '.join(df_sentimientos['fuente'].unique()),
+                'señal': señal,
+                'recomendacion': recomendacion,
+                'score_integracion': S
+            }])
+
+            df_señal.to_csv('base_datos_csv/señal_mercado.csv', index=False)
+
+            print(f"\n  ✅ SEÑAL DE MERCADO INTEGRADA:")
+            print(f"     Precio actual: ${precio_actual:.2f}")
+            print(f"     Predicción: ${precio_predicho:.2f} ({cambio_porcentual:+.1f}%)")
+            print(f"     Sentimiento: {sentimiento_promedio:+.3f} (de {len(df_sentimientos)} noticias REALES)")
+            print(f"     Score final: {S:.3f}")
+            print(f"     🎯 SEÑAL: {señal} → {recomendacion}")
+
+    else:
+        print(f"  ⚠️ Predicciones no encontradas, ejecuta primero: python 2_prediccion_prophet.py")
+
+    # ========== RESUMEN FINAL ==========
+    print("\n" + "=" * 70)
+    print("✅ ANÁLISIS DE SENTIMIENTO COMPLETADO")
+    print("=" * 70)
+    print(f"\nArchivos generados:")
+    print(f"  • base_datos_csv/sentimientos_reales.npz ({len(df_sentimientos)} análisis)")
+    print(f"  • base_datos_csv/señal_mercado.csv (decisión integrada)")
+    print(f"\nPróximo paso:")
+    print(f"  python generar_graficas.py   (generar visualizaciones)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -119,28 +119,38 @@ print(f"\n📊 RESUMEN DE RESULTADOS:")
 
 try:
     import pandas as pd
+    from tensor_pronosticos import pronostico_horizonte
     
     # Cargar resultados
     df_wti = pd.read_csv('datos/wti_historico.csv')
-    df_prediccion = pd.read_csv('datos/predicciones_prophet.csv')
     df_sentimiento = pd.read_csv('datos/analisis_sentimiento.csv')
     df_interacciones = pd.read_csv('datos/interacciones_20M.csv', nrows=1000)  # Solo preview
     
     # Precio actual y predicción
     precio_actual = df_wti['Close'].iloc[-1]
-    precio_futuro = df_prediccion[df_prediccion['ds'] > df_wti['Date'].max()].head(1)['yhat'].values[0]
+    precio_futuro = pronostico_horizonte('WTI', 10, modelo='prophet_script2')  # 10 días (lo emitió el script 2)
     cambio_precio = ((precio_futuro - precio_actual) / precio_actual) * 100
     
     # Sentimiento
     sentimiento_promedio = df_sentimiento['compound'].mean()
     
+    # Sensibilidad medida al petróleo (beta móvil vs WTI); listas fijas si no hay datos
+    try:
+        from sensibilidad_petroleo import actualizar_sensibilidad, sensibilidad_actual, activos_por_perfil
+        perfiles = activos_por_perfil(sensibilidad_actual(actualizar_sensibilidad()))
+        pro_petroleo, anti_petroleo = perfiles['PRO-PETRÓLEO'], perfiles['ANTI-PETRÓLEO']
+    except (ValueError, KeyError, IndexError, OSError):
+        pro_petroleo, anti_petroleo = [], []
+    pro_petroleo = pro_petroleo or ['XOM', 'CVX', 'OXY', 'SLB', 'HAL']
+    anti_petroleo = anti_petroleo or ['DAL', 'UAL', 'FDX']
+    
     # Señal integrada
     if cambio_precio > 0 and sentimiento_promedio > 0.05:
         señal_final = "FUERTEMENTE BULLISH 🚀"
-        recomendacion = "COMPRAR activos petroleros (XOM, CVX, OXY, SLB, HAL)"
+        recomendacion = f"COMPRAR activos petroleros ({', '.join(pro_petroleo)})"
     elif cambio_precio < 0 and sentimiento_promedio < -0.05:
         señal_final = "FUERTEMENTE BEARISH 📉"
-        recomendacion = "VENDER petroleros, COMPRAR aerolíneas (DAL, UAL, FDX)"
+        recomendacion = f"VENDER petroleros, COMPRAR beneficiados por petróleo barato ({', '.join(anti_petroleo)})"
     elif cambio_precio > 0:
         señal_final = "BULLISH MODERADO 📈"
         recomendacion = "COMPRAR con precaución, monitorear sentimiento"
@@ -26,7 +26,7 @@ base_datos_csv/
 ├── empresas_peru/catalogo.csv← 4 empresas peruanas
 ├── petroleo/wti.csv          ← Precios históricos WTI
 ├── predicciones_prophet.csv  ← Predicciones ML
-├── sentimientos.csv          ← Análisis de noticias
+├── sentimientos.npz          ← Análisis de noticias (almacen_sentimiento)
 └── interacciones_20M.csv     ← 20M interacciones (Big Data)
 """)
 
@@ -220,10 +220,22 @@ print(f"    • Señal: {señal_mercado}")
 print(f"    • Capital: ${cliente_demo['capital_inicial']:,.2f}")
 print(f"\n  Top 5 recomendaciones:\n")
 
+# Sensibilidad al petróleo medida (si ya se calculó con sensibilidad_petroleo)
+try:
+    from sensibilidad_petroleo import cargar_sensibilidad, sensibilidad_actual
+    resultado_sensibilidad, _ = cargar_sensibilidad()
+    sensibilidad = sensibilidad_actual(resultado_sensibilidad) if resultado_sensibilidad else None
+except (ImportError, ValueError, KeyError):
+    sensibilidad = None
+
 for i, (ticker, nombre, razon, score) in enumerate(recomendaciones, 1):
     estrellas = "★" * int(score) + "☆" * (5 - int(score))
     print(f"  {i}. {ticker:.<8} {nombre:.<30} {estrellas} ({score}/5.0)")
     print(f"     └─ {razon}")
+    if sensibilidad is not None and 'beta_wti' in sensibilidad and ticker in sensibilidad.index:
+        medida = sensibilidad.loc[ticker]
+        print(f"     └─ β vs WTI medida: {medida['beta_wti']:+.2f} "
+              f"(correlación {medida['corr_wti']:+.2f}, {medida['perfil']})")
     print()
 
 # ========== 7. CÓMO AYUDA EL SISTEMA ==========
@@ -162,7 +162,7 @@ if total_exitos == total_modulos:
     print("   • base_datos_csv/petroleo/wti.csv")
     print("   • base_datos_csv/clientes.csv")
     print("   • base_datos_csv/predicciones_prophet.csv")
-    print("   • base_datos_csv/sentimientos.csv")
+    print("   • base_datos_csv/sentimientos.npz (almacen_sentimiento.leer_sentimientos)")
     print("   • base_datos_csv/señal_mercado.csv")
     print("   • base_datos_csv/recomendaciones.csv")
     print("   • base_datos_csv/interacciones_20M.csv (~400 MB)")
@@ -50,6 +50,7 @@ try:
     import matplotlib.pyplot as plt
     import seaborn as sns
     from matplotlib.patches import Rectangle
+    from almacen_sentimiento import existen_sentimientos, leer_sentimientos
     print("✓ Bibliotecas básicas OK")
 except ImportError as e:
     print(f"❌ Error: {e}")
@@ -129,27 +130,42 @@ def generar_analisis_comparativo():
     # ─────────────────────────────────────────────────────────────────────────
     print("\n[1.3] Calculando métricas de rendimiento...")
     
-    # Para calcular métricas, usamos últimos 30 días como "test"
-    # (Simulamos que no los conocíamos y los predecimos)
-    test_real = df_wti['precio_cierre'].tail(30).values
-    test_fechas = df_wti['fecha'].tail(30)
-    
-    # Naive: predecir con precio de hace 30 días
-    precio_hace_30 = df_wti['precio_cierre'].iloc[-31]
-    naive_pred = np.full(30, precio_hace_30)
-    
-    # Promedio: predecir con promedio de días 31-60
-    promedio_pred = np.full(30, df_wti['precio_cierre'].iloc[-60:-30].mean())
+    # Backtesting con origen móvil: Prophet y modelos base se evalúan sobre
+    # los mismos cortes (30 días de horizonte, cortes en caché)
+    try:
+        from backtesting import backtest, metricas_globales
+        resultados = backtest(df_wti.set_index('fecha')['precio_cierre'], nombre='wti',
+                              horizonte=30)
+        metricas = metricas_globales(resultados)
+        prophet_rmse = metricas.loc['prophet', 'rmse']
+        naive_rmse = metricas.loc['naive', 'rmse']
+        promedio_rmse = metricas.loc['promedio_movil', 'rmse']
+        print(f"  ✓ {resultados['corte'].nunique()} cortes evaluados (horizonte 30 días)")
+    except (ImportError, KeyError, ValueError, RuntimeError) as e:
+        print(f"  ⚠️ Backtesting no disponible ({e}), usando error de referencia")
+        
+        # Para calcular métricas, usamos últimos 30 días como "test"
+        # (Simulamos que no los conocíamos y los predecimos)
+        test_real = df_wti['precio_cierre'].tail(30).values
+        
+        # Naive: predecir con precio de hace 30 días
+        precio_hace_30 = df_wti['precio_cierre'].iloc[-31]
+        naive_pred = np.full(30, precio_hace_30)
+        
+        # Promedio: predecir con promedio de días 31-60
+        promedio_pred = np.full(30, df_wti['precio_cierre'].iloc[-60:-30].mean())
+        
+        prophet_rmse = 4.87  # Del entrenamiento (valor documentado)
+        naive_rmse = np.sqrt(np.mean((test_real - naive_pred)**2))
+        promedio_rmse = np.sqrt(np.mean((test_real - promedio_pred)**2))
     
-    # Prophet: para esto necesitaríamos reentrenar, usamos error típico
-    prophet_rmse = 4.87  # Del entrenamiento (valor documentado)
-    naive_rmse = np.sqrt(np.mean((test_real - naive_pred)**2))
-    promedio_rmse = np.sqrt(np.mean((test_real - promedio_pred)**2))
+    mejor_rmse = min(prophet_rmse, naive_rmse, promedio_rmse)
+    marca = lambda rmse: "  ✅ MEJOR" if rmse == mejor_rmse else ""
     
     print(f"\n  📊 RMSE (Root Mean Squared Error) - Menor es mejor:")
-    print(f"     Prophet:        ${prophet_rmse:.2f}  ✅ MEJOR")
-    print(f"     Naive:          ${naive_rmse:.2f}")
-    print(f"     Promedio Móvil: ${promedio_rmse:.2f}")
+    print(f"     Prophet:        ${prophet_rmse:.2f}{marca(prophet_rmse)}")
+    print(f"     Naive:          ${naive_rmse:.2f}{marca(naive_rmse)}")
+    print(f"     Promedio Móvil: ${promedio_rmse:.2f}{marca(promedio_rmse)}")
     
     # Mejora porcentual
     mejora_vs_naive = ((naive_rmse - prophet_rmse) / naive_rmse) * 100
@@ -245,17 +261,17 @@ def generar_analisis_sentimiento():
     print("\n[2.1] Detectando fuente de noticias...")
     
     # Intentar leer noticias REALES primero
-    archivo_real = f"{BASE_DIR}/sentimientos_reales.csv"
-    archivo_sintético = f"{BASE_DIR}/sentimientos.csv"
+    archivo_real = f"{BASE_DIR}/sentimientos_reales.npz"
+    archivo_sintético = f"{BASE_DIR}/sentimientos.npz"
     
-    if os.path.exists(archivo_real):
-        df_sent = pd.read_csv(archivo_real)
+    if existen_sentimientos(archivo_real):
+        df_sent = leer_sentimientos(archivo_real)
         tipo_noticias = "REALES"
         fuentes = df_sent['fuente'].unique() if 'fuente' in df_sent.columns else ['Sintéticas']
         print(f"  ✓ Usando noticias REALES")
         print(f"    Fuentes: {', '.join(fuentes)}")
-    elif os.path.exists(archivo_sintético):
-        df_sent = pd.read_csv(archivo_sintético)
+    elif existen_sentimientos(archivo_sintético):
+        df_sent = leer_sentimientos(archivo_sintético)
         tipo_noticias = "SINTÉTICAS"
         print(f"  ⚠️ Usando noticias SINTÉTICAS")
         print(f"    Para usar reales, ejecuta: python 1b_descargar_noticias_reales.py")
@@ -271,6 +287,7 @@ def generar_analisis_sentimiento():
     print("\n[2.2] Generando gráfica de distribución...")
     
     distribucion = df_sent['clasificacion'].value_counts()
+    distribucion = distribucion[distribucion > 0]
     
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     
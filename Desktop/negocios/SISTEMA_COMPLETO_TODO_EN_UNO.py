@@ -41,7 +41,11 @@ try:
     import numpy as np
     import yfinance as yf
     from prophet import Prophet
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    from cache_modelos import ajustar_prophet
+    from registro_pronosticos import registrar_pronostico, actualizar_registro, confianza_medida
+    from tensor_pronosticos import pronostico_horizonte
+    from sentimiento_lotes import clasificar_compound
+    from cache_sentimiento import puntuar_con_cache
     print("✓ Bibliotecas básicas importadas correctamente")
 except ImportError as e:
     print(f"❌ Error importando bibliotecas: {e}")
@@ -154,12 +158,14 @@ def modulo_2_prediccion():
     df_prophet['ds'] = pd.to_datetime(df_prophet['ds'])
     
     print("[2.3] Entrenando modelo Prophet...")
-    model = Prophet(
+    model, modo = ajustar_prophet(
+        df_prophet,
+        nombre='wti',
         daily_seasonality=True,
         weekly_seasonality=True,
         yearly_seasonality=True
     )
-    model.fit(df_prophet)
+    print(f"  ✓ Modelo listo (modo: {modo})")
     
     print("[2.4] Generando predicciones (30 días)...")
     future = model.make_future_dataframe(periods=30)
@@ -170,6 +176,8 @@ def modulo_2_prediccion():
     forecast_futuro = forecast_futuro[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
     forecast_futuro.columns = ['fecha', 'precio_predicho', 'limite_inferior', 'limite_superior']
     forecast_futuro.to_csv(f"{BASE_DIR}/predicciones_prophet.csv", index=False)
+    registrar_pronostico(forecast_futuro, 'WTI', 'prophet_todo_en_uno',
+                         df_prophet['ds'].max(), df_prophet['y'].iloc[-1])
     
     print(f"  ✓ 30 predicciones generadas")
     print(f"    Predicción 10 días: ${forecast_futuro.iloc[9]['precio_predicho']:.2f}")
@@ -223,30 +231,17 @@ def modulo_3_sentimiento():
     print(f"  ✓ {len(noticias)} noticias generadas")
     
     print("\n[3.2] Analizando con VADER...")
-    analyzer = SentimentIntensityAnalyzer()
-    
-    resultados = []
-    for _, row in df_noticias.iterrows():
-        scores = analyzer.polarity_scores(row['texto'])
-        
-        if scores['compound'] >= 0.05:
-            clasificacion = "POSITIVO"
-        elif scores['compound'] <= -0.05:
-            clasificacion = "NEGATIVO"
-        else:
-            clasificacion = "NEUTRAL"
-        
-        resultados.append({
-            'noticia_id': row['noticia_id'],
-            'texto': row['texto'],
-            'score_compound': scores['compound'],
-            'score_positivo': scores['pos'],
-            'score_neutral': scores['neu'],
-            'score_negativo': scores['neg'],
-            'clasificacion': clasificacion
-        })
-    
-    df_sentimientos = pd.DataFrame(resultados)
+    scores = puntuar_con_cache(df_noticias['texto'])
+    
+    df_sentimientos = pd.DataFrame({
+        'noticia_id': df_noticias['noticia_id'],
+        'texto': df_noticias['texto'],
+        'score_compound': scores['compound'],
+        'score_positivo': scores['pos'],
+        'score_neutral': scores['neu'],
+        'score_negativo': scores['neg'],
+        'clasificacion': clasificar_compound(scores['compound'])
+    })
     df_sentimientos.to_csv(f"{BASE_DIR}/sentimientos.csv", index=False)
     
     sentimiento_promedio = df_sentimientos['score_compound'].mean()
@@ -275,10 +270,9 @@ def modulo_4_integracion(sentimiento_promedio):
     
     print("\n[4.1] Leyendo datos...")
     df_wti = pd.read_csv(f"{BASE_DIR}/petroleo/wti.csv")
-    df_pred = pd.read_csv(f"{BASE_DIR}/predicciones_prophet.csv")
     
     precio_actual = df_wti['precio_cierre'].iloc[-1]
-    precio_predicho = df_pred['precio_predicho'].iloc[9]  # 10 días
+    precio_predicho = pronostico_horizonte('WTI', 10, modelo='prophet_todo_en_uno')  # 10 días (tensor de pronósticos)
     
     cambio_porcentual = ((precio_predicho - precio_actual) / precio_actual) * 100
     
@@ -291,7 +285,9 @@ def modulo_4_integracion(sentimiento_promedio):
     # Normalizar
     P = (cambio_porcentual + 10) / 20  # [-10, +10] → [0, 1]
     V = (sentimiento_promedio + 1) / 2  # [-1, +1] → [0, 1]
-    C = 0.87  # Confianza
+    # Confianza = 1 - MAPE de los pronósticos a 10 días ya resueltos (0.87 sin historial)
+    actualizar_registro()
+    C = confianza_medida('WTI', 'prophet_todo_en_uno', h_max=10, defecto=0.87)
     
     # Fórmula: S = α·P + β·V + γ·C
     S = 0.50 * P + 0.35 * V + 0.15 * C
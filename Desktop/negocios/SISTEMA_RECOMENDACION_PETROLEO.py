@@ -44,6 +44,15 @@ try:
     import numpy as np
     import yfinance as yf
     from prophet import Prophet
+    from cache_modelos import ajustar_prophet
+    from registro_pronosticos import registrar_pronostico
+    from pronostico_kalman import MotorKalman
+    from volatilidad import volatilidad_universo
+    from indicadores_tecnicos import calcular_indicadores
+    from indicadores_universo import señales_universo
+    from spread_petroleo import alinear_precios, calcular_spread, VENTANA_Z
+    from score_decision import calcular_score, banda, score_historico, PESO_PREDICCION, PESO_TECNICO, PESO_SENTIMIENTO
+    from configuracion_prophet import parametros_prophet, predecir_horizonte
     import matplotlib.pyplot as plt
     import matplotlib.patches as mpatches
     from matplotlib.patches import Rectangle, FancyBboxPatch
@@ -60,6 +69,8 @@ except ImportError as e:
 
 PERIODO_HISTORICO = "1y"  # Período de datos históricos (1y, 2y, 5y, 10y)
 DIAS_PREDICCION = 10      # Días a predecir hacia adelante
+MOTOR_PREDICCION = "prophet"  # 'prophet' o 'kalman' (actualización O(1) por precio nuevo)
+PERFIL_PROPHET = "completo"   # 'completo' o 'rapido' (ver configuracion_prophet)
 GRAFICAS_DIR = "graficas_recomendacion"
 
 os.makedirs(GRAFICAS_DIR, exist_ok=True)
@@ -75,6 +86,8 @@ def descargar_datos_petroleo():
     RETORNA:
         df_wti: DataFrame con precios WTI
         df_brent: DataFrame con precios Brent
+        df_spread: serie del spread Brent-WTI alineada por fecha
+                   (spread_petroleo.calcular_spread)
     """
     print("\n" + "="*80)
     print("MÓDULO 1: DESCARGA DE DATOS REALES")
@@ -104,11 +117,13 @@ def descargar_datos_petroleo():
     print(f"  ✓ Brent: {len(df_brent)} días descargados")
     print(f"    Precio actual: ${df_brent['precio'].iloc[-1]:.2f}/barril")
     
-    # Calcular spread WTI-Brent
-    spread = df_brent['precio'].iloc[-1] - df_wti['precio'].iloc[-1]
-    print(f"\n  📊 Spread Brent-WTI: ${spread:+.2f}")
+    # Spread WTI-Brent: serie completa con precios del mismo día
+    df_spread = calcular_spread(alinear_precios(df_wti, df_brent))
+    ultimo = df_spread.iloc[-1]
+    print(f"\n  📊 Spread Brent-WTI: ${ultimo['spread']:+.2f} "
+          f"(z = {ultimo['zscore']:+.2f}, régimen {ultimo['regimen']})")
     
-    return df_wti, df_brent
+    return df_wti, df_brent, df_spread
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MÓDULO 2: ANÁLISIS TÉCNICO
@@ -118,11 +133,12 @@ def calcular_indicadores_tecnicos(df):
     """
     Calcula indicadores técnicos profesionales
     
-    INDICADORES:
+    INDICADORES (indicadores_tecnicos, calculados una sola vez):
         - SMA 20 y 50 (promedios móviles simples)
         - EMA 12 y 26 (promedios móviles exponenciales)
-        - RSI (Relative Strength Index)
-        - Soportes y resistencias
+        - RSI de Wilder (Relative Strength Index)
+        - MACD, bandas de Bollinger y ATR
+        - Soportes y resistencias (mínimo/máximo móvil de 20 días)
     
     RETORNA:
         df con columnas adicionales de indicadores
@@ -134,13 +150,8 @@ def calcular_indicadores_tecnicos(df):
     
     print("\n[2.1] Calculando promedios móviles...")
     
-    # SMA (Simple Moving Average)
-    df['SMA_20'] = df['precio'].rolling(window=20).mean()
-    df['SMA_50'] = df['precio'].rolling(window=50).mean()
-    
-    # EMA (Exponential Moving Average)
-    df['EMA_12'] = df['precio'].ewm(span=12, adjust=False).mean()
-    df['EMA_26'] = df['precio'].ewm(span=26, adjust=False).mean()
+    # SMA, EMA, RSI, MACD, Bollinger, ATR y extremos móviles en un solo paso
+    df = calcular_indicadores(df)
     
     precio_actual = df['precio'].iloc[-1]
     sma20 = df['SMA_20'].iloc[-1]
@@ -163,21 +174,9 @@ def calcular_indicadores_tecnicos(df):
     
     print(f"  {tendencia_icono} Tendencia: {tendencia}")
     
-    print("\n[2.2] Calculando RSI (14 períodos)...")
-    
-    # RSI = Relative Strength Index
-    delta = df['precio'].diff()
-    ganancia = delta.where(delta > 0, 0)
-    perdida = -delta.where(delta < 0, 0)
-    
-    avg_ganancia = ganancia.rolling(window=14).mean()
-    avg_perdida = perdida.rolling(window=14).mean()
+    print("\n[2.2] Calculando RSI (14 períodos, suavizado de Wilder)...")
     
-    rs = avg_ganancia / avg_perdida
-    rsi = 100 - (100 / (1 + rs))
-    df['RSI'] = rsi
-    
-    rsi_actual = rsi.iloc[-1]
+    rsi_actual = df['RSI'].iloc[-1]
     print(f"  RSI actual: {rsi_actual:.1f}")
     
     if rsi_actual > 70:
@@ -194,10 +193,9 @@ def calcular_indicadores_tecnicos(df):
     
     print("\n[2.3] Identificando soportes y resistencias...")
     
-    # Soporte: mínimo de últimos 20 días
-    # Resistencia: máximo de últimos 20 días
-    soporte = df['minimo'].tail(20).min()
-    resistencia = df['maximo'].tail(20).max()
+    # Soporte: mínimo móvil de 20 días; Resistencia: máximo móvil de 20 días
+    soporte = df['SOPORTE'].iloc[-1]
+    resistencia = df['RESISTENCIA'].iloc[-1]
     
     print(f"  Soporte cercano: ${soporte:.2f}")
     print(f"  Resistencia cercana: ${resistencia:.2f}")
@@ -226,13 +224,14 @@ def calcular_indicadores_tecnicos(df):
 # MÓDULO 3: PREDICCIÓN CON PROPHET
 # ══════════════════════════════════════════════════════════════════════════════
 
-def generar_prediccion(df, dias=10):
+def generar_prediccion(df, dias=10, perfil='completo'):
     """
     Genera predicción de precios con Prophet
     
     ENTRADA:
         df: DataFrame con columnas 'fecha' y 'precio'
         dias: número de días a predecir
+        perfil: 'completo' o 'rapido' (ver configuracion_prophet)
     
     RETORNA:
         forecast: DataFrame con predicciones
@@ -257,25 +256,19 @@ def generar_prediccion(df, dias=10):
     
     print(f"\n[3.2] Entrenando modelo Prophet...")
     
-    # Crear y entrenar modelo
-    model = Prophet(
-        daily_seasonality=True,
-        weekly_seasonality=True,
-        yearly_seasonality=True,
-        changepoint_prior_scale=0.05  # sensibilidad a cambios de tendencia
+    # Crear y entrenar modelo (reutiliza el ajuste guardado si los datos no cambiaron)
+    model, modo = ajustar_prophet(
+        df_prophet,
+        nombre='wti',
+        **parametros_prophet(df_prophet['ds'], perfil, ticker='WTI')
     )
-    model.fit(df_prophet)
     
-    print(f"  ✓ Modelo entrenado")
+    print(f"  ✓ Modelo entrenado (modo: {modo})")
     
     print(f"\n[3.3] Generando predicción ({dias} días)...")
     
-    # Crear fechas futuras
-    future = model.make_future_dataframe(periods=dias)
-    forecast = model.predict(future)
-    
-    # Extraer solo predicciones futuras
-    forecast_futuro = forecast[forecast['ds'] > df_prophet['ds'].max()].copy()
+    # Predecir solo las fechas futuras
+    forecast_futuro = predecir_horizonte(model, dias)
     forecast_futuro = forecast_futuro[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
     forecast_futuro.columns = ['fecha', 'prediccion', 'limite_inf', 'limite_sup']
     
@@ -287,6 +280,10 @@ def generar_prediccion(df, dias=10):
     print(f"  Predicción {dias} días: ${precio_predicho:.2f}")
     print(f"  Cambio esperado: {cambio:+.2f}%")
     
+    # Registrar el pronóstico para medir su precisión cuando lleguen los precios reales
+    registrar_pronostico(forecast_futuro, 'WTI', f'prophet_sistema_{perfil}',
+                         df_prophet['ds'].max(), precio_actual)
+    
     # Calcular confianza basada en ancho del intervalo
     intervalo_avg = (forecast_futuro['limite_sup'] - forecast_futuro['limite_inf']).mean()
     confianza = max(0, min(100, 100 - (intervalo_avg / precio_actual) * 100))
@@ -301,6 +298,62 @@ def generar_prediccion(df, dias=10):
     
     return forecast_futuro, metricas
 
+
+def generar_prediccion_kalman(df, dias=10, ticker='WTI'):
+    """
+    Predicción con filtro de Kalman de tendencia local (pronostico_kalman)
+    
+    El estado del ticker se retoma del punto de control: solo se procesan
+    los precios posteriores a la última ejecución, sin reajustar el modelo.
+    
+    ENTRADA:
+        df: DataFrame con columnas 'fecha' y 'precio'
+        dias: número de días calendario a predecir (como generar_prediccion)
+    
+    RETORNA:
+        forecast: DataFrame con predicciones (mismo formato que generar_prediccion)
+        metricas: dict con cambio porcentual, precio predicho y confianza
+    """
+    print("\n" + "="*80)
+    print("MÓDULO 3: PREDICCIÓN CON FILTRO DE KALMAN")
+    print("="*80)
+    
+    fechas = pd.to_datetime(df['fecha'])
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_localize(None)
+    serie = pd.Series(df['precio'].to_numpy(), index=fechas)
+    
+    motor = MotorKalman.cargar()
+    nuevos = motor.ingerir_serie(ticker, serie)
+    motor.guardar()
+    print(f"  ✓ Estado actualizado con {nuevos} precios nuevos")
+    
+    forecast_futuro = motor.pronosticar(ticker, dias)
+    
+    precio_actual = df['precio'].iloc[-1]
+    precio_predicho = forecast_futuro['prediccion'].iloc[-1]
+    cambio = ((precio_predicho - precio_actual) / precio_actual) * 100
+    
+    print(f"  Precio actual: ${precio_actual:.2f}")
+    print(f"  Predicción {dias} días: ${precio_predicho:.2f}")
+    print(f"  Cambio esperado: {cambio:+.2f}%")
+    
+    registrar_pronostico(forecast_futuro, ticker, 'kalman', fechas.max(), precio_actual)
+    
+    # Misma confianza que generar_prediccion (ancho relativo del intervalo)
+    intervalo_avg = (forecast_futuro['limite_sup'] - forecast_futuro['limite_inf']).mean()
+    confianza = max(0, min(100, 100 - (intervalo_avg / precio_actual) * 100))
+    
+    print(f"  Confianza del modelo: {confianza:.0f}%")
+    
+    metricas = {
+        'cambio_porcentual': cambio,
+        'precio_predicho': precio_predicho,
+        'confianza': confianza
+    }
+    
+    return forecast_futuro, metricas
+
 # ══════════════════════════════════════════════════════════════════════════════
 # MÓDULO 4: ANÁLISIS DE SENTIMIENTO PROFESIONAL (HISTÓRICO Y PERSISTENTE)
 # ══════════════════════════════════════════════════════════════════════════════
@@ -484,34 +537,46 @@ def analizar_sentimiento_mercado(df_wti):
         print("  ⚠️ Sin noticias para analizar.")
         return 0.0, [], None
 
-    # 2. Análisis VADER
+    # 2. Análisis VADER (solo noticias aún no incorporadas a los agregados diarios)
     print("\n[4.2] Calculando sentimiento (VADER)...")
+    from agregados_sentimiento import (seleccionar_nuevas, incorporar_noticias, cargar_agregados,
+                                       cargar_serie_diaria, serie_diaria, agregar_ventana_movil,
+                                       sentimiento_ventana)
+
+    df_nuevas = seleccionar_nuevas(df_noticias)
+    recientes = df_noticias.head(10).copy()  # Las más recientes ya que ordenamos por fecha desc
+
     try:
-        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-        analyzer = SentimentIntensityAnalyzer()
-        
-        # Calcular score si no existe o recalcular
-        if 'score' not in df_noticias.columns:
-            df_noticias['score'] = df_noticias['titulo'].apply(lambda x: analyzer.polarity_scores(str(x))['compound'])
-        
-        # Aplicar peso de la fuente
-        df_noticias['score_ponderado'] = df_noticias['score'] * df_noticias['peso']
-        
+        from cache_sentimiento import puntuar_con_cache
+
+        # Calcular score si no existe (el caché solo puntúa titulares nuevos)
+        for df in (df_nuevas, recientes):
+            if 'score' not in df.columns:
+                df['score'] = puntuar_con_cache(df['titulo'])['compound']
+
+        # 3. Agregados diarios materializados: solo cambian los días con noticias nuevas
+        df_agg = incorporar_noticias(df_nuevas)
+        print(f"  ✓ Noticias nuevas incorporadas: {len(df_nuevas)}")
+
+        # Estimador online (EWMA): estado O(1) por fuente, solo recibe las nuevas
+        from sentimiento_ewma import EstimadorSentimientoEWMA
+        estimador = EstimadorSentimientoEWMA.cargar()
+        estimador.actualizar_lote(df_nuevas)
+        estimador.guardar()
+        print(f"  ✓ Sentimiento EWMA (vida media {estimador.vida_media_dias:g} días): {estimador.valor():+.4f}")
+
     except ImportError:
         print("  ⚠️ vaderSentiment no instalado. Usando scores neutros.")
-        df_noticias['score'] = 0.0
-        df_noticias['score_ponderado'] = 0.0
+        recientes['score'] = 0.0
+        df_agg = cargar_agregados()
 
-    # 3. Agrupación diaria y Rolling Window
-    df_diario = df_noticias.groupby('fecha')['score_ponderado'].mean().reset_index()
-    df_diario = df_diario.sort_values('fecha')
-    df_diario['rolling_7d'] = df_diario['score_ponderado'].rolling(window=7, min_periods=1).mean()
-    
-    # Sentimiento actual (último rolling 7d o promedio de hoy)
-    if not df_diario.empty:
-        sentimiento_score = df_diario['rolling_7d'].iloc[-1]
-    else:
-        sentimiento_score = 0.0
+    # Rolling Window materializada: incorporar_noticias solo recalcula los días tocados
+    df_diario = cargar_serie_diaria()
+    if df_diario is None:
+        df_diario = agregar_ventana_movil(serie_diaria(df_agg), ventana=7)
+
+    # Sentimiento actual (promedio de los últimos 7 días con noticias)
+    sentimiento_score = sentimiento_ventana(df_diario, ventana=7)
 
     print(f"  ✓ Sentimiento Actual (Rolling 7d): {sentimiento_score:+.4f}")
     print(f"  ✓ Noticias en base: {len(df_noticias)}")
@@ -538,10 +603,22 @@ def analizar_sentimiento_mercado(df_wti):
         print("  ⚠️ Insuficientes datos coincidentes para correlación.")
         correlacion = 0.0
 
+    # Estructura adelanto/rezago: grilla de rezagos −10…+10 días (con caché)
+    try:
+        from correlacion_rezagos import escanear_correlaciones, mejor_rezago
+        precios = df_wti.drop_duplicates('fecha', keep='last').set_index('fecha')[['precio']]
+        resultado = escanear_correlaciones(precios.rename(columns={'precio': 'WTI'}),
+                                           df_diario.set_index('fecha')['rolling_7d'], ventanas=(30,))
+        mejor = mejor_rezago(resultado)
+        if not mejor.empty:
+            r = mejor.iloc[0]
+            print(f"  📊 Rezago con mayor correlación (ventana 30): {int(r['rezago']):+d} días "
+                  f"→ {r['correlacion']:+.2f}")
+    except Exception as e:
+        print(f"  ⚠️ No se pudo calcular correlación con rezagos: {e}")
+
     # Top noticias para mostrar
     noticias_relevantes = []
-    # Convertir a lista de dicts
-    recientes = df_noticias.head(10) # Las más recientes ya que ordenamos por fecha desc
     
     # Top positiva y negativa de las recientes
     top_pos = recientes.nlargest(1, 'score')
@@ -566,7 +643,7 @@ def analizar_sentimiento_mercado(df_wti):
 # MÓDULO 5: MOTOR DE RECOMENDACIÓN INTELIGENTE
 # ══════════════════════════════════════════════════════════════════════════════
 
-def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score):
+def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score, volatilidad=None):
     """
     Motor principal que integra todas las señales y genera recomendación final
     
@@ -580,6 +657,11 @@ def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score
         Score ≤ 0.45  → VENDER
         Score ≤ 0.35  → VENDER FUERTE
     
+    RIESGO:
+        Con `volatilidad` (fila de volatilidad.volatilidad_universo) el nivel
+        de riesgo y el tamaño de posición salen de la volatilidad GARCH
+        medida; sin ella se usa el nivel fijo asociado a cada banda de score.
+    
     RETORNA:
         recomendacion: dict con decisión final y razones
     """
@@ -590,81 +672,33 @@ def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score
     print("\n[5.1] Integrando señales...")
     
     # ─────────────────────────────────────────────────────────────────────────
-    # NORMALIZAR SEÑALES A [0, 1]
+    # NORMALIZAR SEÑALES A [0, 1] E INTEGRAR (misma fórmula que score_historico)
     # ─────────────────────────────────────────────────────────────────────────
     
-    # 1. Señal de PREDICCIÓN
     cambio = metricas_prediccion['cambio_porcentual']
-    # Normalizar cambio esperado: -10% → 0, +10% → 1
-    pred_norm = (cambio + 10) / 20
-    pred_norm = max(0, min(1, pred_norm))  # clip a [0, 1]
-    
-    # 2. Señal TÉCNICA
-    # Combinar tendencia + RSI
-    if señal_tecnica['tendencia'] == "ALCISTA":
-        tecnico_tendencia = 0.7
-    elif señal_tecnica['tendencia'] == "BAJISTA":
-        tecnico_tendencia = 0.3
-    else:
-        tecnico_tendencia = 0.5
-    
-    # RSI: normalizar [0, 100] → [0, 1]
-    tecnico_rsi = señal_tecnica['rsi'] / 100
-    
-    # Combinar (50% tendencia, 50% RSI)
-    tecnico_norm = 0.5 * tecnico_tendencia + 0.5 * tecnico_rsi
+    componentes = calcular_score(cambio, señal_tecnica['tendencia'], señal_tecnica['rsi'], sentimiento_score)
     
-    # 3. Señal de SENTIMIENTO
-    # Convertir [-1, +1] → [0, 1]
-    sent_norm = (sentimiento_score + 1) / 2
+    print(f"  Predicción normalizada: {float(componentes['pred_norm']):.2f}")
+    print(f"  Técnico normalizado: {float(componentes['tecnico_norm']):.2f}")
+    print(f"  Sentimiento normalizado: {float(componentes['sent_norm']):.2f}")
     
-    print(f"  Predicción normalizada: {pred_norm:.2f}")
-    print(f"  Técnico normalizado: {tecnico_norm:.2f}")
-    print(f"  Sentimiento normalizado: {sent_norm:.2f}")
+    score_final = float(componentes['score'])
+    print(f"\n[5.2] Score final integrado: {score_final:.3f} "
+          f"({PESO_PREDICCION:.2f}·pred + {PESO_TECNICO:.2f}·téc + {PESO_SENTIMIENTO:.2f}·sent)")
     
     # ─────────────────────────────────────────────────────────────────────────
-    # FÓRMULA DE INTEGRACIÓN
+    # DECISIÓN FINAL (bandas de score_decision)
     # ─────────────────────────────────────────────────────────────────────────
     
-    PESO_PREDICCION = 0.40
-    PESO_TECNICO = 0.30
-    PESO_SENTIMIENTO = 0.30
-    
-    score_final = (PESO_PREDICCION * pred_norm + 
-                   PESO_TECNICO * tecnico_norm + 
-                   PESO_SENTIMIENTO * sent_norm)
-    
-    print(f"\n[5.2] Score final integrado: {score_final:.3f}")
+    decision = banda(score_final)
+    accion, accion_icono = decision['accion'], decision['accion_icono']
+    riesgo, color_riesgo = decision['riesgo'], decision['color_riesgo']
     
-    # ─────────────────────────────────────────────────────────────────────────
-    # DECISIÓN FINAL
-    # ─────────────────────────────────────────────────────────────────────────
-    
-    if score_final >= 0.65:
-        accion = "COMPRAR FUERTE"
-        accion_icono = "🟢🟢"
-        riesgo = "MEDIO-ALTO"
-        color_riesgo = "yellow"
-    elif score_final >= 0.55:
-        accion = "COMPRAR"
-        accion_icono = "🟢"
-        riesgo = "MEDIO"
-        color_riesgo = "green"
-    elif score_final > 0.45:
-        accion = "MANTENER"
-        accion_icono = "🟡"
-        riesgo = "BAJO"
-        color_riesgo = "blue"
-    elif score_final > 0.35:
-        accion = "VENDER"
-        accion_icono = "🔴"
-        riesgo = "MEDIO"
-        color_riesgo = "orange"
-    else:
-        accion = "VENDER FUERTE"
-        accion_icono = "🔴🔴"
-        riesgo = "ALTO"
-        color_riesgo = "red"
+    tamano_posicion = None
+    if volatilidad is not None:
+        riesgo = volatilidad['riesgo']
+        color_riesgo = volatilidad['color_riesgo']
+        tamano_posicion = float(volatilidad['tamano_posicion'])
     
     # ─────────────────────────────────────────────────────────────────────────
     # RAZONES DETALLADAS
@@ -700,6 +734,11 @@ def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score
     # Razón 5: Confianza del modelo
     razones.append(f"ℹ️ Confianza del modelo: {metricas_prediccion['confianza']:.0f}%")
     
+    # Razón 6: Volatilidad medida
+    if volatilidad is not None:
+        razones.append(f"ℹ️ Volatilidad anual {volatilidad['vol_anual']:.0%} → "
+                       f"posición sugerida {tamano_posicion:.0%} del capital")
+    
     recomendacion = {
         'accion': accion,
         'accion_icono': accion_icono,
@@ -707,7 +746,8 @@ def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score
         'riesgo': riesgo,
         'color_riesgo': color_riesgo,
         'razones': razones,
-        'confianza': metricas_prediccion['confianza']
+        'confianza': metricas_prediccion['confianza'],
+        'tamano_posicion': tamano_posicion
     }
     
     return recomendacion
@@ -716,7 +756,8 @@ def generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score
 # MÓDULO 6: VISUALIZACIÓN DE RESULTADOS
 # ══════════════════════════════════════════════════════════════════════════════
 
-def generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion, noticias, df_sentimiento_diario=None):
+def generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion, noticias, df_sentimiento_diario=None,
+                      df_spread=None):
     """
     Genera dashboard visual con todos los componentes, incluyendo correlación precio-sentimiento.
     """
@@ -747,8 +788,12 @@ def generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion,
     ax2 = plt.subplot(3, 2, 2)
     ax2.plot(df_wti['fecha'], df_wti['precio'], '-', color='#3498db', linewidth=2, label='WTI')
     ax2.plot(df_brent['fecha'], df_brent['precio'], '-', color='#e67e22', linewidth=2, label='Brent')
-    spread = df_brent['precio'].iloc[-1] - df_wti['precio'].iloc[-1]
-    ax2.text(0.02, 0.95, f'Spread: ${spread:+.2f}', transform=ax2.transAxes, fontsize=9, fontweight='bold', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+    if df_spread is not None and len(df_spread):
+        ultimo = df_spread.iloc[-1]
+        texto_spread = f"Spread: ${ultimo['spread']:+.2f} (z {ultimo['zscore']:+.1f}, {ultimo['regimen']})"
+    else:
+        texto_spread = f"Spread: ${df_brent['precio'].iloc[-1] - df_wti['precio'].iloc[-1]:+.2f}"
+    ax2.text(0.02, 0.95, texto_spread, transform=ax2.transAxes, fontsize=9, fontweight='bold', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
     ax2.set_title('WTI vs Brent', fontsize=11, fontweight='bold')
     ax2.legend(loc='best', fontsize=8)
     ax2.grid(True, alpha=0.3)
@@ -825,12 +870,14 @@ def generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion,
     print(f"  ✓ Dashboard guardado: {ruta}")
     plt.close()
 
-def generar_graficos_adicionales(df_wti, df_sentimiento_diario):
+def generar_graficos_adicionales(df_wti, df_sentimiento_diario, modelo_prediccion, forecast, recomendacion):
     """
     Genera los 3 gráficos adicionales solicitados por el usuario.
     1. Sentimiento vs Precio (Detallado)
     2. Heatmap de Sentimiento
-    3. Señal del Sistema en el tiempo
+    3. Señal del Sistema en el tiempo (pronósticos de `modelo_prediccion`
+       en el tensor de pronósticos, al mismo horizonte que la última fila de
+       `forecast`; el último día se compara con el score de `recomendacion`)
     """
     print("\n[6.2] Generando gráficos avanzados adicionales...")
     
@@ -903,14 +950,28 @@ def generar_graficos_adicionales(df_wti, df_sentimiento_diario):
     # ─────────────────────────────────────────────────────────────────────────
     # 3. SEÑAL DEL SISTEMA A TRAVÉS DEL TIEMPO (RECONSTRUCCIÓN)
     # ─────────────────────────────────────────────────────────────────────────
-    # Reconstruimos un "Score Histórico" aproximado
-    # Score = 0.5 * Tecnico + 0.5 * Sentimiento (Ignoramos predicción histórica por complejidad)
-    
-    df_merge['rsi_norm'] = df_merge['RSI'] / 100
-    df_merge['sent_norm'] = (df_merge['rolling_7d'] + 1) / 2
+    # Score completo (0.40 predicción + 0.30 técnico + 0.30 sentimiento) para
+    # todas las fechas en una llamada; la predicción de cada día es la que se
+    # emitió ese día con el motor en uso (tensor de pronósticos). Los días
+    # sin pronóstico cuentan la predicción como neutral y se marcan aparte
+    
+    # Mismo paso que generar_recomendacion: la última fila del pronóstico
+    ultima_fecha = pd.Timestamp(df_wti['fecha'].max()).normalize()
+    dias = (pd.Timestamp(forecast['fecha'].iloc[-1]).normalize() - ultima_fecha).days
+    df_score = score_historico(df_wti, df_sentimiento_diario.set_index('fecha')['rolling_7d'],
+                               dias=dias, modelo=modelo_prediccion)
+    
+    # El último día reconstruido debe ser la recomendación de hoy
+    score_ultimo = df_score['score'].iloc[-1]
+    if np.isclose(score_ultimo, recomendacion['score']):
+        print(f"  ✓ Último día del historial = score de hoy ({recomendacion['score']:.3f})")
+    else:
+        print(f"  ⚠️ Último día del historial ({score_ultimo:.3f}) ≠ score de hoy "
+              f"({recomendacion['score']:.3f}): el registro conserva el primer pronóstico "
+              f"del día o hay sentimiento posterior al último cierre")
     
-    # Score aproximado histórico
-    df_merge['score_hist'] = 0.5 * df_merge['rsi_norm'] + 0.5 * df_merge['sent_norm']
+    df_score = df_score[df_score['fecha'] >= df_merge['fecha'].min()].dropna(subset=['score'])
+    con_prediccion = df_score['con_prediccion'].to_numpy()
     
     plt.figure(figsize=(12, 6))
     
@@ -921,8 +982,13 @@ def generar_graficos_adicionales(df_wti, df_sentimiento_diario):
     plt.axhspan(0.35, 0.45, color='orange', alpha=0.1, label='Zona Venta')
     plt.axhspan(0.0, 0.35, color='red', alpha=0.1, label='Zona Venta Fuerte')
     
-    plt.plot(df_merge['fecha'], df_merge['score_hist'], color='purple', linewidth=2, label='Score del Sistema')
-    plt.scatter(df_merge['fecha'], df_merge['score_hist'], c=df_merge['score_hist'], cmap='RdYlGn', zorder=5)
+    plt.plot(df_score['fecha'], df_score['score'], color='purple', linewidth=2, label='Score del Sistema')
+    plt.scatter(df_score['fecha'][con_prediccion], df_score['score'][con_prediccion],
+                c=df_score['score'][con_prediccion], cmap='RdYlGn', vmin=0, vmax=1, zorder=5)
+    if not con_prediccion.all():
+        plt.scatter(df_score['fecha'][~con_prediccion], df_score['score'][~con_prediccion],
+                    facecolors='none', edgecolors='gray', zorder=5,
+                    label=f'Sin pronóstico {modelo_prediccion} (predicción neutral)')
     
     plt.title('Evolución Histórica de la Señal del Sistema', fontsize=14, fontweight='bold')
     plt.ylabel('Score Integrado (0-1)')
@@ -931,16 +997,23 @@ def generar_graficos_adicionales(df_wti, df_sentimiento_diario):
     
     ruta3 = f"{GRAFICAS_DIR}/3_senal_sistema_historica.png"
     plt.savefig(ruta3, dpi=300)
-    print(f"  ✓ Gráfico 3 guardado: {ruta3}")
+    print(f"  ✓ Gráfico 3 guardado: {ruta3} "
+          f"({con_prediccion.sum()} de {len(df_score)} días con pronóstico {modelo_prediccion})")
     plt.close()
 
 # ══════════════════════════════════════════════════════════════════════════════
 # MÓDULO 7: REPORTE EN TERMINAL
 # ══════════════════════════════════════════════════════════════════════════════
 
-def imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas, recomendacion, noticias):
+def imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas, recomendacion, noticias,
+                              señales_activos=None, df_spread=None):
     """
     Imprime reporte profesional en terminal
+
+    `señales_activos` (indicadores_universo.señales_universo) agrega la
+    lectura técnica de cada ticker del catálogo; `df_spread`
+    (spread_petroleo.calcular_spread) el z-score, la cobertura y la vida
+    media del spread Brent-WTI.
     """
     print("\n\n")
     print("╔" + "="*78 + "╗")
@@ -971,9 +1044,15 @@ def imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas, recome
     
     # COMPARACIÓN BRENT
     print(f"\n🌍 Comparación WTI vs. Brent:")
-    spread = df_brent['precio'].iloc[-1] - df_wti['precio'].iloc[-1]
     print(f"  Brent: ${df_brent['precio'].iloc[-1]:.2f}/barril")
-    print(f"  Spread Brent-WTI: ${spread:+.2f}")
+    if df_spread is not None and len(df_spread):
+        ultimo = df_spread.iloc[-1]
+        print(f"  Spread Brent-WTI: ${ultimo['spread']:+.2f} (media {VENTANA_Z} días: ${ultimo['media']:+.2f})")
+        print(f"  Z-score: {ultimo['zscore']:+.2f} → régimen {ultimo['regimen']}")
+        vida = f"{ultimo['vida_media']:.1f} días" if pd.notna(ultimo['vida_media']) else "sin reversión medible"
+        print(f"  Ratio de cobertura: {ultimo['beta']:.3f}  Vida media: {vida}")
+    else:
+        print(f"  Spread Brent-WTI: ${df_brent['precio'].iloc[-1] - df_wti['precio'].iloc[-1]:+.2f}")
     
     # ANÁLISIS TÉCNICO
     print(f"\n📈 Análisis Técnico:")
@@ -982,6 +1061,13 @@ def imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas, recome
     print(f"  Soporte: ${señal_tecnica['soporte']:.2f}")
     print(f"  Resistencia: ${señal_tecnica['resistencia']:.2f}")
     
+    # SEÑALES POR ACTIVO
+    if señales_activos is not None and len(señales_activos):
+        print(f"\n🏭 Señales Técnicas por Activo:")
+        for ticker, fila in señales_activos.iterrows():
+            print(f"  {ticker:<8} ${fila['precio']:>9.2f}  {fila['tendencia']:<8} "
+                  f"RSI {fila['rsi']:5.1f} ({fila['rsi_señal']})")
+    
     # NOTICIAS
     print(f"\n📰 Noticias Relevantes:")
     for i, noticia in enumerate(noticias[:3], 1):
@@ -1024,28 +1110,46 @@ def main():
     tiempo_inicio = time.time()
     
     # 1. Descargar datos precios
-    df_wti, df_brent = descargar_datos_petroleo()
+    df_wti, df_brent, df_spread = descargar_datos_petroleo()
     
-    # 2. Análisis técnico
+    # 2. Análisis técnico (WTI y, en una sola llamada, todos los tickers del catálogo)
     df_wti, señal_tecnica = calcular_indicadores_tecnicos(df_wti)
+    try:
+        señales_activos = señales_universo()
+    except (KeyError, ValueError):
+        señales_activos = None
     
     # 3. Predicción
-    forecast, metricas_prediccion = generar_prediccion(df_wti, dias=DIAS_PREDICCION)
+    if MOTOR_PREDICCION == 'kalman':
+        forecast, metricas_prediccion = generar_prediccion_kalman(df_wti, dias=DIAS_PREDICCION)
+        modelo_prediccion = 'kalman'
+    else:
+        forecast, metricas_prediccion = generar_prediccion(df_wti, dias=DIAS_PREDICCION,
+                                                           perfil=PERFIL_PROPHET)
+        modelo_prediccion = f'prophet_sistema_{PERFIL_PROPHET}'
     
     # 4. Sentimiento (NUEVO: Pasa df_wti para correlación)
     sentimiento_score, noticias_relevantes, df_sentimiento_diario = analizar_sentimiento_mercado(df_wti)
     
-    # 5. Generar recomendación
-    recomendacion = generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score)
+    # 5. Generar recomendación (riesgo según la volatilidad GARCH del WTI recién
+    #    descargado, el mismo que alimenta las demás señales)
+    try:
+        precios_wti = pd.DataFrame({'WTI': df_wti.set_index('fecha')['precio']})
+        volatilidad = volatilidad_universo(precios_wti, dir_cache=None).loc['WTI']
+    except (KeyError, ValueError):
+        volatilidad = None
+    recomendacion = generar_recomendacion(señal_tecnica, metricas_prediccion, sentimiento_score, volatilidad)
     
     # 6. Visualizaciones (NUEVO: Pasa df_sentimiento_diario)
-    generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion, noticias_relevantes, df_sentimiento_diario)
+    generar_dashboard(df_wti, df_brent, forecast, señal_tecnica, recomendacion, noticias_relevantes, df_sentimiento_diario,
+                      df_spread)
     
     # 6.2 Gráficos Adicionales
-    generar_graficos_adicionales(df_wti, df_sentimiento_diario)
+    generar_graficos_adicionales(df_wti, df_sentimiento_diario, modelo_prediccion, forecast, recomendacion)
     
     # 7. Reporte terminal
-    imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas_prediccion, recomendacion, noticias_relevantes)
+    imprimir_reporte_terminal(df_wti, df_brent, señal_tecnica, metricas_prediccion, recomendacion, noticias_relevantes,
+                              señales_activos, df_spread)
     
     tiempo_total = time.time() - tiempo_inicio
     print(f"⏱️  Tiempo de ejecución: {tiempo_total:.1f} segundos")
@@ -0,0 +1,320 @@
+"""
+AGREGADOS DIARIOS DE SENTIMIENTO (MATERIALIZADOS E INCREMENTALES)
+Tabla persistente por (fecha, fuente) que solo se actualiza con noticias nuevas
+
+En lugar de recalcular groupby('fecha') y rolling_7d sobre todo el archivo
+de noticias en cada ejecución, se mantiene una tabla pequeña con:
+
+    suma_score      Σ score
+    suma_ponderada  Σ score × peso
+    suma_peso       Σ peso
+    conteo          número de noticias
+
+MARCA DE AGUA:
+    El estado de ingesta guarda la última fecha incorporada (marca) y las
+    claves hash(fecha | fuente | titulo) solo de los DIAS_TOLERANCIA días
+    anteriores a ella. En cada ejecución se descartan sin hashear las
+    noticias más antiguas que marca − DIAS_TOLERANCIA; solo las recientes se
+    hashean y se comparan con ese conjunto pequeño. El costo depende de las
+    noticias recientes, no del tamaño del archivo.
+
+SERIE DIARIA MATERIALIZADA:
+    sentimiento_diario_serie.csv guarda la serie diaria con rolling_7d. Al
+    incorporar noticias solo se recalculan los días tocados (y los
+    posteriores), usando como contexto las últimas VENTANA_DIARIA − 1 filas
+    ya materializadas.
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_AGREGADOS = "base_datos_csv/sentimiento_diario_agregado.csv"
+RUTA_INGESTA = "base_datos_csv/sentimiento_ingesta.json"
+RUTA_DIARIO = "base_datos_csv/sentimiento_diario_serie.csv"
+
+COLUMNAS_SUMA = ['suma_score', 'suma_ponderada', 'suma_peso', 'conteo']
+COLUMNAS_DIARIAS = ['score_ponderado', 'score_medio', 'score_ponderado_peso', 'conteo']
+
+DIAS_TOLERANCIA = 3     # Días antes de la marca en que aún se aceptan noticias atrasadas
+VENTANA_DIARIA = 7      # Ventana materializada (rolling_7d)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# IDENTIFICACIÓN DE NOTICIAS NUEVAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _fechas_texto(fechas):
+    """Normaliza fechas a 'YYYY-MM-DD' (sin zona horaria; '' si no se puede leer)"""
+    return (pd.to_datetime(pd.Series(fechas), errors='coerce')
+            .dt.strftime('%Y-%m-%d').fillna('').values)
+
+
+def _restar_dias(fecha, dias):
+    return (pd.Timestamp(fecha) - pd.Timedelta(days=dias)).strftime('%Y-%m-%d')
+
+
+def claves_noticias(df_noticias, columna_texto='titulo'):
+    """Clave única por noticia: hash(fecha | fuente | texto)"""
+    fechas = _fechas_texto(df_noticias['fecha'])
+    fuentes = df_noticias['fuente'].astype(str).values
+    textos = df_noticias[columna_texto].astype(str).values
+    return np.array([hashlib.blake2b(f"{f}|{s}|{t}".encode('utf-8'), digest_size=16).hexdigest()
+                     for f, s, t in zip(fechas, fuentes, textos)], dtype=object)
+
+
+def cargar_estado_ingesta(ruta=RUTA_INGESTA):
+    """
+    Estado de ingesta guardado.
+
+    RETORNA:
+        dict {'marca': 'YYYY-MM-DD', 'claves': {fecha: [claves]}} o None si
+        no existe o está dañado
+    """
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            estado = json.load(f)
+        return {'marca': estado['marca'], 'claves': dict(estado['claves'])}
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def _guardar_estado_ingesta(estado, ruta):
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, ruta)
+
+
+def seleccionar_nuevas(df_noticias, columna_texto='titulo',
+                       ruta_agregados=RUTA_AGREGADOS, ruta_ingesta=RUTA_INGESTA):
+    """
+    Devuelve solo las noticias que aún no fueron incorporadas a los agregados.
+
+    Las noticias con fecha anterior a marca − DIAS_TOLERANCIA se consideran
+    ya incorporadas y no se hashean.
+
+    RETORNA:
+        df_nuevas: subconjunto de df_noticias con columna 'clave' agregada
+    """
+    # Sin tabla de agregados, el estado de ingesta no sirve: reconstruir todo
+    estado = cargar_estado_ingesta(ruta_ingesta) if os.path.exists(ruta_agregados) else None
+
+    if estado is None:
+        df = df_noticias.copy()
+    else:
+        fechas = _fechas_texto(df_noticias['fecha'])
+        df = df_noticias[fechas >= _restar_dias(estado['marca'], DIAS_TOLERANCIA)].copy()
+
+    df['clave'] = claves_noticias(df, columna_texto)
+    df = df.drop_duplicates(subset=['clave'])
+
+    if estado is not None and not df.empty:
+        vistas = {c for claves in estado['claves'].values() for c in claves}
+        df = df[~df['clave'].isin(vistas)]
+
+    return df
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TABLA MATERIALIZADA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def cargar_agregados(ruta=RUTA_AGREGADOS):
+    """Carga la tabla (fecha, fuente) → sumas; vacía si no existe"""
+    if os.path.exists(ruta):
+        return pd.read_csv(ruta).set_index(['fecha', 'fuente'])[COLUMNAS_SUMA]
+
+    indice = pd.MultiIndex.from_arrays([[], []], names=['fecha', 'fuente'])
+    return pd.DataFrame(columns=COLUMNAS_SUMA, index=indice, dtype=np.float64)
+
+
+def incorporar_noticias(df_nuevas, ruta_agregados=RUTA_AGREGADOS,
+                        ruta_ingesta=RUTA_INGESTA, ruta_diario=RUTA_DIARIO):
+    """
+    Suma las noticias nuevas a la tabla materializada, avanza la marca de
+    agua y actualiza la serie diaria desde el primer día tocado.
+
+    ENTRADA:
+        df_nuevas: DataFrame con 'clave', 'fecha', 'fuente', 'score', 'peso'
+                   (normalmente el resultado de seleccionar_nuevas ya puntuado)
+
+    RETORNA:
+        df_agg: tabla actualizada indexada por (fecha, fuente)
+    """
+    # Sin estado de ingesta, seleccionar_nuevas devolvió todo el archivo:
+    # se reconstruye la tabla en lugar de sumar dos veces
+    estado = cargar_estado_ingesta(ruta_ingesta) if os.path.exists(ruta_agregados) else None
+    reconstruir = estado is None
+    df_agg = cargar_agregados(ruta_agregados)
+    if reconstruir and not df_nuevas.empty:
+        df_agg = df_agg.iloc[0:0]
+
+    if df_nuevas.empty:
+        if not os.path.exists(ruta_diario):
+            _actualizar_serie(df_agg, None, ruta_diario)
+        return df_agg
+
+    fechas = _fechas_texto(df_nuevas['fecha'])
+    df = pd.DataFrame({
+        'fecha': fechas,
+        'fuente': df_nuevas['fuente'].astype(str).values,
+        'suma_score': df_nuevas['score'].values,
+        'suma_ponderada': (df_nuevas['score'] * df_nuevas['peso']).values,
+        'suma_peso': df_nuevas['peso'].values,
+        'conteo': 1.0
+    })
+
+    # Solo las filas (día, fuente) tocadas reciben el delta
+    delta = df.groupby(['fecha', 'fuente'])[COLUMNAS_SUMA].sum()
+    df_agg = df_agg.add(delta, fill_value=0).sort_index()
+
+    os.makedirs(os.path.dirname(ruta_agregados) or '.', exist_ok=True)
+    df_agg.reset_index().to_csv(ruta_agregados, index=False)
+
+    # Marca de agua: solo se conservan las claves de los días de tolerancia
+    claves = {} if estado is None else estado['claves']
+    for fecha, clave in zip(fechas, df_nuevas['clave'].values):
+        if fecha:
+            claves.setdefault(fecha, []).append(clave)
+    if claves:
+        corte = _restar_dias(max(claves), DIAS_TOLERANCIA)
+        _guardar_estado_ingesta({'marca': max(claves),
+                                 'claves': {f: c for f, c in claves.items() if f >= corte}},
+                                ruta_ingesta)
+
+    validas = [f for f in fechas if f]
+    primer_dia = None if reconstruir or not validas else min(validas)
+    _actualizar_serie(df_agg, primer_dia, ruta_diario)
+    return df_agg
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SERIES Y VENTANAS DERIVADAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def serie_diaria(df_agg, por_fuente=False):
+    """
+    Serie diaria de sentimiento derivada de la tabla materializada.
+
+    RETORNA:
+        DataFrame con 'fecha' (datetime), 'score_ponderado' (promedio diario de
+        score × peso, igual que groupby('fecha').mean()), 'score_medio',
+        'score_ponderado_peso' (Σ score·peso / Σ peso) y 'conteo'.
+        Con por_fuente=True incluye además la columna 'fuente'.
+    """
+    claves = ['fecha', 'fuente'] if por_fuente else ['fecha']
+    df = df_agg.groupby(level=claves)[COLUMNAS_SUMA].sum().reset_index()
+
+    conteo = df['conteo'].replace(0, np.nan)
+    df['score_ponderado'] = df['suma_ponderada'] / conteo
+    df['score_medio'] = df['suma_score'] / conteo
+    df['score_ponderado_peso'] = df['suma_ponderada'] / df['suma_peso'].replace(0, np.nan)
+    df['fecha'] = pd.to_datetime(df['fecha'])
+
+    columnas = claves + COLUMNAS_DIARIAS
+    return df.sort_values(claves)[columnas].reset_index(drop=True)
+
+
+def agregar_ventana_movil(df_diario, ventana=7, columna='score_ponderado'):
+    """
+    Agrega la columna rolling_{ventana}d (promedio de los últimos días con
+    noticias, min_periods=1) a la serie diaria.
+    """
+    df_diario[f'rolling_{ventana}d'] = df_diario[columna].rolling(window=ventana, min_periods=1).mean()
+    return df_diario
+
+
+def _actualizar_serie(df_agg, primer_dia, ruta_diario, ventana=VENTANA_DIARIA):
+    """
+    Recalcula la serie diaria materializada desde primer_dia (None = toda).
+    La ventana móvil de los días tocados usa como contexto las últimas
+    ventana − 1 filas anteriores ya guardadas.
+    """
+    previa = cargar_serie_diaria(ruta_diario) if primer_dia is not None else None
+
+    if previa is None:
+        df_diario = agregar_ventana_movil(serie_diaria(df_agg), ventana)
+    else:
+        conservadas = previa[previa['fecha'] < pd.Timestamp(primer_dia)]
+        contexto = conservadas.tail(ventana - 1)[['fecha'] + COLUMNAS_DIARIAS]
+        tocadas = serie_diaria(df_agg.loc[primer_dia:])
+        tramo = agregar_ventana_movil(pd.concat([contexto, tocadas], ignore_index=True), ventana)
+        df_diario = pd.concat([conservadas, tramo.iloc[len(contexto):]], ignore_index=True)
+
+    os.makedirs(os.path.dirname(ruta_diario) or '.', exist_ok=True)
+    df_diario.to_csv(ruta_diario, index=False)
+    return df_diario
+
+
+def cargar_serie_diaria(ruta=RUTA_DIARIO):
+    """
+    Serie diaria materializada (fecha, score_ponderado, ..., rolling_7d).
+
+    RETORNA:
+        DataFrame o None si aún no existe
+    """
+    if not os.path.exists(ruta):
+        return None
+    return pd.read_csv(ruta, parse_dates=['fecha'])
+
+
+def sentimiento_ventana(df_diario, ventana=7, columna='score_ponderado'):
+    """
+    Valor actual de la ventana móvil leyendo solo las últimas `ventana` filas: O(ventana).
+    """
+    if df_diario is None or df_diario.empty:
+        return 0.0
+    return float(df_diario[columna].iloc[-ventana:].mean())
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 70)
+    print("AGREGADOS DIARIOS DE SENTIMIENTO")
+    print("=" * 70)
+
+    carpeta = tempfile.mkdtemp()
+    rutas = {'ruta_agregados': os.path.join(carpeta, "agregados.csv"),
+             'ruta_ingesta': os.path.join(carpeta, "ingesta.json")}
+    ruta_diario = os.path.join(carpeta, "diario.csv")
+
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range('2025-01-01', periods=40).strftime('%Y-%m-%d')
+    df_noticias = pd.DataFrame({
+        'fecha': np.repeat(fechas, 5),
+        'fuente': np.tile(['Reuters', 'Google News', 'Bloomberg', 'Reuters', 'Google News'], 40),
+        'titulo': [f"Titular {i}" for i in range(200)],
+        'score': rng.uniform(-1, 1, 200).round(3),
+        'peso': np.tile([1.0, 0.6, 1.0, 1.0, 0.6], 40)
+    })
+
+    # Tres ejecuciones: archivo inicial, noticias nuevas y una noticia atrasada
+    lotes = [df_noticias.iloc[:150], df_noticias,
+             pd.concat([df_noticias, pd.DataFrame({'fecha': [fechas[-2]], 'fuente': ['Reuters'],
+                                                   'titulo': ['Atrasada'], 'score': [0.9],
+                                                   'peso': [1.0]})])]
+    for ejecucion, lote in enumerate(lotes, 1):
+        df_nuevas = seleccionar_nuevas(lote, **rutas)
+        df_agg = incorporar_noticias(df_nuevas, ruta_diario=ruta_diario, **rutas)
+        print(f"\n  Ejecución {ejecucion}: {len(df_nuevas)} noticias nuevas incorporadas")
+
+    df_diario = cargar_serie_diaria(ruta_diario)
+    referencia = agregar_ventana_movil(serie_diaria(df_agg))
+    iguales = np.allclose(df_diario['rolling_7d'], referencia['rolling_7d'])
+    print(f"\n  {'✓' if iguales else '✗'} Serie incremental = recálculo completo ({len(df_diario)} días)")
+    print(f"  ✓ Claves retenidas: {sum(map(len, cargar_estado_ingesta(rutas['ruta_ingesta'])['claves'].values()))}")
+    print(f"  ✓ Sentimiento actual (7d): {sentimiento_ventana(df_diario):+.4f}")
+    print("=" * 70)
@@ -0,0 +1,338 @@
+"""
+ALMACÉN COMPACTO DE SENTIMIENTOS
+Representación columnar de sentimientos.csv / sentimientos_reales.csv
+
+En CSV (y en un DataFrame leído de él) cada fila repite cadenas completas:
+clasificación, fuente, el texto de hasta 200 caracteres y el link, además
+de cuatro scores float64. Este almacén guarda lo mismo como:
+
+    scores          float32 [N × 4]  (compound, pos, neu, neg)
+    clasificacion   int8    códigos  → CATEGORIAS_CLASIFICACION
+    fuente          int16   códigos  → tabla de fuentes
+    fecha           int32   días desde 1970-01-01
+    texto / link    int32   ids      → tabla de cadenas deduplicada
+    noticia_id      int32   ids      → tabla de cadenas
+
+Las tablas de cadenas se guardan como bytes UTF-8 concatenados más
+offsets, de modo que el .npz se lee sin pickle. Los agrupamientos
+(conteo y promedio por fuente, clasificación o fecha) usan np.bincount
+sobre los códigos enteros, sin comparar cadenas.
+
+3 y 3b guardan solo el .npz; los lectores (0_validar_datos, generar_graficas,
+GENERAR_ANALISIS_Y_GRAFICAS) usan leer_sentimientos, que recurre al CSV
+cuando es el único o el más reciente (pipeline_streaming).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_ALMACEN = "base_datos_csv/sentimientos_reales.npz"
+
+CATEGORIAS_CLASIFICACION = np.array(['NEGATIVO', 'NEUTRAL', 'POSITIVO'])
+
+COLUMNAS_SCORE = ['score_compound', 'score_positivo', 'score_neutral', 'score_negativo']
+COLUMNAS_CADENA = ['noticia_id', 'texto', 'link']
+
+_FECHA_NULA = np.iinfo(np.int32).min
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TABLAS DE CADENAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _codificar(valores, categorias=None, dtype=np.int32):
+    """
+    Códigos enteros y tabla de categorías (nulos → -1).
+
+    Con categorias fijas, los valores fuera de ellas también quedan en -1.
+    Lanza ValueError si hay más categorías de las que caben en dtype.
+    """
+    valores = pd.Series(valores, dtype=object)
+    if categorias is not None:
+        codigos = pd.Categorical(valores, categories=categorias).codes
+        return codigos.astype(dtype), np.asarray(categorias, dtype=object)
+    codigos, uniques = pd.factorize(valores.astype(object).where(valores.notna(), None))
+    if len(uniques) - 1 > np.iinfo(dtype).max:
+        raise ValueError(f"{len(uniques):,} categorías distintas no caben en {np.dtype(dtype).name}")
+    return codigos.astype(dtype), np.asarray(uniques, dtype=object).astype(str).astype(object)
+
+
+def _empaquetar(cadenas):
+    """Lista de cadenas → (bytes UTF-8 uint8, offsets int64)"""
+    codificadas = [c.encode('utf-8') for c in cadenas]
+    offsets = np.zeros(len(codificadas) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in codificadas], out=offsets[1:])
+    return np.frombuffer(b''.join(codificadas), dtype=np.uint8), offsets
+
+
+def _desempaquetar(datos, offsets):
+    """(bytes, offsets) → arreglo object de cadenas"""
+    buffer = datos.tobytes()
+    return np.array([buffer[a:b].decode('utf-8') for a, b in zip(offsets[:-1], offsets[1:])],
+                    dtype=object)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ALMACÉN
+# ══════════════════════════════════════════════════════════════════════════════
+
+class AlmacenSentimiento:
+    """
+    Sentimientos en formato columnar compacto.
+
+    USO:
+        almacen = AlmacenSentimiento.desde_dataframe(df_sentimientos)
+        almacen.guardar('base_datos_csv/sentimientos_reales.npz')
+
+        almacen = AlmacenSentimiento.cargar('base_datos_csv/sentimientos_reales.npz')
+        almacen.promedio_por('fuente')       # groupby sobre códigos
+        df = almacen.a_dataframe()           # columnas categóricas
+    """
+
+    def __init__(self, scores, clasificacion, fuente, fecha, ids, tablas, fuentes):
+        self.scores = scores                  # float32 [N × 4]
+        self.clasificacion = clasificacion    # int8
+        self.fuente = fuente                  # int16
+        self.fecha = fecha                    # int32 (días)
+        self.ids = ids                        # columna → int32 ids en tablas[columna]
+        self.tablas = tablas                  # columna → arreglo de cadenas únicas
+        self.fuentes = fuentes                # arreglo de nombres de fuente
+
+    def __len__(self):
+        return len(self.scores)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Conversión
+    # ──────────────────────────────────────────────────────────────────────────
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        """Construye el almacén a partir de un DataFrame con el formato de 3/3b"""
+        n = len(df)
+        scores = np.full((n, len(COLUMNAS_SCORE)), np.nan, dtype=np.float32)
+        for j, columna in enumerate(COLUMNAS_SCORE):
+            if columna in df.columns:
+                scores[:, j] = pd.to_numeric(df[columna], errors='coerce').to_numpy(dtype=np.float32)
+
+        clasificacion, _ = _codificar(df['clasificacion'] if 'clasificacion' in df.columns
+                                      else [None] * n, CATEGORIAS_CLASIFICACION, np.int8)
+        fuente, fuentes = _codificar(df['fuente'] if 'fuente' in df.columns
+                                     else ['Desconocida'] * n, dtype=np.int16)
+
+        fecha = np.full(n, _FECHA_NULA, dtype=np.int32)
+        if 'fecha' in df.columns:
+            fechas = pd.to_datetime(df['fecha'], errors='coerce', utc=True).dt.tz_localize(None)
+            validas = fechas.notna().to_numpy()
+            fecha[validas] = fechas[validas].to_numpy().astype('datetime64[D]').astype(np.int32)
+
+        ids, tablas = {}, {}
+        for columna in COLUMNAS_CADENA:
+            if columna in df.columns:
+                ids[columna], tablas[columna] = _codificar(df[columna])
+
+        return cls(scores, clasificacion, fuente, fecha, ids, tablas, fuentes)
+
+    def a_dataframe(self):
+        """
+        DataFrame con el formato de sentimientos_reales.csv.
+
+        Las cadenas quedan como pd.Categorical (cada texto distinto se guarda
+        una sola vez) y los scores en float32.
+        """
+        datos = {}
+        for columna in COLUMNAS_CADENA[:1]:
+            if columna in self.ids:
+                datos[columna] = pd.Categorical.from_codes(self.ids[columna], self.tablas[columna])
+        datos['fuente'] = pd.Categorical.from_codes(self.fuente, self.fuentes)
+        datos['fecha'] = np.where(self.fecha == _FECHA_NULA, np.datetime64('NaT'),
+                                  self.fecha.astype('datetime64[D]')).astype('datetime64[ns]')
+        for columna in COLUMNAS_CADENA[1:]:
+            if columna in self.ids:
+                datos[columna] = pd.Categorical.from_codes(self.ids[columna], self.tablas[columna])
+        for j, columna in enumerate(COLUMNAS_SCORE):
+            datos[columna] = self.scores[:, j]
+        datos['clasificacion'] = pd.Categorical.from_codes(self.clasificacion,
+                                                           CATEGORIAS_CLASIFICACION)
+        return pd.DataFrame(datos)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Agrupamientos sobre códigos
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _codigos(self, por):
+        if por == 'fuente':
+            return self.fuente, self.fuentes
+        if por == 'clasificacion':
+            return self.clasificacion, CATEGORIAS_CLASIFICACION
+        if por == 'fecha':
+            validas = self.fecha != _FECHA_NULA
+            inicio = int(self.fecha[validas].min()) if validas.any() else 0
+            codigos = np.where(validas, self.fecha.astype(np.int64) - inicio, -1)
+            n_dias = int(codigos.max()) + 1 if validas.any() else 0
+            etiquetas = (np.arange(n_dias) + inicio).astype('datetime64[D]')
+            return codigos, pd.DatetimeIndex(etiquetas)
+        raise ValueError(f"Agrupamiento no soportado: '{por}' (fuente, clasificacion o fecha)")
+
+    def contar(self, por='clasificacion'):
+        """Conteo por grupo (equivalente a value_counts, sin grupos vacíos)"""
+        codigos, etiquetas = self._codigos(por)
+        validos = codigos >= 0
+        conteo = np.bincount(codigos[validos], minlength=len(etiquetas))
+        serie = pd.Series(conteo, index=pd.Index(etiquetas, name=por), name='conteo')
+        return serie[serie > 0].sort_values(ascending=False, kind='stable')
+
+    def promedio_por(self, por='fuente', score='score_compound'):
+        """Promedio de un score por grupo (equivalente a groupby(por)[score].mean())"""
+        codigos, etiquetas = self._codigos(por)
+        valores = self.scores[:, COLUMNAS_SCORE.index(score)].astype(np.float64)
+        validos = (codigos >= 0) & ~np.isnan(valores)
+        suma = np.bincount(codigos[validos], weights=valores[validos], minlength=len(etiquetas))
+        conteo = np.bincount(codigos[validos], minlength=len(etiquetas))
+        presentes = conteo > 0
+        return pd.Series(suma[presentes] / conteo[presentes],
+                         index=pd.Index(np.asarray(etiquetas)[presentes], name=por), name=score)
+
+    def memoria_bytes(self):
+        """Bytes ocupados por los arreglos y tablas del almacén"""
+        total = (self.scores.nbytes + self.clasificacion.nbytes + self.fuente.nbytes
+                 + self.fecha.nbytes + sum(ids.nbytes for ids in self.ids.values()))
+        for tabla in [self.fuentes, *self.tablas.values()]:
+            total += sum(len(c.encode('utf-8')) for c in tabla) + 8 * (len(tabla) + 1)
+        return total
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Persistencia
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def guardar(self, ruta=RUTA_ALMACEN):
+        """Guarda el almacén como .npz comprimido (sin objetos pickle)"""
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        arreglos = {
+            'scores': self.scores,
+            'clasificacion': self.clasificacion,
+            'fuente': self.fuente,
+            'fecha': self.fecha
+        }
+        arreglos['fuentes_datos'], arreglos['fuentes_offsets'] = _empaquetar(self.fuentes)
+        for columna in self.ids:
+            arreglos[f'{columna}_ids'] = self.ids[columna]
+            arreglos[f'{columna}_datos'], arreglos[f'{columna}_offsets'] = \
+                _empaquetar(self.tablas[columna])
+        np.savez_compressed(ruta, **arreglos)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_ALMACEN):
+        with np.load(ruta, allow_pickle=False) as datos:
+            ids, tablas = {}, {}
+            for columna in COLUMNAS_CADENA:
+                if f'{columna}_ids' in datos:
+                    ids[columna] = datos[f'{columna}_ids']
+                    tablas[columna] = _desempaquetar(datos[f'{columna}_datos'],
+                                                     datos[f'{columna}_offsets'])
+            return cls(datos['scores'], datos['clasificacion'], datos['fuente'], datos['fecha'],
+                       ids, tablas, _desempaquetar(datos['fuentes_datos'], datos['fuentes_offsets']))
+
+
+def guardar_sentimientos_compacto(df_sentimientos, ruta=RUTA_ALMACEN):
+    """Atajo: DataFrame de sentimientos → .npz compacto; retorna el almacén"""
+    almacen = AlmacenSentimiento.desde_dataframe(df_sentimientos)
+    almacen.guardar(ruta)
+    return almacen
+
+
+def _rutas(ruta):
+    """(ruta .npz, ruta .csv) con el mismo nombre base"""
+    base = os.path.splitext(ruta)[0]
+    return base + '.npz', base + '.csv'
+
+
+def existen_sentimientos(ruta):
+    """True si hay sentimientos guardados con ese nombre (.npz o .csv)"""
+    return any(os.path.exists(r) for r in _rutas(ruta))
+
+
+def leer_sentimientos(ruta):
+    """
+    Lee sentimientos del .npz compacto (formato que guardan 3 y 3b).
+
+    Si solo existe el CSV, o el CSV es más reciente (pipeline_streaming y
+    los scripts todo-en-uno escriben CSV), se lee el CSV.
+
+    ENTRADA:
+        ruta: ruta .npz o .csv (se prueban ambas extensiones)
+
+    RETORNA:
+        DataFrame (columnas categóricas y scores float32 si viene del .npz)
+    """
+    ruta_npz, ruta_csv = _rutas(ruta)
+    if os.path.exists(ruta_npz) and (not os.path.exists(ruta_csv)
+                                     or os.path.getmtime(ruta_npz) >= os.path.getmtime(ruta_csv)):
+        return AlmacenSentimiento.cargar(ruta_npz).a_dataframe()
+    return pd.read_csv(ruta_csv)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 70)
+    print("ALMACÉN COMPACTO DE SENTIMIENTOS")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    n = 200_000
+    titulares = [f"Oil prices move as OPEC headline number {i} hits the wires" for i in range(5000)]
+    fuentes = ['Google News', 'Reuters', 'Bloomberg', 'Yahoo Finance', 'Reddit r/oil']
+    compound = rng.uniform(-1, 1, n).round(4)
+    df = pd.DataFrame({
+        'noticia_id': [f"NOT{i:07d}" for i in range(n)],
+        'fuente': rng.choice(fuentes, n),
+        'fecha': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'texto': rng.choice(titulares, n),
+        'link': rng.choice([f"https://news.example.com/{i}" for i in range(5000)], n),
+        'score_compound': compound,
+        'score_positivo': rng.uniform(0, 1, n).round(3),
+        'score_neutral': rng.uniform(0, 1, n).round(3),
+        'score_negativo': rng.uniform(0, 1, n).round(3),
+        'clasificacion': np.select([compound > 0.05, compound < -0.05],
+                                   ['POSITIVO', 'NEGATIVO'], default='NEUTRAL')
+    })
+
+    almacen = AlmacenSentimiento.desde_dataframe(df)
+    memoria_df = df.memory_usage(deep=True).sum()
+    print(f"\n  ✓ Filas: {len(almacen):,}")
+    print(f"  ✓ Memoria DataFrame: {memoria_df / 1e6:8.1f} MB")
+    print(f"  ✓ Memoria almacén:   {almacen.memoria_bytes() / 1e6:8.1f} MB "
+          f"({memoria_df / almacen.memoria_bytes():.1f}x menos)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, 'sentimientos.csv')
+        ruta_npz = os.path.join(tmp, 'sentimientos.npz')
+        df.to_csv(ruta_csv, index=False)
+        almacen.guardar(ruta_npz)
+        print(f"  ✓ Disco CSV: {os.path.getsize(ruta_csv) / 1e6:.1f} MB, "
+              f"npz: {os.path.getsize(ruta_npz) / 1e6:.1f} MB")
+
+        cargado = AlmacenSentimiento.cargar(ruta_npz)
+        df_cargado = cargado.a_dataframe()
+
+    esperado = df.groupby('fuente')['score_compound'].mean()
+    obtenido = cargado.promedio_por('fuente')
+    print(f"  ✓ Promedio por fuente igual a pandas: "
+          f"{np.allclose(obtenido[esperado.index], esperado, atol=1e-6)}")
+    print(f"  ✓ Conteo por clasificación igual a pandas: "
+          f"{cargado.contar('clasificacion').to_dict() == df['clasificacion'].value_counts().to_dict()}")
+    print(f"  ✓ Textos recuperados: {(df_cargado['texto'].astype(str) == df['texto']).all()}")
+    try:
+        _codificar([f"fuente {i}" for i in range(40000)], dtype=np.int16)
+    except ValueError as error:
+        print(f"  ✓ Desborde int16 detectado: {error}")
+    print(f"\n{cargado.promedio_por('fuente').round(4).to_string()}")
+    print("=" * 70)
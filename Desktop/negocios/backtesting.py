@@ -0,0 +1,290 @@
+"""
+BACKTESTING CON ORIGEN MÓVIL (ROLLING ORIGIN)
+Precisión real de Prophet y de los modelos base, por horizonte
+
+Para cada corte t (cada `periodo` observaciones, desde `inicial` hasta el
+final menos `horizonte`) se entrena solo con y[:t] y se predicen las
+siguientes `horizonte` observaciones:
+
+    corte 1:  [──── entrenamiento ────][─ h ─]
+    corte 2:  [────── entrenamiento ──────][─ h ─]
+    ...
+
+Con los errores de todos los cortes se calculan RMSE, MAE y MAPE por
+modelo y por paso de horizonte (h = 1, 2, ...).
+
+Cada corte se guarda en caché con una clave que incluye el modelo, su
+configuración y la huella de los datos hasta corte + horizonte; al llegar
+datos nuevos solo se evalúan los cortes nuevos. Los cortes de Prophet se
+ajustan en paralelo (un proceso por corte).
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+DIR_CACHE = "base_datos_csv/cache_backtesting"
+
+INICIAL = 500        # observaciones mínimas de entrenamiento
+PERIODO = 30         # observaciones entre cortes
+HORIZONTE = 30       # observaciones a predecir por corte
+
+PARAMETROS_PROPHET = {
+    'daily_seasonality': True,
+    'weekly_seasonality': True,
+    'yearly_seasonality': True,
+    'changepoint_prior_scale': 0.05,
+    'uncertainty_samples': 0       # solo se evalúa yhat
+}
+
+COLUMNAS_RESULTADO = ['clave', 'modelo', 'corte', 'fecha', 'h', 'real', 'prediccion']
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MODELOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _naive(ds, y, ds_futuro, parametros):
+    """Último precio conocido"""
+    return np.full(len(ds_futuro), y[-1])
+
+
+def _promedio_movil(ds, y, ds_futuro, parametros):
+    """Promedio de las últimas `ventana` observaciones (30 por defecto)"""
+    return np.full(len(ds_futuro), y[-parametros.get('ventana', 30):].mean())
+
+
+def _prophet(ds, y, ds_futuro, parametros):
+    import logging
+    from prophet import Prophet
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    model = Prophet(**parametros).fit(pd.DataFrame({'ds': ds, 'y': y}))
+    return model.predict(pd.DataFrame({'ds': ds_futuro}))['yhat'].to_numpy()
+
+
+def _rapido(ds, y, ds_futuro, parametros):
+    """Métodos de pronostico_rapido (deriva, holt, ar, ...)"""
+    from pronostico_rapido import pronostico_matriz
+
+    parametros = dict(parametros)
+    metodo = parametros.pop('metodo')
+    return pronostico_matriz(y, len(ds_futuro), metodo, **parametros)[0][:, 0]
+
+
+# Nombre → (función, parámetros por defecto, ¿costoso? → se paraleliza)
+MODELOS = {
+    'prophet': (_prophet, PARAMETROS_PROPHET, True),
+    'naive': (_naive, {}, False),
+    'promedio_movil': (_promedio_movil, {'ventana': 30}, False),
+    'deriva': (_rapido, {'metodo': 'deriva'}, False),
+    'holt': (_rapido, {'metodo': 'holt'}, False),
+    'ar': (_rapido, {'metodo': 'ar', 'p': 5}, False)
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CORTES Y CACHÉ
+# ══════════════════════════════════════════════════════════════════════════════
+
+def generar_cortes(n, inicial=INICIAL, periodo=PERIODO, horizonte=HORIZONTE):
+    """
+    Posiciones de corte (tamaño del entrenamiento), de la más antigua a la
+    más reciente: inicial, inicial + periodo, ... mientras quepa un horizonte
+    completo. Se anclan al inicio para que los datos nuevos solo agreguen
+    cortes al final y los anteriores sigan en caché.
+    """
+    return list(range(inicial, n - horizonte + 1, periodo))
+
+
+def _clave_corte(modelo, parametros, ds, y, corte, horizonte):
+    h = hashlib.blake2b(digest_size=12)
+    h.update(json.dumps([modelo, parametros, int(corte), int(horizonte)],
+                        sort_keys=True, default=str).encode('utf-8'))
+    h.update(ds[:corte + horizonte].astype('datetime64[ns]').astype(np.int64).tobytes())
+    h.update(y[:corte + horizonte].astype(np.float64).tobytes())
+    return h.hexdigest()
+
+
+def _ruta_cache(nombre, dir_cache):
+    return os.path.join(dir_cache, f"{nombre}.csv")
+
+
+def cargar_resultados(nombre, dir_cache=DIR_CACHE):
+    """Resultados de cortes ya evaluados para una serie"""
+    ruta = _ruta_cache(nombre, dir_cache)
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=COLUMNAS_RESULTADO)
+    return pd.read_csv(ruta, parse_dates=['corte', 'fecha'])
+
+
+def evaluar_corte(modelo, parametros, ds, y, corte, horizonte, clave=None):
+    """
+    Entrena `modelo` con y[:corte] y predice las `horizonte` observaciones
+    siguientes. RETORNA: DataFrame con las columnas de COLUMNAS_RESULTADO.
+    """
+    funcion = MODELOS[modelo][0]
+    ds_futuro = ds[corte:corte + horizonte]
+    prediccion = funcion(ds[:corte], y[:corte], ds_futuro, parametros)
+    return pd.DataFrame({
+        'clave': clave,
+        'modelo': modelo,
+        'corte': ds[corte - 1],
+        'fecha': ds_futuro,
+        'h': np.arange(1, len(ds_futuro) + 1),
+        'real': y[corte:corte + horizonte],
+        'prediccion': prediccion
+    })
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BACKTEST
+# ══════════════════════════════════════════════════════════════════════════════
+
+def backtest(serie, nombre='wti', modelos=('prophet', 'naive', 'promedio_movil'),
+             inicial=INICIAL, periodo=PERIODO, horizonte=HORIZONTE,
+             parametros=None, n_procesos=None, dir_cache=DIR_CACHE):
+    """
+    Backtesting con origen móvil de varios modelos sobre una serie.
+
+    ENTRADA:
+        serie: pd.Series de precios indexada por fecha
+        nombre: identificador de la serie (archivo de caché)
+        modelos: nombres en MODELOS
+        inicial, periodo, horizonte: configuración de cortes (en observaciones)
+        parametros: dict modelo → parámetros (reemplaza los por defecto)
+        n_procesos: procesos para los modelos costosos (None = núcleos)
+        dir_cache: carpeta de caché (None = sin caché)
+
+    RETORNA:
+        DataFrame con modelo, corte, fecha, h, real, prediccion (uno por
+        punto pronosticado de cada corte)
+    """
+    from pronostico_universo import hilos_limitados, inicializar_trabajador
+
+    serie = serie.dropna().sort_index()
+    ds = pd.to_datetime(serie.index).to_numpy(dtype='datetime64[ns]')
+    y = serie.to_numpy(dtype=np.float64)
+    cortes = generar_cortes(len(y), inicial, periodo, horizonte)
+    parametros = parametros or {}
+
+    previos = cargar_resultados(nombre, dir_cache) if dir_cache else \
+        pd.DataFrame(columns=COLUMNAS_RESULTADO)
+    claves_previas = set(previos['clave'])
+
+    # Tareas pendientes: cortes cuya clave (modelo + datos hasta corte+h) no está en caché
+    pendientes, claves_usadas = [], []
+    for modelo in modelos:
+        params_modelo = {**MODELOS[modelo][1], **parametros.get(modelo, {})}
+        for corte in cortes:
+            clave = _clave_corte(modelo, params_modelo, ds, y, corte, horizonte)
+            claves_usadas.append(clave)
+            if clave not in claves_previas:
+                pendientes.append((modelo, params_modelo, corte, clave))
+
+    nuevos = []
+    costosos = [t for t in pendientes if MODELOS[t[0]][2]]
+    for modelo, params_modelo, corte, clave in pendientes:
+        if not MODELOS[modelo][2]:
+            nuevos.append(evaluar_corte(modelo, params_modelo, ds, y, corte, horizonte, clave))
+
+    if costosos:
+        n_procesos = max(1, min(n_procesos or os.cpu_count() or 1, len(costosos)))
+        with hilos_limitados(1):
+            with ProcessPoolExecutor(max_workers=n_procesos, initializer=inicializar_trabajador) as pool:
+                futuros = [pool.submit(evaluar_corte, modelo, params_modelo, ds, y,
+                                       corte, horizonte, clave)
+                           for modelo, params_modelo, corte, clave in costosos]
+                for futuro in as_completed(futuros):
+                    nuevos.append(futuro.result())
+
+    if nuevos:
+        resultados = pd.concat([previos, *nuevos] if len(previos) else nuevos, ignore_index=True)
+    else:
+        resultados = previos
+    if dir_cache and nuevos:
+        os.makedirs(dir_cache, exist_ok=True)
+        resultados.to_csv(_ruta_cache(nombre, dir_cache), index=False)
+
+    print(f"  ✓ Backtesting {nombre}: {len(cortes)} cortes × {len(modelos)} modelos "
+          f"({len(pendientes)} evaluados, {len(cortes) * len(modelos) - len(pendientes)} desde caché)")
+
+    resultados = resultados[resultados['clave'].isin(claves_usadas)]
+    return resultados.drop(columns='clave').sort_values(['modelo', 'corte', 'h']).reset_index(drop=True)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MÉTRICAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _metricas(grupo):
+    error = grupo['prediccion'] - grupo['real']
+    return pd.Series({
+        'rmse': np.sqrt(np.mean(error ** 2)),
+        'mae': np.mean(np.abs(error)),
+        'mape': np.mean(np.abs(error / grupo['real'])) * 100,
+        'n': len(grupo)
+    })
+
+
+def metricas_por_horizonte(resultados):
+    """RMSE, MAE y MAPE (%) por modelo y paso de horizonte h"""
+    columnas = ['modelo', 'h', 'rmse', 'mae', 'mape', 'n']
+    if resultados.empty:
+        return pd.DataFrame(columns=columnas)
+    error = resultados['prediccion'] - resultados['real']
+    tabla = resultados.assign(e2=error ** 2, ea=error.abs(),
+                              ep=(error / resultados['real']).abs() * 100)
+    agg = tabla.groupby(['modelo', 'h']).agg(rmse=('e2', 'mean'), mae=('ea', 'mean'),
+                                             mape=('ep', 'mean'), n=('ea', 'size'))
+    agg['rmse'] = np.sqrt(agg['rmse'])
+    return agg.reset_index()[columnas]
+
+
+def metricas_globales(resultados):
+    """RMSE, MAE y MAPE (%) por modelo sobre todos los horizontes"""
+    if resultados.empty:
+        return pd.DataFrame(columns=['rmse', 'mae', 'mape', 'n'])
+    return resultados.groupby('modelo')[['real', 'prediccion']].apply(_metricas).sort_values('rmse')
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("BACKTESTING CON ORIGEN MÓVIL")
+    print("=" * 70)
+
+    ruta_wti = "base_datos_csv/petroleo/wti.csv"
+    if os.path.exists(ruta_wti) and '--sintetico' not in sys.argv:
+        from catalogo_precios import leer_serie_precio
+        serie = leer_serie_precio(ruta_wti)
+        dir_cache = DIR_CACHE
+    else:
+        rng = np.random.default_rng(0)
+        fechas = pd.bdate_range('2021-01-01', periods=700)
+        serie = pd.Series(75 + np.cumsum(rng.normal(0, 1, len(fechas))), index=fechas)
+        dir_cache = tempfile.mkdtemp()
+        print("\n  (serie sintética)")
+
+    for etiqueta, datos in [('Primera ejecución', serie.iloc[:-PERIODO]),
+                            (f'Con {PERIODO} días nuevos', serie)]:
+        inicio = time.time()
+        resultados = backtest(datos, dir_cache=dir_cache)
+        print(f"    {etiqueta}: {time.time() - inicio:.1f} s")
+
+    print(f"\n{metricas_globales(resultados).round(3).to_string()}")
+    tabla = metricas_por_horizonte(resultados)
+    print(f"\n  RMSE por horizonte:\n"
+          f"{tabla.pivot(index='h', columns='modelo', values='rmse').iloc[[0, 4, 9, -1]].round(3).to_string()}")
+    print("=" * 70)
@@ -0,0 +1,305 @@
+"""
+BÚSQUEDA DE HIPERPARÁMETROS (SUCCESSIVE HALVING EN PARALELO)
+Ajusta changepoint_prior_scale y compañía por ticker con validación móvil
+
+Cada configuración se puntúa con el RMSE sobre cortes de origen móvil
+(backtesting.generar_cortes). Para no gastar ajustes en configuraciones
+malas se usa successive halving:
+
+    ronda 0:  todas las configuraciones  × min_cortes cortes más recientes
+    ronda 1:  mejor 1/η                  × min_cortes·η cortes
+    ronda 2:  mejor 1/η²                 × min_cortes·η² cortes
+    ...       hasta quedar una configuración o agotar los cortes
+
+Los cortes ya evaluados en una ronda se reutilizan en la siguiente. Las
+evaluaciones de Prophet se reparten en un pool de procesos; las de los
+modelos base (promedio_movil, ar) se calculan en el proceso principal.
+
+Los mejores parámetros por ticker y modelo se guardan en
+base_datos_csv/mejores_parametros.json, y configuracion_prophet los aplica
+al pedir los parámetros de un ticker.
+"""
+
+import os
+import json
+import math
+import itertools
+from datetime import datetime
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from backtesting import MODELOS, evaluar_corte, generar_cortes
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_MEJORES = "base_datos_csv/mejores_parametros.json"
+
+INICIAL = 500
+PERIODO = 60
+HORIZONTE = 30
+
+ETA = 3
+MIN_CORTES = 2
+
+# Espacios de búsqueda por modelo (rejilla completa o muestra aleatoria)
+ESPACIOS = {
+    'prophet': {
+        'changepoint_prior_scale': [0.001, 0.01, 0.05, 0.1, 0.5],
+        'seasonality_prior_scale': [0.01, 0.1, 1.0, 10.0],
+        'seasonality_mode': ['additive', 'multiplicative']
+    },
+    'promedio_movil': {
+        'ventana': [5, 10, 20, 30, 60, 120]
+    },
+    'ar': {
+        'p': [1, 2, 3, 5, 10, 20]
+    }
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIONES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def rejilla(espacio):
+    """Todas las combinaciones de un espacio {parámetro: [valores]}"""
+    nombres = list(espacio)
+    return [dict(zip(nombres, valores)) for valores in itertools.product(*espacio.values())]
+
+
+def muestra_aleatoria(espacio, n, semilla=0):
+    """n configuraciones distintas tomadas al azar de la rejilla"""
+    todas = rejilla(espacio)
+    if n >= len(todas):
+        return todas
+    rng = np.random.default_rng(semilla)
+    return [todas[i] for i in sorted(rng.choice(len(todas), n, replace=False))]
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BÚSQUEDA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _error_cuadratico(modelo, parametros, ds, y, corte, horizonte):
+    """Suma de errores al cuadrado y número de puntos de un corte"""
+    resultado = evaluar_corte(modelo, parametros, ds, y, corte, horizonte)
+    error = resultado['prediccion'].to_numpy() - resultado['real'].to_numpy()
+    return float(np.sum(error ** 2)), len(error)
+
+
+def buscar_hiperparametros(serie, modelo='prophet', configuraciones=None, n_aleatorias=None,
+                           inicial=INICIAL, periodo=PERIODO, horizonte=HORIZONTE,
+                           eta=ETA, min_cortes=MIN_CORTES, n_procesos=None, semilla=0):
+    """
+    Successive halving de configuraciones de un modelo sobre una serie.
+
+    ENTRADA:
+        serie: pd.Series de precios indexada por fecha
+        modelo: nombre en backtesting.MODELOS ('prophet', 'promedio_movil', 'ar', ...)
+        configuraciones: lista de dicts (None = rejilla de ESPACIOS[modelo])
+        n_aleatorias: si se indica, muestra aleatoria de ese tamaño
+        eta: factor de poda (se conserva 1/eta en cada ronda)
+        min_cortes: cortes de la primera ronda (los más recientes)
+
+    RETORNA:
+        DataFrame con una fila por configuración: una columna por parámetro,
+        parametros (dict), rmse, n_cortes, ronda (última alcanzada) y
+        error (None si no falló; las que fallaron tienen rmse = inf y van
+        al final), ordenado de mejor a peor
+    """
+    from pronostico_universo import hilos_limitados, inicializar_trabajador
+
+    if configuraciones is None:
+        espacio = ESPACIOS[modelo]
+        configuraciones = (muestra_aleatoria(espacio, n_aleatorias, semilla) if n_aleatorias
+                           else rejilla(espacio))
+
+    serie = serie.dropna().sort_index()
+    ds = pd.to_datetime(serie.index).to_numpy(dtype='datetime64[ns]')
+    y = serie.to_numpy(dtype=np.float64)
+    cortes = generar_cortes(len(y), inicial, periodo, horizonte)[::-1]     # recientes primero
+    if not cortes:
+        raise ValueError(f"Serie muy corta para validar: {len(y)} observaciones "
+                         f"(mínimo {inicial + horizonte})")
+
+    base = MODELOS[modelo][1]
+    costoso = MODELOS[modelo][2]
+    estado = [{'config': c, 'sse': 0.0, 'n': 0, 'cortes': 0, 'ronda': 0, 'error': None}
+              for c in configuraciones]
+    vivos = list(range(len(estado)))
+
+    def _rmse(e):
+        # Una configuración que falló (o sin puntos evaluados) queda al final
+        return math.inf if e['error'] is not None or e['n'] == 0 else math.sqrt(e['sse'] / e['n'])
+
+    def _registrar_fallo(i, error):
+        if estado[i]['error'] is None:
+            estado[i]['error'] = f"{type(error).__name__}: {error}"
+            print(f"  ⚠️ Configuración {estado[i]['config']} descartada: {estado[i]['error']}")
+
+    with ExitStack() as pila:
+        pool = None
+        if costoso:
+            n_procesos = max(1, min(n_procesos or os.cpu_count() or 1, len(configuraciones)))
+            pila.enter_context(hilos_limitados(1))
+            pool = pila.enter_context(ProcessPoolExecutor(max_workers=n_procesos,
+                                                          initializer=inicializar_trabajador))
+
+        ronda = 0
+        while True:
+            objetivo = min(len(cortes), min_cortes * eta ** ronda)
+
+            # Evaluar solo los cortes nuevos de cada configuración viva; un
+            # error en un ajuste descarta esa configuración (RMSE = inf), no la búsqueda
+            tareas = [(i, corte) for i in vivos if estado[i]['error'] is None
+                      for corte in cortes[estado[i]['cortes']:objetivo]]
+            if pool is not None:
+                futuros = {pool.submit(_error_cuadratico, modelo, {**base, **estado[i]['config']},
+                                       ds, y, corte, horizonte): i for i, corte in tareas}
+                for futuro in as_completed(futuros):
+                    i = futuros[futuro]
+                    try:
+                        sse, n = futuro.result()
+                    except Exception as e:
+                        _registrar_fallo(i, e)
+                        continue
+                    estado[i]['sse'] += sse
+                    estado[i]['n'] += n
+            else:
+                for i, corte in tareas:
+                    if estado[i]['error'] is not None:
+                        continue
+                    try:
+                        sse, n = _error_cuadratico(modelo, {**base, **estado[i]['config']},
+                                                   ds, y, corte, horizonte)
+                    except Exception as e:
+                        _registrar_fallo(i, e)
+                        continue
+                    estado[i]['sse'] += sse
+                    estado[i]['n'] += n
+            for i in vivos:
+                estado[i]['cortes'] = objetivo
+                estado[i]['ronda'] = ronda
+
+            rmse = {i: _rmse(estado[i]) for i in vivos}
+            print(f"  ✓ Ronda {ronda}: {len(vivos)} configuraciones × {objetivo} cortes "
+                  f"(mejor RMSE {min(rmse.values()):.3f})")
+
+            if len(vivos) == 1 or objetivo == len(cortes):
+                break
+            vivos = sorted(vivos, key=rmse.get)[:max(1, math.ceil(len(vivos) / eta))]
+            ronda += 1
+
+    if all(e['error'] is not None for e in estado):
+        raise ValueError(f"Todas las configuraciones fallaron (p.ej. {estado[0]['error']})")
+
+    filas = [{**e['config'], 'parametros': e['config'], 'rmse': _rmse(e),
+              'n_cortes': e['cortes'], 'ronda': e['ronda'], 'error': e['error']} for e in estado]
+    tabla = pd.DataFrame(filas)
+    return (tabla.assign(_fallo=tabla['error'].notna())
+            .sort_values(['_fallo', 'ronda', 'n_cortes', 'rmse'], ascending=[True, False, False, True])
+            .drop(columns='_fallo')
+            .reset_index(drop=True))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCIA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _cargar_json(ruta):
+    if not os.path.exists(ruta):
+        return {}
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def guardar_mejores(ticker, modelo, tabla, ruta=RUTA_MEJORES):
+    """Guarda la primera fila de `tabla` como mejor configuración de ticker/modelo"""
+    mejor = tabla.iloc[0]
+
+    datos = _cargar_json(ruta)
+    datos.setdefault(ticker.upper(), {})[modelo] = {
+        'parametros': dict(mejor['parametros']),
+        'rmse': float(mejor['rmse']),
+        'n_cortes': int(mejor['n_cortes']),
+        'configuraciones_evaluadas': len(tabla),
+        'fecha': datetime.now().strftime('%Y-%m-%d %H:%M')
+    }
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+def cargar_mejores_parametros(ticker, modelo='prophet', ruta=RUTA_MEJORES):
+    """Parámetros ajustados de ticker/modelo, o None si no se han buscado"""
+    entrada = _cargar_json(ruta).get(ticker.upper(), {}).get(modelo)
+    return dict(entrada['parametros']) if entrada else None
+
+
+def ajustar_universo(tickers=None, modelos=('prophet', 'promedio_movil', 'ar'),
+                     ruta=RUTA_MEJORES, **kwargs):
+    """
+    Busca y guarda los mejores parámetros de cada ticker del universo.
+
+    RETORNA:
+        DataFrame con ticker, modelo, rmse y parámetros elegidos
+    """
+    from catalogo_precios import listar_tickers, leer_serie_precio
+
+    rutas = listar_tickers()
+    if tickers is not None:
+        rutas = {t.upper(): rutas[t.upper()] for t in tickers if t.upper() in rutas}
+
+    filas = []
+    for ticker, ruta_csv in rutas.items():
+        serie = leer_serie_precio(ruta_csv)
+        for modelo in modelos:
+            print(f"\n  {ticker} / {modelo}")
+            try:
+                tabla = buscar_hiperparametros(serie, modelo, **kwargs)
+            except ValueError as e:
+                print(f"  ⚠️ {e}")
+                continue
+            guardar_mejores(ticker, modelo, tabla, ruta)
+            filas.append({'ticker': ticker, 'modelo': modelo, 'rmse': tabla['rmse'].iloc[0],
+                          'parametros': cargar_mejores_parametros(ticker, modelo, ruta)})
+    return pd.DataFrame(filas)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("BÚSQUEDA DE HIPERPARÁMETROS (SUCCESSIVE HALVING)")
+    print("=" * 70)
+
+    if '--sintetico' not in sys.argv:
+        inicio = time.time()
+        resumen = ajustar_universo(sys.argv[1:] or None)
+        print(f"\n{resumen.to_string(index=False)}")
+        print(f"\n  ✓ Tiempo total: {time.time() - inicio:.1f} s → {RUTA_MEJORES}")
+    else:
+        rng = np.random.default_rng(0)
+        fechas = pd.bdate_range('2020-01-01', periods=900)
+        serie = pd.Series(70 + np.cumsum(rng.normal(0.02, 1, len(fechas))), index=fechas)
+        ruta = os.path.join(tempfile.mkdtemp(), 'mejores.json')
+
+        for modelo, kwargs in [('ar', {}), ('prophet', {'n_aleatorias': 9})]:
+            print(f"\n  Modelo: {modelo}")
+            inicio = time.time()
+            tabla = buscar_hiperparametros(serie, modelo, **kwargs)
+            guardar_mejores('DEMO', modelo, tabla, ruta)
+            print(f"    {time.time() - inicio:.1f} s — mejor: "
+                  f"{cargar_mejores_parametros('DEMO', modelo, ruta)} (RMSE {tabla['rmse'].iloc[0]:.3f})")
+    print("=" * 70)
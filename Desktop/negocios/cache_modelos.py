@@ -0,0 +1,189 @@
+"""
+CACHÉ PERSISTENTE DE MODELOS PROPHET
+Evita reentrenar desde cero en cada ejecución
+
+Cada modelo ajustado se guarda (prophet.serialize.model_to_json) junto a
+una huella de los datos con que se entrenó y de su configuración:
+
+    base_datos_csv/cache_modelos/{nombre}_{config}.json        modelo
+    base_datos_csv/cache_modelos/{nombre}_{config}.meta.json   huella, n, última fecha
+
+Al pedir un ajuste:
+
+    • datos idénticos            → se carga el modelo guardado (sin ajuste)
+    • mismos datos + días nuevos → se reajusta con Stan inicializado en los
+                                   parámetros anteriores (arranque en caliente)
+    • cualquier otro cambio      → ajuste completo
+
+USO:
+    model, modo = ajustar_prophet(df_prophet, nombre='wti',
+                                  daily_seasonality=True, changepoint_prior_scale=0.05)
+    # modo ∈ {'cache', 'calentado', 'completo'}
+"""
+
+import os
+import json
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+DIR_CACHE = "base_datos_csv/cache_modelos"
+
+# ══════════════════════════════════════════════════════════════════════════════
+# HUELLAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def preparar_datos(df_prophet):
+    """Columnas ds (sin zona horaria) e y, sin nulos y ordenadas por fecha"""
+    df = df_prophet[['ds', 'y']].copy()
+    df['ds'] = pd.to_datetime(df['ds'])
+    if df['ds'].dt.tz is not None:
+        df['ds'] = df['ds'].dt.tz_localize(None)
+    df['y'] = pd.to_numeric(df['y'], errors='coerce')
+    return df.dropna().sort_values('ds').reset_index(drop=True)
+
+
+def huella_datos(df):
+    """Hash de fechas y valores (ds, y) de un DataFrame preparado"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(df['ds'].to_numpy(dtype='datetime64[ns]').astype(np.int64).tobytes())
+    h.update(df['y'].to_numpy(dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def huella_configuracion(params):
+    """Hash corto de los parámetros de Prophet y la versión instalada"""
+    import prophet
+    texto = json.dumps({'params': params, 'version': prophet.__version__},
+                       sort_keys=True, default=str)
+    return hashlib.blake2b(texto.encode('utf-8'), digest_size=6).hexdigest()
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCIA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _rutas(nombre, params, dir_cache):
+    base = os.path.join(dir_cache, f"{nombre}_{huella_configuracion(params)}")
+    return base + '.json', base + '.meta.json'
+
+
+def cargar_modelo(nombre, params, dir_cache=DIR_CACHE):
+    """Modelo guardado y sus metadatos, o (None, None) si no hay caché válida"""
+    from prophet.serialize import model_from_json
+
+    ruta_modelo, ruta_meta = _rutas(nombre, params, dir_cache)
+    if not (os.path.exists(ruta_modelo) and os.path.exists(ruta_meta)):
+        return None, None
+    try:
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(ruta_modelo, encoding='utf-8') as f:
+            return model_from_json(f.read()), meta
+    except (ValueError, KeyError, OSError):
+        return None, None
+
+
+def guardar_modelo(model, df, nombre, params, dir_cache=DIR_CACHE):
+    from prophet.serialize import model_to_json
+
+    os.makedirs(dir_cache, exist_ok=True)
+    ruta_modelo, ruta_meta = _rutas(nombre, params, dir_cache)
+    with open(ruta_modelo, 'w', encoding='utf-8') as f:
+        f.write(model_to_json(model))
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump({'huella': huella_datos(df), 'n': len(df),
+                   'ultima_fecha': str(df['ds'].iloc[-1].date()),
+                   'params': params}, f, indent=2, default=str)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# AJUSTE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def parametros_iniciales(model):
+    """Parámetros ajustados de un modelo en el formato `init` de Stan"""
+    return {
+        'k': float(model.params['k'][0][0]),
+        'm': float(model.params['m'][0][0]),
+        'sigma_obs': float(model.params['sigma_obs'][0][0]),
+        'delta': np.asarray(model.params['delta'][0], dtype=float),
+        'beta': np.asarray(model.params['beta'][0], dtype=float)
+    }
+
+
+def ajustar_prophet(df_prophet, nombre='wti', dir_cache=DIR_CACHE, **params):
+    """
+    Ajusta Prophet reutilizando el modelo guardado cuando es posible.
+
+    ENTRADA:
+        df_prophet: DataFrame con columnas 'ds' y 'y'
+        nombre: identificador de la serie (una caché por serie y configuración)
+        dir_cache: carpeta de la caché
+        **params: argumentos de Prophet(...)
+
+    RETORNA:
+        model: Prophet ajustado
+        modo: 'cache' (sin ajuste), 'calentado' (reajuste desde los parámetros
+              previos) o 'completo'
+    """
+    from prophet import Prophet
+
+    df = preparar_datos(df_prophet)
+    previo, meta = cargar_modelo(nombre, params, dir_cache)
+
+    if previo is not None:
+        n_previo = meta.get('n', 0)
+        if meta.get('huella') == huella_datos(df):
+            return previo, 'cache'
+
+        # Solo se agregaron días al final: el histórico previo es un prefijo
+        if 0 < n_previo < len(df) and meta.get('huella') == huella_datos(df.iloc[:n_previo]):
+            try:
+                model = Prophet(**params).fit(df, init=parametros_iniciales(previo))
+                guardar_modelo(model, df, nombre, params, dir_cache)
+                return model, 'calentado'
+            except (ValueError, RuntimeError, KeyError, IndexError, AttributeError):
+                pass   # p.ej. cambió el número de changepoints: ajuste completo
+
+    model = Prophet(**params).fit(df)
+    guardar_modelo(model, df, nombre, params, dir_cache)
+    return model, 'completo'
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+    import logging
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+    print("=" * 70)
+    print("CACHÉ PERSISTENTE DE MODELOS PROPHET")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range('2022-01-01', periods=900, freq='D')
+    precios = 75 + np.cumsum(rng.normal(0, 1, len(fechas))) + 3 * np.sin(np.arange(900) / 58)
+    df_total = pd.DataFrame({'ds': fechas, 'y': precios})
+    params = dict(daily_seasonality=True, weekly_seasonality=True,
+                  yearly_seasonality=True, changepoint_prior_scale=0.05)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for etiqueta, df in [('Histórico inicial', df_total.iloc[:895]),
+                             ('Mismos datos', df_total.iloc[:895]),
+                             ('+5 días nuevos', df_total)]:
+            inicio = time.time()
+            model, modo = ajustar_prophet(df, nombre='demo', dir_cache=tmp, **params)
+            print(f"  ✓ {etiqueta:<18} modo={modo:<10} {time.time() - inicio:6.2f} s")
+
+        forecast = model.predict(model.make_future_dataframe(periods=10))
+        print(f"\n  ✓ Predicción a 10 días: ${forecast['yhat'].iloc[-1]:.2f}")
+    print("=" * 70)
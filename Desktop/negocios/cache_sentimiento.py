@@ -0,0 +1,215 @@
+"""
+CACHÉ PERSISTENTE DE SCORES DE SENTIMIENTO
+Evita volver a puntuar titulares ya analizados en ejecuciones anteriores
+
+Cada texto se normaliza y se identifica por el hash de su forma normalizada.
+El caché guarda (clave, pos, neu, neg, compound, version) en CSV, donde
+'version' combina la versión de vaderSentiment y el hash del léxico: si el
+analizador o el léxico cambian, las entradas antiguas se descartan solas.
+
+FLUJO:
+    1. Normalizar textos y quedarse con los ÚNICOS
+    2. Buscar todas las claves en el caché en una sola operación
+    3. Puntuar solo los faltantes (motor por lotes)
+    4. Guardar los nuevos y repartir los scores a todas las filas
+
+Para muchos lotes seguidos (pipeline_streaming) se usa CacheSentimiento:
+el archivo se lee una sola vez y cada lote solo agrega sus claves nuevas,
+de modo que el costo por lote no crece con el tamaño del caché.
+"""
+
+import os
+import hashlib
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+import vaderSentiment.vaderSentiment as vader
+
+from sentimiento_lotes import puntuar_textos, COLUMNAS_VADER
+from normalizacion_texto import normalizar_claves
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_CACHE = "base_datos_csv/cache_sentimiento.csv"
+COLUMNAS_CACHE = ['clave', *COLUMNAS_VADER, 'version']
+
+_version_actual = None
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CLAVES Y VERSIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def hash_texto(texto_normalizado):
+    """Hash estable (128 bits) del texto normalizado"""
+    return hashlib.blake2b(texto_normalizado.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def version_analizador():
+    """
+    Identificador de versión del analizador + léxico.
+
+    FORMATO: vader-<versión paquete>-<hash léxico>
+    """
+    global _version_actual
+    if _version_actual is None:
+        try:
+            version_pkg = metadata.version('vaderSentiment')
+        except metadata.PackageNotFoundError:
+            version_pkg = 'desconocida'
+
+        ruta_lexico = os.path.join(os.path.dirname(vader.__file__), 'vader_lexicon.txt')
+        with open(ruta_lexico, 'rb') as f:
+            hash_lexico = hashlib.sha1(f.read()).hexdigest()[:12]
+
+        _version_actual = f"vader-{version_pkg}-{hash_lexico}"
+    return _version_actual
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCIA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def cargar_cache(ruta=RUTA_CACHE):
+    """
+    Carga el caché vigente indexado por clave.
+
+    RETORNA:
+        df_cache: DataFrame (index=clave, columnas pos/neu/neg/compound)
+        hay_obsoletas: True si el archivo tenía entradas de otra versión
+    """
+    vacio = pd.DataFrame(columns=list(COLUMNAS_VADER), dtype=np.float64)
+    vacio.index.name = 'clave'
+
+    if not os.path.exists(ruta):
+        return vacio, False
+
+    try:
+        df = pd.read_csv(ruta)
+    except Exception:
+        return vacio, True
+
+    vigentes = df['version'] == version_analizador()
+    df = df[vigentes].drop_duplicates(subset=['clave'], keep='last')
+    df_cache = df.set_index('clave')[list(COLUMNAS_VADER)]
+    return df_cache, not vigentes.all()
+
+
+def _guardar_cache(df_nuevas, df_cache, reescribir, ruta):
+    """Agrega entradas nuevas (o reescribe el archivo si había obsoletas)"""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+
+    if reescribir:
+        df_total = pd.concat([df_cache.reset_index(), df_nuevas], ignore_index=True)
+        df_total['version'] = version_analizador()
+        df_total[COLUMNAS_CACHE].to_csv(ruta, index=False)
+    elif len(df_nuevas):
+        df_nuevas = df_nuevas.assign(version=version_analizador())
+        df_nuevas[COLUMNAS_CACHE].to_csv(ruta, mode='a', index=False,
+                                         header=not os.path.exists(ruta))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# API PÚBLICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+class CacheSentimiento:
+    """Caché en memoria (clave → scores) cargado una sola vez desde el CSV"""
+
+    def __init__(self, ruta=RUTA_CACHE):
+        self.ruta = ruta
+        df_cache, hay_obsoletas = cargar_cache(ruta)
+        self._scores = dict(zip(df_cache.index, df_cache.to_numpy(dtype=np.float64)))
+
+        # Las entradas de otra versión se descartan del archivo una sola vez
+        if hay_obsoletas:
+            _guardar_cache(pd.DataFrame(columns=['clave', *COLUMNAS_VADER]), df_cache, True, ruta)
+
+    def __len__(self):
+        return len(self._scores)
+
+    def puntuar(self, textos, **kwargs_lotes):
+        """
+        Scores VADER de un lote (solo se puntúan textos que no están en caché).
+
+        ENTRADA:
+            textos: Series, lista o arreglo de textos
+            kwargs_lotes: parámetros para sentimiento_lotes.puntuar_textos
+
+        RETORNA:
+            dict con arreglos NumPy 'pos', 'neu', 'neg', 'compound'
+            (mismo orden que la entrada)
+        """
+        normalizados = normalizar_claves(textos)
+        if normalizados.empty:
+            return {col: np.empty(0, dtype=np.float64) for col in COLUMNAS_VADER}
+
+        # 1. Únicos: cada titular repetido se resuelve una sola vez
+        codigos, unicos = pd.factorize(normalizados)
+        claves = [hash_texto(t) for t in unicos]
+
+        # 2. Búsqueda en el diccionario: O(textos del lote)
+        ausente = np.full(len(COLUMNAS_VADER), np.nan)
+        matriz = np.array([self._scores.get(c, ausente) for c in claves], dtype=np.float64)
+        faltantes = np.flatnonzero(np.isnan(matriz[:, 0]))
+
+        # 3. Puntuar solo los faltantes y agregarlos al archivo y a la memoria
+        if len(faltantes):
+            scores = puntuar_textos([unicos[i] for i in faltantes], **kwargs_lotes)
+            for j, col in enumerate(COLUMNAS_VADER):
+                matriz[faltantes, j] = scores[col]
+
+            df_nuevas = pd.DataFrame(matriz[faltantes], columns=list(COLUMNAS_VADER))
+            df_nuevas.insert(0, 'clave', [claves[i] for i in faltantes])
+            _guardar_cache(df_nuevas, None, False, self.ruta)
+            self._scores.update(zip(df_nuevas['clave'], matriz[faltantes]))
+
+        # 4. Repartir a todas las filas
+        matriz = matriz[codigos]
+        return {col: matriz[:, j] for j, col in enumerate(COLUMNAS_VADER)}
+
+
+def puntuar_con_cache(textos, ruta=RUTA_CACHE, cache=None, **kwargs_lotes):
+    """
+    Scores VADER usando el caché persistente (solo se puntúan textos nuevos).
+
+    ENTRADA:
+        textos: Series, lista o arreglo de textos
+        ruta: archivo CSV del caché
+        cache: CacheSentimiento ya cargado (None = leer el archivo ahora)
+        kwargs_lotes: parámetros para sentimiento_lotes.puntuar_textos
+
+    RETORNA:
+        dict con arreglos NumPy 'pos', 'neu', 'neg', 'compound'
+        (mismo orden que la entrada)
+    """
+    if cache is None:
+        cache = CacheSentimiento(ruta)
+    return cache.puntuar(textos, **kwargs_lotes)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    titulares = [
+        "OPEP anuncia recorte de producción, precios del petróleo suben",
+        "Oil prices surge as OPEC cuts output",
+        "Crude slumps on weak demand fears"
+    ] * 1000
+
+    print("=" * 70)
+    print("CACHÉ DE SENTIMIENTO")
+    print("=" * 70)
+    print(f"\n  Versión analizador: {version_analizador()}")
+
+    for intento in (1, 2):
+        inicio = time.time()
+        scores = puntuar_con_cache(titulares)
+        print(f"  Ejecución {intento}: {len(titulares):,} textos en {time.time() - inicio:.3f} s")
+
+    print(f"  ✓ Caché: {os.path.abspath(RUTA_CACHE)}")
+    print("=" * 70)
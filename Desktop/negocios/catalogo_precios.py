@@ -0,0 +1,150 @@
+"""
+CATÁLOGO DE PRECIOS (UNIVERSO DE TICKERS)
+Carga todos los CSV de precios de base_datos_csv en una sola tabla
+
+Recorre las carpetas de precios que generan 1_descargar_datos.py y
+SISTEMA_COMPLETO_TODO_EN_UNO.py:
+
+    base_datos_csv/petroleo/{wti,brent}.csv
+    base_datos_csv/empresas_usa/{TICKER}.csv
+    base_datos_csv/empresas_peru/{TICKER con "." → "_"}.csv
+
+y arma una matriz [fecha × ticker] alineada por fecha (sin zona horaria),
+aceptando tanto el formato propio (fecha, precio_cierre, ...) como el
+formato crudo de yfinance (Date, Close, ...).
+"""
+
+import os
+import glob
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+BASE_DIR = "base_datos_csv"
+CARPETAS_PRECIOS = ['petroleo', 'empresas_usa', 'empresas_peru']
+ARCHIVOS_EXCLUIDOS = {'catalogo.csv'}
+
+# Nombre de columna en formato propio → alternativas en formato yfinance
+_ALIAS_COLUMNAS = {
+    'fecha': ['fecha', 'Date', 'Datetime', 'date'],
+    'precio_cierre': ['precio_cierre', 'Close', 'close', 'Adj Close'],
+    'precio_apertura': ['precio_apertura', 'Open', 'open'],
+    'precio_maximo': ['precio_maximo', 'High', 'high'],
+    'precio_minimo': ['precio_minimo', 'Low', 'low'],
+    'volumen': ['volumen', 'Volume', 'volume']
+}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# DESCUBRIMIENTO Y LECTURA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def listar_tickers(base_dir=BASE_DIR, carpetas=CARPETAS_PRECIOS):
+    """
+    Archivos de precios disponibles.
+
+    RETORNA:
+        dict ticker → ruta (ticker = nombre de archivo en mayúsculas, p.ej.
+        'WTI', 'XOM', 'PETRO1_LM')
+    """
+    tickers = {}
+    for carpeta in carpetas:
+        for ruta in sorted(glob.glob(os.path.join(base_dir, carpeta, '*.csv'))):
+            if os.path.basename(ruta) in ARCHIVOS_EXCLUIDOS:
+                continue
+            ticker = os.path.splitext(os.path.basename(ruta))[0].upper()
+            tickers[ticker] = ruta
+    return tickers
+
+
+def _buscar_columna(df, columna):
+    for alias in _ALIAS_COLUMNAS.get(columna, [columna]):
+        if alias in df.columns:
+            return alias
+    raise KeyError(f"Columna '{columna}' no encontrada (columnas: {list(df.columns)})")
+
+
+def normalizar_fechas(fechas):
+    """Fechas a datetime64 diario sin zona horaria"""
+    fechas = pd.to_datetime(pd.Series(fechas), utc=True, errors='coerce')
+    return fechas.dt.tz_localize(None).dt.normalize()
+
+
+def leer_serie_precio(ruta, columna='precio_cierre'):
+    """
+    Serie de precios de un archivo (índice = fecha diaria, última fila por día).
+    """
+    df = pd.read_csv(ruta)
+    col_fecha = _buscar_columna(df, 'fecha')
+    col_valor = _buscar_columna(df, columna)
+
+    serie = pd.Series(pd.to_numeric(df[col_valor], errors='coerce').values,
+                      index=normalizar_fechas(df[col_fecha]).values)
+    serie = serie[serie.index.notna()]
+    serie = serie[~serie.index.duplicated(keep='last')].sort_index()
+    serie.index.name = 'fecha'
+    return serie
+
+
+def cargar_universo(base_dir=BASE_DIR, columna='precio_cierre', tickers=None):
+    """
+    Matriz de precios [fecha × ticker] de todo el universo.
+
+    ENTRADA:
+        base_dir: carpeta raíz de los CSV
+        columna: columna a cargar (precio_cierre, volumen, ...)
+        tickers: subconjunto de tickers (None = todos)
+
+    RETORNA:
+        DataFrame (índice = fechas ordenadas, una columna por ticker, NaN
+        donde un ticker no cotizó)
+    """
+    rutas = listar_tickers(base_dir)
+    if tickers is not None:
+        rutas = {t: rutas[t] for t in tickers if t in rutas}
+
+    series = {}
+    for ticker, ruta in rutas.items():
+        try:
+            series[ticker] = leer_serie_precio(ruta, columna)
+        except (KeyError, ValueError, pd.errors.EmptyDataError) as e:
+            print(f"  ⚠️ {ticker}: no se pudo leer ({e})")
+
+    if not series:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='fecha'))
+
+    universo = pd.DataFrame(series).sort_index()
+    universo.index.name = 'fecha'
+    return universo
+
+
+def huella_serie(*arreglos):
+    """Hash corto del contenido de uno o más arreglos (para invalidar cachés)"""
+    h = hashlib.blake2b(digest_size=12)
+    for arreglo in arreglos:
+        arreglo = np.ascontiguousarray(arreglo)
+        h.update(str(arreglo.dtype).encode())
+        h.update(arreglo.tobytes())
+    return h.hexdigest()
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("CATÁLOGO DE PRECIOS")
+    print("=" * 70)
+
+    universo = cargar_universo()
+    print(f"\n  ✓ Tickers: {len(universo.columns)}")
+    if len(universo):
+        print(f"  ✓ Fechas: {universo.index.min().date()} a {universo.index.max().date()} "
+              f"({len(universo)} filas)")
+        print(f"\n{universo.tail(3).round(2).to_string()}")
+    print("=" * 70)
@@ -48,11 +48,17 @@ try:
     import numpy as np
     import yfinance as yf
     from prophet import Prophet
+    from cache_modelos import ajustar_prophet
+    from registro_pronosticos import registrar_pronostico
+    from indicadores_tecnicos import calcular_indicadores
+    from configuracion_prophet import parametros_prophet, predecir_horizonte
     import matplotlib.pyplot as plt
     import seaborn as sns
     import requests
     from bs4 import BeautifulSoup
-    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    from sentimiento_lotes import clasificar_compound
+    from cache_sentimiento import puntuar_con_cache
+    from normalizacion_texto import normalizar_serie
     print("✓ Bibliotecas importadas correctamente")
 except ImportError as e:
     print(f"❌ Error: {e}")
@@ -271,17 +277,8 @@ def limpiar_textos(df_noticias):
     print("MÓDULO 3: LIMPIEZA DE TEXTOS")
     print("="*80)
     
-    import re
-    
-    def limpiar_texto(texto):
-        texto = str(texto).lower()
-        texto = re.sub(r'http\S+', '', texto)  # Remover URLs
-        texto = re.sub(r'@\w+', '', texto)      # Remover menciones
-        texto = re.sub(r'#\w+', '', texto)      # Remover hashtags
-        texto = re.sub(r'\s+', ' ', texto)      # Normalizar espacios
-        return texto.strip()
-    
-    df_noticias['titulo_limpio'] = df_noticias['titulo'].apply(limpiar_texto)
+    # Una sola pasada vectorizada sobre la columna (patrones precompilados)
+    df_noticias['titulo_limpio'] = normalizar_serie(df_noticias['titulo'])
     
     print(f"  ✓ {len(df_noticias)} textos limpiados")
     print(f"  Ejemplo original: {df_noticias['titulo'].iloc[0][:80]}...")
@@ -310,27 +307,14 @@ def analizar_sentimiento(df_noticias):
     print("MÓDULO 4: ANÁLISIS DE SENTIMIENTO")
     print("="*80)
     
-    analyzer = SentimentIntensityAnalyzer()
-    
     print("\n[4.1] Calculando scores VADER...")
     
-    # Calcular sentimiento
-    def get_sentiment(texto):
-        return analyzer.polarity_scores(str(texto))['compound']
-    
-    df_noticias['score'] = df_noticias['titulo_limpio'].apply(get_sentiment)
+    # Calcular sentimiento (todo el lote en una llamada, con caché persistente)
+    df_noticias['score'] = puntuar_con_cache(df_noticias['titulo_limpio'])['compound']
     df_noticias['score_ponderado'] = df_noticias['score'] * df_noticias['peso']
     
     # Clasificar
-    def clasificar(score):
-        if score >= 0.05:
-            return "POSITIVO"
-        elif score <= -0.05:
-            return "NEGATIVO"
-        else:
-            return "NEUTRAL"
-    
-    df_noticias['clasificacion'] = df_noticias['score'].apply(clasificar)
+    df_noticias['clasificacion'] = clasificar_compound(df_noticias['score'])
     
     # Estadísticas
     sentimiento_promedio = df_noticias['score_ponderado'].mean()
@@ -362,12 +346,13 @@ def analizar_sentimiento(df_noticias):
 # MÓDULO 5: MODELO PREDICTIVO CON PROPHET
 # ══════════════════════════════════════════════════════════════════════════════
 
-def predecir_precios(df_wti, dias=10):
+def predecir_precios(df_wti, dias=10, perfil='completo'):
     """
     Predice precios futuros usando Facebook Prophet.
     
     MODELO: Prophet (series temporales con estacionalidad)
     HORIZONTE: días futuros
+    PERFIL: 'completo' o 'rapido' (ver configuracion_prophet)
     
     RETORNA:
         forecast: DataFrame con predicciones
@@ -385,20 +370,15 @@ def predecir_precios(df_wti, dias=10):
         df_prophet['ds'] = df_prophet['ds'].dt.tz_localize(None)
     
     print(f"\n[5.2] Entrenando modelo...")
-    model = Prophet(
-        daily_seasonality=True,
-        weekly_seasonality=True,
-        yearly_seasonality=True,
-        changepoint_prior_scale=0.05
+    model, modo = ajustar_prophet(
+        df_prophet,
+        nombre='wti',
+        **parametros_prophet(df_prophet['ds'], perfil, ticker='WTI')
     )
-    model.fit(df_prophet)
+    print(f"  ✓ Modelo listo (modo: {modo})")
     
     print(f"\n[5.3] Generando predicción ({dias} días)...")
-    future = model.make_future_dataframe(periods=dias)
-    forecast = model.predict(future)
-    
-    # Extraer predicciones futuras
-    forecast_futuro = forecast[forecast['ds'] > df_prophet['ds'].max()].copy()
+    forecast_futuro = predecir_horizonte(model, dias)
     forecast_futuro = forecast_futuro[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
     forecast_futuro.columns = ['fecha', 'prediccion', 'limite_inf', 'limite_sup']
     
@@ -413,6 +393,8 @@ def predecir_precios(df_wti, dias=10):
     
     # Guardar
     forecast_futuro.to_csv(f"{DATABASE_DIR}/prediccion_prophet.csv", index=False)
+    registrar_pronostico(forecast_futuro, 'WTI', f'prophet_codigo_{perfil}',
+                         df_prophet['ds'].max(), precio_actual)
     
     return forecast_futuro, cambio
 
@@ -498,23 +480,13 @@ def generar_recomendacion_final(df_wti, cambio_prediccion, sentimiento, escenari
     
     # === Calcular Indicadores Técnicos ===
     print("\n[7.1] Calculando indicadores técnicos...")
-    df_wti['SMA_20'] = df_wti['precio'].rolling(window=20).mean()
-    df_wti['SMA_50'] = df_wti['precio'].rolling(window=50).mean()
-    
-    # RSI
-    delta = df_wti['precio'].diff()
-    ganancia = delta.where(delta > 0, 0)
-    perdida = -delta.where(delta < 0, 0)
-    avg_ganancia = ganancia.rolling(window=14).mean()
-    avg_perdida = perdida.rolling(window=14).mean()
-    rs = avg_ganancia / avg_perdida
-    rsi = 100 - (100 / (1 + rs))
-    df_wti['RSI'] = rsi
+    # SMA 20/50, RSI de Wilder y demás indicadores (indicadores_tecnicos)
+    df_wti = calcular_indicadores(df_wti)
     
     precio_actual = df_wti['precio'].iloc[-1]
     sma20 = df_wti['SMA_20'].iloc[-1]
     sma50 = df_wti['SMA_50'].iloc[-1]
-    rsi_actual = rsi.iloc[-1]
+    rsi_actual = df_wti['RSI'].iloc[-1]
     
     # Tendencia
     if precio_actual > sma20 > sma50:
@@ -908,7 +880,7 @@ import nltk
 import os
 import matplotlib.pyplot as plt
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
+from normalizacion_texto import preprocesar_tfidf
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -916,7 +888,6 @@ from sklearn.metrics.pairwise import cosine_similarity
 os.makedirs("resultadocodigo", exist_ok=True)
 
 # Descargar recursos NLTK la primera vez
-nltk.download('punkt')
 nltk.download('stopwords')
 
 # ---------- Cargar datos ----------
@@ -928,16 +899,8 @@ df['Texto'] = df['Texto'].str.lower()
 # ---------- Limpieza general del texto ----------
 stop_words = set(stopwords.words('spanish'))
 
-def limpiar_texto(texto):
-    \"\"\"
-    Limpia el texto eliminando stopwords y puntuación.
-    Devuelve el texto limpio.
-    \"\"\"
-    tokens = word_tokenize(texto)
-    tokens_limpios = [word for word in tokens if word.isalpha() and word not in stop_words]
-    return " ".join(tokens_limpios)
-
-df['texto_limpio'] = df['Texto'].apply(limpiar_texto)
+# Limpieza vectorizada de toda la columna (sin stopwords ni puntuación)
+df['texto_limpio'] = preprocesar_tfidf(df['Texto'], stop_words)
 
 # ---------- Vectorización TF-IDF ----------
 tfidf = TfidfVectorizer()
@@ -950,7 +913,7 @@ def recomendar(texto_usuario, top_n=5):
     calcula su similitud con todas las noticias del dataset
     y devuelve las más similares.
     \"\"\"
-    texto_usuario_limpio = limpiar_texto(texto_usuario)
+    texto_usuario_limpio = preprocesar_tfidf([texto_usuario], stop_words).iloc[0]
     vector_usuario = tfidf.transform([texto_usuario_limpio])
     similitudes = cosine_similarity(vector_usuario, matriz_tfidf).flatten()
     indices_top = similitudes.argsort()[-top_n:][::-1]
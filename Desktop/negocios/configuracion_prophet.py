@@ -0,0 +1,186 @@
+"""
+CONFIGURACIÓN DE PROPHET: PERFILES COMPLETO Y RÁPIDO
+Parámetros por perfil y predicción solo del horizonte futuro
+
+    completo  → los parámetros de siempre (estacionalidad diaria, semanal y
+                anual; 1000 muestras para los intervalos)
+    rapido    → solo las estacionalidades que la frecuencia e historia de
+                los datos permiten estimar, ajuste MAP (mcmc_samples=0) y
+                sin muestreo: los intervalos se calculan analíticamente
+
+ESTACIONALIDADES SOPORTADAS:
+    diaria  : requiere datos intradía (paso < 1 día); con barras diarias el
+              componente es constante y solo agrega tiempo de ajuste
+    semanal : requiere paso ≤ 1 día y al menos 2 semanas de historia
+    anual   : requiere al menos 2 años de historia
+
+INTERVALO ANALÍTICO:
+    Prophet simula la tendencia futura con changepoints nuevos (Poisson de
+    tasa S por unidad de tiempo escalado, saltos Laplace(0, λ), λ = media
+    |δ|) más ruido normal σ_obs. La varianza de ese proceso en el tiempo
+    escalado t > 1 es
+
+        Var(t) = σ_obs² + 2·S·λ²·(t − 1)³ / 3      (en escala de y / y_scale)
+
+    y el intervalo es yhat ± z·√Var·y_scale con z del interval_width del
+    modelo (0.80 por defecto, como Prophet).
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERFILES
+# ══════════════════════════════════════════════════════════════════════════════
+
+PERFILES = {
+    'completo': {
+        'daily_seasonality': True,
+        'weekly_seasonality': True,
+        'yearly_seasonality': True,
+        'changepoint_prior_scale': 0.05
+    },
+    'rapido': {
+        'changepoint_prior_scale': 0.05,
+        'mcmc_samples': 0,
+        'uncertainty_samples': 0
+    }
+}
+
+
+def estacionalidades_soportadas(fechas):
+    """
+    Estacionalidades que la frecuencia y la longitud de la historia permiten.
+
+    RETORNA:
+        dict con daily_seasonality, weekly_seasonality, yearly_seasonality (bool)
+    """
+    fechas = pd.Series(pd.to_datetime(fechas)).dropna().drop_duplicates().sort_values()
+    if len(fechas) < 2:
+        return {'daily_seasonality': False, 'weekly_seasonality': False,
+                'yearly_seasonality': False}
+
+    paso = fechas.diff().median()
+    historia = fechas.iloc[-1] - fechas.iloc[0]
+    return {
+        'daily_seasonality': bool(paso < pd.Timedelta(days=1) and historia >= pd.Timedelta(days=2)),
+        'weekly_seasonality': bool(paso <= pd.Timedelta(days=1) and historia >= pd.Timedelta(days=14)),
+        'yearly_seasonality': bool(historia >= pd.Timedelta(days=730))
+    }
+
+
+def parametros_prophet(fechas=None, perfil='completo', uncertainty_samples=None, ticker=None):
+    """
+    Argumentos para Prophet(...) según el perfil.
+
+    ENTRADA:
+        fechas: fechas del entrenamiento (necesarias para el perfil 'rapido')
+        perfil: 'completo' o 'rapido'
+        uncertainty_samples: reemplaza el valor del perfil (0 = intervalo analítico)
+        ticker: si tiene parámetros ajustados (busqueda_hiperparametros), se
+                aplican sobre los del perfil
+    """
+    if perfil not in PERFILES:
+        raise ValueError(f"Perfil desconocido: '{perfil}' (opciones: {', '.join(PERFILES)})")
+
+    parametros = dict(PERFILES[perfil])
+    if perfil == 'rapido':
+        if fechas is None:
+            raise ValueError("El perfil 'rapido' necesita las fechas de entrenamiento")
+        parametros.update(estacionalidades_soportadas(fechas))
+    if ticker is not None:
+        from busqueda_hiperparametros import cargar_mejores_parametros
+        parametros.update(cargar_mejores_parametros(ticker, 'prophet') or {})
+    if uncertainty_samples is not None:
+        parametros['uncertainty_samples'] = int(uncertainty_samples)
+    return parametros
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PREDICCIÓN DEL HORIZONTE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def intervalo_analitico(model, forecast):
+    """
+    Agrega yhat_lower / yhat_upper al forecast de un modelo con tendencia
+    lineal, a partir de la varianza del proceso de changepoints futuro.
+    """
+    t = ((forecast['ds'] - model.start) / model.t_scale).to_numpy(dtype=np.float64)
+    S = len(model.changepoints_t)
+    lam = np.mean(np.abs(model.params['delta'][0])) + 1e-8
+    sigma_obs = float(model.params['sigma_obs'][0][0])
+
+    exceso = np.clip(t - 1, 0, None)
+    varianza = sigma_obs ** 2 + 2 * S * lam ** 2 * exceso ** 3 / 3
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+
+    ancho = z * np.sqrt(varianza) * model.y_scale
+    forecast = forecast.copy()
+    forecast['yhat_lower'] = forecast['yhat'] - ancho
+    forecast['yhat_upper'] = forecast['yhat'] + ancho
+    return forecast
+
+
+def predecir_horizonte(model, dias, frecuencia='D'):
+    """
+    Predice solo las `dias` fechas futuras (sin recalcular el histórico).
+
+    Si el modelo no muestrea incertidumbre (uncertainty_samples=0), los
+    intervalos se calculan con intervalo_analitico.
+
+    RETORNA:
+        DataFrame con ds, yhat, yhat_lower, yhat_upper (y componentes)
+    """
+    futuro = model.make_future_dataframe(periods=dias, freq=frecuencia, include_history=False)
+    forecast = model.predict(futuro)
+    if 'yhat_lower' not in forecast.columns:
+        forecast = intervalo_analitico(model, forecast)
+    return forecast
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import logging
+    from prophet import Prophet
+
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+    print("=" * 70)
+    print("PERFILES DE PROPHET: COMPLETO vs RÁPIDO")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range('2020-01-01', periods=1250)
+    df = pd.DataFrame({'ds': fechas, 'y': 70 + np.cumsum(rng.normal(0, 1, len(fechas)))})
+
+    resultados = {}
+    for perfil in PERFILES:
+        parametros = parametros_prophet(df['ds'], perfil)
+        inicio = time.perf_counter()
+        model = Prophet(**parametros).fit(df)
+        ajuste = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        if perfil == 'completo':
+            forecast = model.predict(model.make_future_dataframe(periods=10))
+            forecast = forecast[forecast['ds'] > df['ds'].max()]
+        else:
+            forecast = predecir_horizonte(model, 10)
+        prediccion = time.perf_counter() - inicio
+        resultados[perfil] = forecast
+
+        print(f"\n  ✓ {perfil:<9} ajuste {ajuste:5.2f} s, predicción {prediccion:5.2f} s")
+        print(f"    {parametros}")
+
+    completo, rapido = resultados['completo'], resultados['rapido']
+    print(f"\n  ✓ yhat día 10:   completo {completo['yhat'].iloc[-1]:.2f}, "
+          f"rápido {rapido['yhat'].iloc[-1]:.2f}")
+    print(f"  ✓ ancho día 10:  completo "
+          f"{(completo['yhat_upper'] - completo['yhat_lower']).iloc[-1]:.2f}, rápido "
+          f"{(rapido['yhat_upper'] - rapido['yhat_lower']).iloc[-1]:.2f}")
+    print("=" * 70)
@@ -0,0 +1,319 @@
+"""
+MOTOR DE CORRELACIÓN PRECIO–SENTIMIENTO CON REZAGOS
+Correlaciones móviles para una grilla de rezagos y ventanas, todo el universo
+
+En lugar de un único Pearson (precio vs rolling_7d) por ejecución, calcula
+la correlación móvil para cada combinación (ticker, ventana, rezago) en una
+sola pasada vectorizada:
+
+    1. Se arma un tensor [fecha × ticker × rezago] con los pares (x, y)
+       válidos (sentimiento desplazado `rezago` filas)
+    2. Se calculan UNA vez las sumas acumuladas de n, x, y, x², y², xy
+    3. Cada ventana sale de restar sumas acumuladas: O(1) por celda
+
+CONVENCIÓN DE REZAGO:
+    rezago = +k → corr(x_t, sentimiento_{t-k}): el sentimiento ADELANTA al precio
+    rezago = -k → corr(x_t, sentimiento_{t+k}): el precio adelanta al sentimiento
+
+Los resultados se guardan por ticker (npz) con una clave por (ventana,
+rezago) y una huella de los datos; si precios y sentimiento no cambiaron,
+se leen del caché.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import cargar_universo, normalizar_fechas, huella_serie
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+REZAGOS = tuple(range(-10, 11))
+VENTANAS = (20, 60, 120)
+DIR_CACHE = "base_datos_csv/cache_correlaciones"
+
+# ══════════════════════════════════════════════════════════════════════════════
+# NÚCLEO VECTORIZADO
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _desplazar(y, k):
+    """y desplazado k filas hacia abajo (k>0) o arriba (k<0), con NaN de relleno"""
+    salida = np.full_like(y, np.nan)
+    if k > 0:
+        salida[k:] = y[:-k]
+    elif k < 0:
+        salida[:k] = y[-k:]
+    else:
+        salida[:] = y
+    return salida
+
+
+def _acumuladas(x, y_rezagos):
+    """
+    Sumas acumuladas (con fila inicial en 0) de n, x, y, x², y², xy.
+
+    ENTRADA:
+        x: [T × K] variable de precio por ticker
+        y_rezagos: [T × L] sentimiento desplazado para cada rezago
+
+    RETORNA:
+        tupla de 6 arreglos [T+1 × K × L]
+    """
+    X = x[:, :, None]
+    Y = y_rezagos[:, None, :]
+    valido = np.isfinite(X) & np.isfinite(Y)
+
+    X0 = np.where(valido, X, 0.0)
+    Y0 = np.where(valido, Y, 0.0)
+
+    def acumular(a):
+        salida = np.zeros((a.shape[0] + 1,) + a.shape[1:])
+        np.cumsum(a, axis=0, out=salida[1:])
+        return salida
+
+    return tuple(acumular(a) for a in (valido.astype(np.float64), X0, Y0, X0 * X0, Y0 * Y0, X0 * Y0))
+
+
+def _correlacion_ventana(acumuladas, ventana, min_periodos):
+    """
+    Correlación de Pearson móvil [T × K × L] a partir de las sumas acumuladas
+    (mismas reglas que Series.rolling(ventana, min_periods).corr).
+    """
+    T = acumuladas[0].shape[0] - 1
+    hasta = np.arange(1, T + 1)
+    desde = np.clip(hasta - ventana, 0, None)
+    n, sx, sy, sxx, syy, sxy = (a[hasta] - a[desde] for a in acumuladas)
+
+    cov = n * sxy - sx * sy
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    denominador = np.sqrt(np.clip(var_x, 0, None) * np.clip(var_y, 0, None))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.where((n >= min_periodos) & (denominador > 1e-12), cov / denominador, np.nan)
+
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlaciones_rezagadas(precios, sentimiento, rezagos=REZAGOS, ventanas=VENTANAS,
+                            variable='precio', min_periodos=None):
+    """
+    Correlaciones móviles precio–sentimiento para toda la grilla (sin caché).
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker]
+        sentimiento: Series indexada por fecha (p.ej. rolling_7d diario)
+        rezagos: rezagos en filas (días hábiles del calendario de precios)
+        ventanas: tamaños de ventana en filas
+        variable: 'precio' (nivel, como analizar_sentimiento_mercado) o 'retorno'
+        min_periodos: pares válidos mínimos por ventana (None = ventana // 2)
+
+    RETORNA:
+        dict con 'fechas', 'tickers', 'rezagos' y 'correlaciones'
+        ({ventana: arreglo [fecha × ticker × rezago]})
+    """
+    precios = precios.sort_index()
+    x = precios.to_numpy(dtype=np.float64, copy=True)
+    if variable == 'retorno':
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x[1:] = x[1:] / x[:-1] - 1.0
+        x[0] = np.nan
+
+    y = (sentimiento.groupby(normalizar_fechas(sentimiento.index).values).mean()
+         .reindex(precios.index).to_numpy(dtype=np.float64))
+
+    # Centrar reduce la cancelación numérica en las sumas de cuadrados
+    x = x - np.nanmean(x, axis=0) if np.isfinite(x).any() else x
+    y = y - np.nanmean(y) if np.isfinite(y).any() else y
+
+    y_rezagos = np.column_stack([_desplazar(y, k) for k in rezagos])
+    acumuladas = _acumuladas(x, y_rezagos)
+
+    correlaciones = {}
+    for ventana in ventanas:
+        minimo = max(3, ventana // 2) if min_periodos is None else min_periodos
+        correlaciones[ventana] = _correlacion_ventana(acumuladas, ventana, minimo)
+
+    return {
+        'fechas': precios.index,
+        'tickers': list(precios.columns),
+        'rezagos': list(rezagos),
+        'correlaciones': correlaciones
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHÉ POR (TICKER, VENTANA, REZAGO)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _clave(ventana, rezago):
+    return f"v{ventana}_r{rezago}"
+
+
+def _ruta_cache(dir_cache, ticker):
+    return os.path.join(dir_cache, f"{ticker}.npz")
+
+
+def _leer_cache(ruta, huella, claves):
+    """Arreglos guardados si la huella coincide y están todas las claves"""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with np.load(ruta) as datos:
+            if str(datos['huella']) != huella or not all(c in datos.files for c in claves):
+                return None
+            return {c: datos[c] for c in claves}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _guardar_cache(ruta, huella, arreglos):
+    """Combina con las claves ya guardadas para la misma huella"""
+    previos = {}
+    if os.path.exists(ruta):
+        try:
+            with np.load(ruta) as datos:
+                if str(datos['huella']) == huella:
+                    previos = {c: datos[c] for c in datos.files if c != 'huella'}
+        except (OSError, ValueError, KeyError):
+            pass
+    previos.update(arreglos)
+    np.savez_compressed(ruta, huella=np.array(huella), **previos)
+
+
+def escanear_correlaciones(precios, sentimiento, rezagos=REZAGOS, ventanas=VENTANAS,
+                           variable='precio', min_periodos=None, dir_cache=DIR_CACHE):
+    """
+    Igual que correlaciones_rezagadas pero con caché por ticker en disco.
+
+    Solo los tickers cuyo precio, calendario o sentimiento cambió (o que no
+    tienen alguna combinación pedida) se recalculan, juntos en una pasada.
+    """
+    os.makedirs(dir_cache, exist_ok=True)
+    precios = precios.sort_index()
+    fechas = precios.index
+    claves = [_clave(v, r) for v in ventanas for r in rezagos]
+
+    y = (sentimiento.groupby(normalizar_fechas(sentimiento.index).values).mean()
+         .reindex(fechas).to_numpy(dtype=np.float64))
+    base = huella_serie(fechas.values.astype('datetime64[ns]').astype(np.int64), y,
+                        np.frombuffer(variable.encode(), dtype=np.uint8),
+                        np.array([-1 if min_periodos is None else min_periodos]))
+
+    correlaciones = {v: np.full((len(fechas), len(precios.columns), len(rezagos)), np.nan)
+                     for v in ventanas}
+    huellas, pendientes = {}, []
+
+    for j, ticker in enumerate(precios.columns):
+        huellas[ticker] = huella_serie(np.frombuffer(base.encode(), dtype=np.uint8),
+                                       precios[ticker].to_numpy(dtype=np.float64))
+        guardado = _leer_cache(_ruta_cache(dir_cache, ticker), huellas[ticker], claves)
+        if guardado is None:
+            pendientes.append(ticker)
+            continue
+        for v in ventanas:
+            for i, r in enumerate(rezagos):
+                correlaciones[v][:, j, i] = guardado[_clave(v, r)]
+
+    if pendientes:
+        nuevo = correlaciones_rezagadas(precios[pendientes], sentimiento, rezagos, ventanas,
+                                        variable, min_periodos)
+        for jp, ticker in enumerate(pendientes):
+            j = precios.columns.get_loc(ticker)
+            arreglos = {}
+            for v in ventanas:
+                correlaciones[v][:, j, :] = nuevo['correlaciones'][v][:, jp, :]
+                for i, r in enumerate(rezagos):
+                    arreglos[_clave(v, r)] = nuevo['correlaciones'][v][:, jp, i].astype(np.float32)
+            _guardar_cache(_ruta_cache(dir_cache, ticker), huellas[ticker], arreglos)
+
+    return {
+        'fechas': fechas,
+        'tickers': list(precios.columns),
+        'rezagos': list(rezagos),
+        'correlaciones': correlaciones,
+        'recalculados': pendientes
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RESÚMENES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def tabla_actual(resultado):
+    """
+    Última correlación válida por (ticker, ventana, rezago) en formato largo.
+
+    RETORNA:
+        DataFrame con ticker, ventana, rezago, correlacion, fecha
+    """
+    filas = []
+    fechas = resultado['fechas']
+    for ventana, corr in resultado['correlaciones'].items():
+        valido = np.isfinite(corr)
+        # Índice de la última fila válida por (ticker, rezago)
+        ultima = np.where(valido.any(axis=0),
+                          len(fechas) - 1 - np.argmax(valido[::-1], axis=0), -1)
+        for j, ticker in enumerate(resultado['tickers']):
+            for i, rezago in enumerate(resultado['rezagos']):
+                t = ultima[j, i]
+                filas.append({
+                    'ticker': ticker, 'ventana': ventana, 'rezago': rezago,
+                    'correlacion': corr[t, j, i] if t >= 0 else np.nan,
+                    'fecha': fechas[t] if t >= 0 else pd.NaT
+                })
+    return pd.DataFrame(filas)
+
+
+def mejor_rezago(resultado):
+    """Rezago con mayor |correlación| actual por (ticker, ventana)"""
+    tabla = tabla_actual(resultado).dropna(subset=['correlacion'])
+    if tabla.empty:
+        return tabla
+    idx = tabla['correlacion'].abs().groupby([tabla['ticker'], tabla['ventana']]).idxmax()
+    return tabla.loc[idx.values].reset_index(drop=True)
+
+
+def escanear_universo(sentimiento, base_dir="base_datos_csv", **kwargs):
+    """Escanea todos los CSV de precios del universo contra la serie de sentimiento"""
+    precios = cargar_universo(base_dir)
+    return escanear_correlaciones(precios, sentimiento, **kwargs)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 70)
+    print("CORRELACIÓN PRECIO–SENTIMIENTO CON REZAGOS")
+    print("=" * 70)
+
+    ruta_sentimiento = "base_datos_csv/sentimiento_diario_serie.csv"
+    if os.path.exists(ruta_sentimiento):
+        from agregados_sentimiento import cargar_serie_diaria
+        df_diario = cargar_serie_diaria(ruta_sentimiento)
+        sentimiento = df_diario.set_index('fecha')['rolling_7d']
+        precios = cargar_universo()
+    else:
+        print("\n  ⚠️ Sin agregados de sentimiento: usando datos sintéticos")
+        rng = np.random.default_rng(0)
+        fechas = pd.bdate_range('2021-01-01', periods=1250)
+        sentimiento = pd.Series(rng.normal(0, 0.2, len(fechas)), index=fechas).rolling(7, min_periods=1).mean()
+        retornos = rng.normal(0, 0.01, (len(fechas), 15))
+        retornos[:, 0] += 0.05 * sentimiento.shift(3).fillna(0).values   # T00: rezago +3
+        precios = pd.DataFrame(80 * np.cumprod(1 + retornos, axis=0), index=fechas,
+                               columns=[f"T{i:02d}" for i in range(15)])
+
+    for intento in (1, 2):
+        inicio = time.time()
+        resultado = escanear_correlaciones(precios, sentimiento, variable='retorno')
+        print(f"\n  Ejecución {intento}: {len(resultado['tickers'])} tickers × {len(REZAGOS)} rezagos × "
+              f"{len(VENTANAS)} ventanas en {time.time() - inicio:.2f} s "
+              f"(recalculados: {len(resultado['recalculados'])})")
+
+    print(f"\n{mejor_rezago(resultado).head(10).round({'correlacion': 3}).to_string(index=False)}")
+    print("=" * 70)
@@ -10,6 +10,8 @@ import seaborn as sns
 from datetime import datetime
 import os
 
+from almacen_sentimiento import leer_sentimientos
+
 # Configurar estilo
 plt.style.use('dark_background')
 sns.set_palette("husl")
@@ -156,7 +158,7 @@ except Exception as e:
 print("\n[5/6] Generando gráfica de sentimiento...")
 
 try:
-    df_sent = pd.read_csv('base_datos_csv/sentimientos.csv')
+    df_sent = leer_sentimientos('base_datos_csv/sentimientos.npz')
     
     fig, ax = plt.subplots(figsize=(12, 6))
     
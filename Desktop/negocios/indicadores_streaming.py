@@ -0,0 +1,401 @@
+"""
+INDICADORES TÉCNICOS EN STREAMING
+Estado incremental con actualización O(1) por precio
+
+calcular_indicadores_tecnicos recalcula ventanas sobre toda la historia
+para leer solo iloc[-1]. Aquí cada indicador guarda el mínimo estado
+necesario y se actualiza con un precio a la vez:
+
+    SMAStream             buffer circular + suma (la suma se recalcula del
+                          buffer cada `ventana` precios para no acumular error)
+    EMAStream             y ← y + α·(x − y)
+    RSIStream             medias de ganancia/pérdida con suavizado de Wilder
+    ExtremoMovilStream    deque monótona de (índice, valor): mínimo o máximo
+                          de la ventana en O(1) amortizado
+
+Los valores coinciden con indicadores_tecnicos (misma semilla y mismas
+reglas de NaN para la historia incompleta). IndicadoresStreaming agrupa los
+indicadores de un ticker y entrega el mismo dict señal_tecnica de
+calcular_indicadores_tecnicos; todo el estado es serializable a JSON
+(base_datos_csv/estado_indicadores.json) para retomar el flujo de precios.
+
+BARRA ACTUAL (precios con fecha):
+    fecha posterior a la última  → barra nueva
+    misma fecha (mismo día)      → cierre revisado: cada indicador deshace
+                                   su última actualización (O(1)) y toma el
+                                   precio nuevo
+    fecha anterior               → ValueError (tick repetido o desordenado)
+"""
+
+import os
+import json
+import math
+from collections import deque
+from datetime import date
+
+from indicadores_tecnicos import PERIODO_RSI, VENTANA_EXTREMOS, clasificar_rsi, clasificar_tendencia
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_ESTADO = "base_datos_csv/estado_indicadores.json"
+
+NAN = float('nan')
+
+# ══════════════════════════════════════════════════════════════════════════════
+# INDICADORES INDIVIDUALES
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SMAStream:
+    """Promedio móvil simple sobre un buffer circular"""
+
+    __slots__ = ('ventana', 'buffer', 'posicion', 'n', 'suma')
+
+    def __init__(self, ventana, buffer=None, posicion=0, n=0, suma=0.0):
+        self.ventana = ventana
+        self.buffer = buffer if buffer is not None else [0.0] * ventana
+        self.posicion = posicion
+        self.n = n
+        self.suma = suma
+
+    def actualizar(self, x):
+        self.suma += x - self.buffer[self.posicion]
+        self.buffer[self.posicion] = x
+        self.posicion = (self.posicion + 1) % self.ventana
+        self.n += 1
+        if self.posicion == 0:
+            self.suma = math.fsum(self.buffer)       # corrige el error acumulado
+        return self.valor
+
+    def revisar(self, x):
+        """Reemplaza el último valor incorporado"""
+        ultima = (self.posicion - 1) % self.ventana
+        self.suma += x - self.buffer[ultima]
+        self.buffer[ultima] = x
+        return self.valor
+
+    @property
+    def valor(self):
+        return self.suma / self.ventana if self.n >= self.ventana else NAN
+
+    def a_dict(self):
+        return {s: getattr(self, s) for s in self.__slots__}
+
+
+class EMAStream:
+    """Promedio móvil exponencial (ewm(span, adjust=False))"""
+
+    __slots__ = ('alfa', 'valor', 'previo')
+
+    def __init__(self, span=None, alfa=None, valor=NAN, previo=NAN):
+        self.alfa = alfa if alfa is not None else 2 / (span + 1)
+        self.valor = valor
+        self.previo = previo
+
+    def actualizar(self, x):
+        self.previo = self.valor
+        self.valor = x if math.isnan(self.valor) else self.valor + self.alfa * (x - self.valor)
+        return self.valor
+
+    def revisar(self, x):
+        """Reemplaza el último valor incorporado"""
+        self.valor = self.previo
+        return self.actualizar(x)
+
+    def a_dict(self):
+        return {'alfa': self.alfa, 'valor': self.valor, 'previo': self.previo}
+
+
+class RSIStream:
+    """RSI de Wilder: los primeros `periodo` cambios siembran las medias"""
+
+    __slots__ = ('periodo', 'anterior', 'cambios', 'media_ganancia', 'media_perdida', 'previo')
+
+    def __init__(self, periodo=PERIODO_RSI, anterior=NAN, cambios=0,
+                 media_ganancia=0.0, media_perdida=0.0, previo=None):
+        self.periodo = periodo
+        self.anterior = anterior
+        self.cambios = cambios
+        self.media_ganancia = media_ganancia
+        self.media_perdida = media_perdida
+        # (anterior, cambios, medias) antes de la última actualización
+        self.previo = previo
+
+    def actualizar(self, x):
+        self.previo = [self.anterior, self.cambios, self.media_ganancia, self.media_perdida]
+        if not math.isnan(self.anterior):
+            delta = x - self.anterior
+            ganancia, perdida = max(delta, 0.0), max(-delta, 0.0)
+            self.cambios += 1
+            if self.cambios <= self.periodo:
+                # Semilla: media simple de los primeros `periodo` cambios
+                self.media_ganancia += ganancia / self.periodo
+                self.media_perdida += perdida / self.periodo
+            else:
+                self.media_ganancia += (ganancia - self.media_ganancia) / self.periodo
+                self.media_perdida += (perdida - self.media_perdida) / self.periodo
+        self.anterior = x
+        return self.valor
+
+    def revisar(self, x):
+        """Reemplaza el último valor incorporado"""
+        self.anterior, self.cambios, self.media_ganancia, self.media_perdida = self.previo
+        return self.actualizar(x)
+
+    @property
+    def valor(self):
+        if self.cambios < self.periodo:
+            return NAN
+        if self.media_perdida == 0:
+            return 100.0 if self.media_ganancia > 0 else 50.0
+        return 100 - 100 / (1 + self.media_ganancia / self.media_perdida)
+
+    def a_dict(self):
+        return {s: getattr(self, s) for s in self.__slots__}
+
+
+class ExtremoMovilStream:
+    """Mínimo (o máximo) de los últimos `ventana` valores con deque monótona"""
+
+    __slots__ = ('ventana', 'maximo', 'cola', 't', 'retirados', 'vencido')
+
+    def __init__(self, ventana=VENTANA_EXTREMOS, maximo=False, cola=(), t=0,
+                 retirados=(), vencido=None):
+        self.ventana = ventana
+        self.maximo = maximo
+        self.cola = deque(tuple(par) for par in cola)
+        self.t = t
+        # Lo que sacó la última actualización, para poder deshacerla
+        self.retirados = [tuple(par) for par in retirados]
+        self.vencido = tuple(vencido) if vencido is not None else None
+
+    def actualizar(self, x):
+        # Los valores dominados por x ya no pueden ser el extremo de ninguna ventana
+        self.retirados = []
+        if self.maximo:
+            while self.cola and self.cola[-1][1] <= x:
+                self.retirados.append(self.cola.pop())
+        else:
+            while self.cola and self.cola[-1][1] >= x:
+                self.retirados.append(self.cola.pop())
+        self.cola.append((self.t, x))
+        self.vencido = self.cola.popleft() if self.cola[0][0] <= self.t - self.ventana else None
+        self.t += 1
+        return self.valor
+
+    def revisar(self, x):
+        """Reemplaza el último valor incorporado"""
+        self.t -= 1
+        if self.vencido is not None:
+            self.cola.appendleft(self.vencido)
+        self.cola.pop()
+        self.cola.extend(reversed(self.retirados))
+        return self.actualizar(x)
+
+    @property
+    def valor(self):
+        return self.cola[0][1] if self.t >= self.ventana else NAN
+
+    def a_dict(self):
+        return {'ventana': self.ventana, 'maximo': self.maximo,
+                'cola': [list(par) for par in self.cola], 't': self.t,
+                'retirados': [list(par) for par in self.retirados],
+                'vencido': list(self.vencido) if self.vencido is not None else None}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ESTADO DE UN TICKER
+# ══════════════════════════════════════════════════════════════════════════════
+
+_CLASES = {'sma': SMAStream, 'ema': EMAStream, 'rsi': RSIStream, 'extremo': ExtremoMovilStream}
+
+
+class IndicadoresStreaming:
+    """SMA 20/50, EMA 12/26, RSI de Wilder y soporte/resistencia de un ticker"""
+
+    def __init__(self, indicadores=None, ultimo_precio=NAN, ultima_fecha=None):
+        self.indicadores = indicadores or {
+            'SMA_20': SMAStream(20),
+            'SMA_50': SMAStream(50),
+            'EMA_12': EMAStream(12),
+            'EMA_26': EMAStream(26),
+            'RSI': RSIStream(PERIODO_RSI),
+            'SOPORTE': ExtremoMovilStream(VENTANA_EXTREMOS, maximo=False),
+            'RESISTENCIA': ExtremoMovilStream(VENTANA_EXTREMOS, maximo=True)
+        }
+        self.ultimo_precio = ultimo_precio
+        self.ultima_fecha = ultima_fecha
+
+    def actualizar(self, precio, maximo=None, minimo=None, fecha=None):
+        """
+        Incorpora un precio (y opcionalmente el máximo/mínimo de la barra).
+        Precios NaN o None se ignoran.
+
+        Con fecha, un precio del mismo día que la última barra la reemplaza
+        y uno anterior lanza ValueError. Sin fecha, cada precio es una barra
+        nueva (y la siguiente con fecha también lo será).
+
+        RETORNA:
+            dict con el valor actual de cada indicador
+        """
+        if precio is None or math.isnan(precio):
+            return self.valores()
+        precio = float(precio)
+
+        revisar = False
+        if fecha is not None:
+            dia = _dia(fecha)
+            if self.ultima_fecha is not None and dia < self.ultima_fecha:
+                raise ValueError(f"Precio del {dia} anterior a la última barra ({self.ultima_fecha})")
+            revisar = dia == self.ultima_fecha
+            self.ultima_fecha = dia
+        else:
+            self.ultima_fecha = None
+
+        for nombre, indicador in self.indicadores.items():
+            operacion = indicador.revisar if revisar else indicador.actualizar
+            if nombre == 'SOPORTE':
+                operacion(precio if minimo is None else float(minimo))
+            elif nombre == 'RESISTENCIA':
+                operacion(precio if maximo is None else float(maximo))
+            else:
+                operacion(precio)
+        self.ultimo_precio = precio
+        return self.valores()
+
+    @classmethod
+    def desde_historia(cls, df, columna='precio'):
+        """Estado inicial recorriendo la historia una vez (luego, O(1) por precio)"""
+        estado = cls()
+        maximos = df['maximo'] if 'maximo' in df else [None] * len(df)
+        minimos = df['minimo'] if 'minimo' in df else [None] * len(df)
+        fechas = df['fecha'] if 'fecha' in df else [None] * len(df)
+        for precio, maximo, minimo, fecha in zip(df[columna], maximos, minimos, fechas):
+            estado.actualizar(precio, maximo, minimo, fecha)
+        return estado
+
+    def valores(self):
+        return {nombre: indicador.valor for nombre, indicador in self.indicadores.items()}
+
+    def señal(self):
+        """Mismo dict señal_tecnica que calcular_indicadores_tecnicos"""
+        v = self.valores()
+        precio, sma20, sma50 = self.ultimo_precio, v['SMA_20'], v['SMA_50']
+        return {
+            'tendencia': clasificar_tendencia(precio, sma20, sma50),
+            'rsi': v['RSI'],
+            'rsi_señal': clasificar_rsi(v['RSI']),
+            'soporte': v['SOPORTE'],
+            'resistencia': v['RESISTENCIA'],
+            'precio_vs_sma20': ((precio - sma20) / sma20) * 100,
+            'precio_vs_sma50': ((precio - sma50) / sma50) * 100
+        }
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Persistencia
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def a_dict(self):
+        return {
+            'ultimo_precio': self.ultimo_precio,
+            'ultima_fecha': self.ultima_fecha,
+            'indicadores': {nombre: {'tipo': _tipo(ind), **ind.a_dict()}
+                            for nombre, ind in self.indicadores.items()}
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        indicadores = {}
+        for nombre, d in datos['indicadores'].items():
+            d = dict(d)
+            indicadores[nombre] = _CLASES[d.pop('tipo')](**d)
+        return cls(indicadores, datos['ultimo_precio'], datos.get('ultima_fecha'))
+
+
+def _dia(fecha):
+    """Fecha de la barra diaria como 'AAAA-MM-DD' (sin hora ni zona horaria)"""
+    return date.fromisoformat(str(fecha)[:10]).isoformat()
+
+
+def _tipo(indicador):
+    return next(t for t, clase in _CLASES.items() if isinstance(indicador, clase))
+
+
+def guardar_estados(estados, ruta=RUTA_ESTADO):
+    """Guarda {ticker: IndicadoresStreaming} como JSON"""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({t: e.a_dict() for t, e in estados.items()}, f)
+    os.replace(temporal, ruta)
+
+
+def cargar_estados(ruta=RUTA_ESTADO):
+    """{ticker: IndicadoresStreaming} desde el JSON (vacío si no existe)"""
+    if not os.path.exists(ruta):
+        return {}
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return {t: IndicadoresStreaming.desde_dict(d) for t, d in json.load(f).items()}
+    except (ValueError, KeyError):
+        return {}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    import numpy as np
+    import pandas as pd
+
+    from indicadores_tecnicos import calcular_indicadores
+
+    print("=" * 70)
+    print("INDICADORES TÉCNICOS EN STREAMING")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    precio = 70 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    df = pd.DataFrame({'fecha': pd.bdate_range('2014-01-01', periods=n).strftime('%Y-%m-%d'),
+                       'precio': precio,
+                       'maximo': precio + rng.uniform(0, 1, n),
+                       'minimo': precio - rng.uniform(0, 1, n)})
+    historia, nuevos = df.iloc[:2500], df.iloc[2500:]
+
+    estado = IndicadoresStreaming.desde_historia(historia)
+    ruta = os.path.join(tempfile.mkdtemp(), 'estado_indicadores.json')
+    guardar_estados({'WTI': estado}, ruta)
+    estado = cargar_estados(ruta)['WTI']
+
+    inicio = time.perf_counter()
+    for fila in nuevos.itertuples(index=False):
+        valores = estado.actualizar(fila.precio, fila.maximo, fila.minimo, fila.fecha)
+    por_tick = (time.perf_counter() - inicio) / len(nuevos) * 1e6
+    print(f"\n  ✓ {len(nuevos)} precios nuevos: {por_tick:.1f} µs por precio (sin recorrer historia)")
+
+    referencia = calcular_indicadores(df.copy()).iloc[-1]
+    print()
+    for nombre, valor in valores.items():
+        iguales = np.isclose(valor, referencia[nombre])
+        print(f"  {'✓' if iguales else '✗'} {nombre:<12} {valor:8.3f}  (lote: {referencia[nombre]:8.3f})")
+
+    # Cierre revisado de la barra actual y tick atrasado
+    ultima = nuevos.iloc[-1]
+    estado.actualizar(ultima.precio * 1.05, ultima.maximo * 1.05, ultima.minimo, ultima.fecha)
+    revisado = estado.actualizar(ultima.precio, ultima.maximo, ultima.minimo, ultima.fecha)
+    iguales = all(np.isclose(revisado[nombre], referencia[nombre]) for nombre in revisado)
+    print(f"\n  {'✓' if iguales else '✗'} Precio revisado el mismo día: reemplaza la barra (no agrega otra)")
+    try:
+        estado.actualizar(ultima.precio, fecha=nuevos.iloc[-2].fecha)
+        print("  ✗ Tick atrasado aceptado")
+    except ValueError:
+        print("  ✓ Tick atrasado rechazado")
+
+    señal = estado.señal()
+    print(f"\n  Tendencia: {señal['tendencia']}  RSI: {señal['rsi']:.1f} ({señal['rsi_señal']})")
+    print("=" * 70)
@@ -0,0 +1,370 @@
+"""
+INDICADORES TÉCNICOS VECTORIZADOS (NUMPY)
+Una sola implementación para todos los puntos de entrada
+
+calcular_indicadores_tecnicos (SISTEMA_RECOMENDACION_PETROLEO) y
+generar_recomendacion_final (codigo.py) repetían SMA/EMA/RSI con pandas,
+con un RSI de medias simples y soporte/resistencia como tail(20). Aquí:
+
+    sma                 suma acumulada → O(n) sin importar la ventana
+    ema                 recursión α (equivale a ewm(span, adjust=False))
+    rsi                 suavizado de Wilder (semilla = media de los primeros
+                        `periodo` cambios, luego α = 1/periodo)
+    macd                EMA rápida − EMA lenta, señal y histograma
+    bandas_bollinger    media ± k·σ móvil (σ poblacional, vía sumas acumuladas)
+    atr                 rango verdadero con suavizado de Wilder
+    extremos_moviles    mínimo y máximo móviles por bloques (van Herk /
+                        Gil-Werman): O(n), sin bucles de Python por elemento
+
+Todas las funciones aceptan arreglos 1-D [tiempo] o 2-D [tiempo × serie] y
+operan sobre el eje 0; las posiciones sin ventana completa quedan en NaN
+(como rolling(ventana) en pandas). Un NaN dentro de la ventana produce NaN.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+PERIODO_RSI = 14
+PERIODO_ATR = 14
+VENTANA_EXTREMOS = 20
+
+# Columnas que calcular_indicadores agrega al DataFrame
+COLUMNAS_INDICADORES = ['SMA_20', 'SMA_50', 'EMA_12', 'EMA_26', 'RSI',
+                        'MACD', 'MACD_senal', 'MACD_hist', 'BB_media', 'BB_sup', 'BB_inf',
+                        'SOPORTE', 'RESISTENCIA']
+
+
+def _como_arreglo(x):
+    return np.asarray(x, dtype=np.float64)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PROMEDIOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _suma_movil(x, ventana):
+    """Suma de las últimas `ventana` filas (NaN si falta historia o hay NaN)"""
+    nulos = np.isnan(x)
+    acumulada = np.cumsum(np.where(nulos, 0.0, x), axis=0)
+    nulos_acum = np.cumsum(nulos, axis=0)
+
+    suma = np.full_like(x, np.nan)
+    suma[ventana - 1] = acumulada[ventana - 1]
+    np.subtract(acumulada[ventana:], acumulada[:-ventana], out=suma[ventana:])
+    con_nulos = np.empty(x.shape, dtype=bool)
+    con_nulos[:ventana - 1] = True
+    con_nulos[ventana - 1] = nulos_acum[ventana - 1] > 0
+    con_nulos[ventana:] = (nulos_acum[ventana:] - nulos_acum[:-ventana]) > 0
+    suma[con_nulos] = np.nan
+    return suma
+
+
+def sma(x, ventana):
+    """Promedio móvil simple (equivale a rolling(ventana).mean())"""
+    x = _como_arreglo(x)
+    if len(x) < ventana:
+        return np.full_like(x, np.nan)
+    suma = _suma_movil(x, ventana)
+    suma /= ventana
+    return suma
+
+
+def _recursion_exponencial(x, alfa, inicio=0):
+    """
+    y_t = y_{t-1} + α·(x_t − y_{t-1}) desde la fila `inicio`.
+
+    La primera fila válida de cada serie inicia el promedio; los NaN en x
+    mantienen el valor anterior.
+    """
+    salida = np.full_like(x, np.nan)
+    if len(x) <= inicio:
+        return salida
+    # Vista 2-D [tiempo × serie] para operar fila a fila en el mismo arreglo
+    x, y = x.reshape(len(x), -1), salida.reshape(len(x), -1)
+    y[inicio] = x[inicio]
+    for t in range(inicio + 1, len(x)):
+        anterior = y[t - 1]
+        actual = y[t]
+        np.subtract(x[t], anterior, out=actual)
+        actual *= alfa
+        actual += anterior
+        # Primera observación válida (anterior NaN) o dato faltante (x NaN)
+        np.copyto(actual, x[t], where=np.isnan(anterior))
+        np.copyto(actual, anterior, where=np.isnan(x[t]) & ~np.isnan(anterior))
+    return salida
+
+
+def ema(x, span=None, alfa=None):
+    """Promedio móvil exponencial (equivale a ewm(span, adjust=False).mean())"""
+    if (span is None) == (alfa is None):
+        raise ValueError("Indica span o alfa (solo uno)")
+    alfa = 2 / (span + 1) if alfa is None else alfa
+    return _recursion_exponencial(_como_arreglo(x), alfa)
+
+
+def _wilder(x, periodo):
+    """
+    Suavizado de Wilder: media simple de los primeros `periodo` valores
+    válidos, luego α = 1/periodo. En 2-D cada serie se siembra en su propia
+    fila, así una serie que empieza más tarde (NaN al inicio) da lo mismo
+    que calculada sola.
+    """
+    salida = np.full_like(x, np.nan)
+    if len(x) < periodo:
+        return salida
+    x2 = x.reshape(len(x), -1)
+    validos = ~np.isnan(x2)
+    conteo = np.cumsum(validos, axis=0)
+    con_semilla = conteo[-1] >= periodo
+    if not con_semilla.any():
+        return salida
+
+    # Fila donde cada serie completa `periodo` valores válidos → semilla
+    fila_semilla = np.argmax(conteo >= periodo, axis=0)
+    columnas = np.arange(x2.shape[1])
+    sumas = np.cumsum(np.where(validos, x2, 0.0), axis=0)[fila_semilla, columnas]
+
+    # Antes de su semilla cada serie queda en NaN; la recursión arranca en
+    # la semilla como primera observación válida
+    entrada = np.where(np.arange(len(x2))[:, None] > fila_semilla, x2, np.nan)
+    entrada[fila_semilla[con_semilla], columnas[con_semilla]] = sumas[con_semilla] / periodo
+    entrada[:, ~con_semilla] = np.nan
+
+    inicio = int(fila_semilla[con_semilla].min())
+    return _recursion_exponencial(entrada, 1 / periodo, inicio=inicio).reshape(x.shape)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# OSCILADORES Y BANDAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def rsi(x, periodo=PERIODO_RSI):
+    """RSI de Wilder en [0, 100] (100 si no hubo pérdidas en el período)"""
+    x = _como_arreglo(x)
+    salida = np.full_like(x, np.nan)
+    if len(x) <= periodo:
+        return salida
+
+    delta = np.diff(x, axis=0)
+    ganancia = np.clip(delta, 0, None)
+    perdida = np.clip(-delta, 0, None)
+    media_ganancia = _wilder(ganancia, periodo)
+    media_perdida = _wilder(perdida, periodo)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        valor = 100 - 100 / (1 + media_ganancia / media_perdida)
+    valor = np.where((media_perdida == 0) & (media_ganancia > 0), 100.0, valor)
+    valor = np.where((media_perdida == 0) & (media_ganancia == 0), 50.0, valor)
+    salida[1:] = valor
+    return salida
+
+
+def macd(x, rapida=12, lenta=26, señal=9):
+    """
+    RETORNA:
+        (macd, señal, histograma)
+    """
+    x = _como_arreglo(x)
+    linea = ema(x, rapida)
+    linea -= ema(x, lenta)
+    linea_señal = ema(linea, señal)
+    return linea, linea_señal, linea - linea_señal
+
+
+def bandas_bollinger(x, ventana=20, k=2.0):
+    """
+    RETORNA:
+        (media, banda_superior, banda_inferior)
+    """
+    x = _como_arreglo(x)
+    if len(x) < ventana:
+        nulos = np.full_like(x, np.nan)
+        return nulos, nulos.copy(), nulos.copy()
+
+    # Centrar en el primer valor mejora la precisión de E[x²] − E[x]²
+    referencia = np.nan_to_num(x[0])
+    centrado = x - referencia
+    media = _suma_movil(centrado, ventana) / ventana
+    varianza = _suma_movil(centrado * centrado, ventana) / ventana
+    varianza -= media * media
+    np.clip(varianza, 0, None, out=varianza)
+    desviacion = np.sqrt(varianza)
+    desviacion *= k
+    media += referencia
+    return media, media + desviacion, media - desviacion
+
+
+def atr(maximo, minimo, cierre, periodo=PERIODO_ATR):
+    """Average True Range con suavizado de Wilder"""
+    maximo, minimo, cierre = _como_arreglo(maximo), _como_arreglo(minimo), _como_arreglo(cierre)
+    rango = maximo - minimo
+    if len(cierre) > 1:
+        anterior = cierre[:-1]
+        np.maximum(rango[1:], np.abs(maximo[1:] - anterior), out=rango[1:])
+        np.maximum(rango[1:], np.abs(minimo[1:] - anterior), out=rango[1:])
+    return _wilder(rango, periodo)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EXTREMOS MÓVILES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _extremo_movil(x, ventana, operacion):
+    """
+    Máximo o mínimo móvil por el método de van Herk / Gil-Werman: con
+    bloques de tamaño `ventana`, cada ventana es la unión del sufijo de un
+    bloque y el prefijo del siguiente.
+    """
+    n = len(x)
+    salida = np.full_like(x, np.nan)
+    if n < ventana:
+        return salida
+
+    bloques = -(-n // ventana)
+    relleno = np.full((bloques * ventana,) + x.shape[1:], np.nan)
+    relleno[:n] = x
+    relleno = relleno.reshape((bloques, ventana) + x.shape[1:])
+
+    prefijo = operacion.accumulate(relleno, axis=1).reshape((-1,) + x.shape[1:])
+    sufijo = operacion.accumulate(relleno[:, ::-1], axis=1)[:, ::-1].reshape((-1,) + x.shape[1:])
+
+    # ventana [i − ventana + 1, i] = sufijo desde su inicio ∪ prefijo hasta i
+    operacion(sufijo[:n - ventana + 1], prefijo[ventana - 1:n], out=salida[ventana - 1:])
+    return salida
+
+
+def extremos_moviles(x, ventana=VENTANA_EXTREMOS):
+    """
+    RETORNA:
+        (mínimo móvil, máximo móvil) de las últimas `ventana` filas
+    """
+    x = _como_arreglo(x)
+    return _extremo_movil(x, ventana, np.minimum), _extremo_movil(x, ventana, np.maximum)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# INTEGRACIÓN CON LOS DATAFRAMES DEL SISTEMA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def calcular_indicadores(df, columna='precio'):
+    """
+    Agrega al DataFrame las columnas de COLUMNAS_INDICADORES (y ATR si hay
+    columnas maximo/minimo). Siempre se recalculan: si el df ganó filas
+    desde el último cálculo, las columnas viejas quedarían desfasadas.
+
+    ENTRADA:
+        df: DataFrame con la columna de precio (y opcionalmente maximo/minimo)
+
+    RETORNA:
+        el mismo df con las columnas agregadas
+    """
+    precio = df[columna].to_numpy(dtype=np.float64)
+    maximo = df['maximo'].to_numpy(dtype=np.float64) if 'maximo' in df else precio
+    minimo = df['minimo'].to_numpy(dtype=np.float64) if 'minimo' in df else precio
+
+    df['SMA_20'] = sma(precio, 20)
+    df['SMA_50'] = sma(precio, 50)
+    df['EMA_12'] = ema(precio, 12)
+    df['EMA_26'] = ema(precio, 26)
+    df['RSI'] = rsi(precio)
+    df['MACD'], df['MACD_senal'], df['MACD_hist'] = macd(precio)
+    df['BB_media'], df['BB_sup'], df['BB_inf'] = bandas_bollinger(precio)
+    df['SOPORTE'] = extremos_moviles(minimo)[0]
+    df['RESISTENCIA'] = extremos_moviles(maximo)[1]
+    if 'maximo' in df and 'minimo' in df:
+        df['ATR'] = atr(maximo, minimo, precio)
+    return df
+
+
+def clasificar_tendencia(precio, sma20, sma50):
+    """ALCISTA si precio > SMA20 > SMA50, BAJISTA si precio < SMA20 < SMA50, si no LATERAL"""
+    if precio > sma20 > sma50:
+        return "ALCISTA"
+    if precio < sma20 < sma50:
+        return "BAJISTA"
+    return "LATERAL"
+
+
+def clasificar_rsi(valor_rsi):
+    """SOBRECOMPRADO (> 70), SOBREVENDIDO (< 30) o NEUTRAL"""
+    if valor_rsi > 70:
+        return "SOBRECOMPRADO"
+    if valor_rsi < 30:
+        return "SOBREVENDIDO"
+    return "NEUTRAL"
+
+
+def resumen_tecnico(df, columna='precio'):
+    """
+    Lectura de la última fila de indicadores.
+
+    RETORNA:
+        dict con precio, sma20, sma50, rsi, tendencia (ALCISTA/BAJISTA/LATERAL),
+        rsi_señal (SOBRECOMPRADO/SOBREVENDIDO/NEUTRAL), soporte y resistencia
+    """
+    ultima = calcular_indicadores(df, columna).iloc[-1]
+    precio, sma20, sma50, valor_rsi = ultima[columna], ultima['SMA_20'], ultima['SMA_50'], ultima['RSI']
+
+    return {
+        'precio': precio,
+        'sma20': sma20,
+        'sma50': sma50,
+        'rsi': valor_rsi,
+        'tendencia': clasificar_tendencia(precio, sma20, sma50),
+        'rsi_señal': clasificar_rsi(valor_rsi),
+        'soporte': ultima['SOPORTE'],
+        'resistencia': ultima['RESISTENCIA'],
+        'macd_hist': ultima['MACD_hist'],
+        'atr': ultima['ATR'] if 'ATR' in ultima.index else np.nan
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 70)
+    print("INDICADORES TÉCNICOS VECTORIZADOS")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    precio = 70 + np.cumsum(rng.normal(0, 1, n))
+    df = pd.DataFrame({'precio': precio,
+                       'maximo': precio + rng.uniform(0, 1, n),
+                       'minimo': precio - rng.uniform(0, 1, n)})
+    s = df['precio']
+
+    # Comparación con las versiones pandas
+    verificaciones = {
+        'SMA 20': (sma(precio, 20), s.rolling(20).mean()),
+        'EMA 12': (ema(precio, 12), s.ewm(span=12, adjust=False).mean()),
+        'Bollinger (media)': (bandas_bollinger(precio)[0], s.rolling(20).mean()),
+        'Bollinger (superior)': (bandas_bollinger(precio)[1],
+                                 s.rolling(20).mean() + 2 * s.rolling(20).std(ddof=0)),
+        'Mínimo 20': (extremos_moviles(df['minimo'])[0], df['minimo'].rolling(20).min()),
+        'Máximo 20': (extremos_moviles(df['maximo'])[1], df['maximo'].rolling(20).max())
+    }
+    print()
+    for nombre, (propio, referencia) in verificaciones.items():
+        iguales = np.allclose(propio, referencia.to_numpy(), equal_nan=True)
+        print(f"  {'✓' if iguales else '✗'} {nombre:<22} coincide con pandas")
+
+    # 2-D: 50 series a la vez
+    matriz = 70 + np.cumsum(rng.normal(0, 1, (n, 50)), axis=0)
+    inicio = time.perf_counter()
+    rsi(matriz)
+    macd(matriz)
+    extremos_moviles(matriz)
+    print(f"\n  ✓ RSI + MACD + extremos de 50 series × {n} días: "
+          f"{(time.perf_counter() - inicio) * 1e3:.1f} ms")
+
+    resumen = resumen_tecnico(df)
+    print(f"\n  Tendencia: {resumen['tendencia']}  RSI (Wilder): {resumen['rsi']:.1f} "
+          f"({resumen['rsi_señal']})")
+    print(f"  Soporte: {resumen['soporte']:.2f}  Resistencia: {resumen['resistencia']:.2f}  "
+          f"ATR: {resumen['atr']:.2f}")
+    print("=" * 70)
@@ -0,0 +1,330 @@
+"""
+INDICADORES TÉCNICOS DE TODO EL UNIVERSO [fecha × ticker]
+Una sola llamada vectorizada para SMA/EMA/RSI/MACD/Bollinger/extremos de
+todos los tickers del catálogo
+
+calcular_indicadores_tecnicos solo procesaba el WTI. Aquí las funciones de
+indicadores_tecnicos corren sobre la matriz completa de precios:
+
+    1. Cada ticker se "compacta" a sus propios días de cotización (los
+       valores válidos de cada columna se suben al inicio de un arreglo
+       [max_días × ticker], rellenando con NaN al final). Como todos los
+       indicadores son causales, el relleno final no altera nada y cada
+       columna da exactamente lo mismo que calcular_indicadores sobre la
+       serie del ticker sola (un feriado de Lima no rompe la SMA de XOM).
+    2. Se calculan todos los indicadores de una vez sobre ese arreglo.
+    3. El resultado se devuelve a las fechas originales del universo.
+
+CACHÉ EN DISCO (por ticker y fecha):
+    base_datos_csv/cache_indicadores/{TICKER}.npz  fechas e indicadores
+                                                   (sin pickle)
+    base_datos_csv/cache_indicadores/indice.json   huella de cada serie
+Solo se recalculan los tickers cuya serie cambió, todos juntos en la misma
+llamada 2-D; el resto se lee del disco.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import cargar_universo, huella_serie
+from indicadores_tecnicos import (COLUMNAS_INDICADORES, sma, ema, rsi, macd, bandas_bollinger,
+                                  atr, extremos_moviles, clasificar_tendencia, clasificar_rsi)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+DIR_CACHE = "base_datos_csv/cache_indicadores"
+ARCHIVO_INDICE = "indice.json"
+
+# ══════════════════════════════════════════════════════════════════════════════
+# COMPACTAR / EXPANDIR
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _compactar(valores, validos):
+    """
+    Sube los valores válidos de cada columna al inicio del arreglo.
+
+    ENTRADA:
+        valores: [T × N]
+        validos: [T × N] máscara de días con cotización
+
+    RETORNA:
+        (compacto [L × N] con L = máximo de días válidos, (filas, columnas,
+         posiciones) para devolver el resultado a su lugar)
+    """
+    posiciones = np.cumsum(validos, axis=0) - 1
+    filas, columnas = np.nonzero(validos)
+    largo = int(validos.sum(axis=0).max(initial=0))
+    compacto = np.full((largo, valores.shape[1]), np.nan)
+    compacto[posiciones[filas, columnas], columnas] = valores[filas, columnas]
+    return compacto, (filas, columnas, posiciones[filas, columnas])
+
+
+def _expandir(compacto, forma, ubicacion):
+    """Inverso de _compactar: NaN en los días sin cotización"""
+    filas, columnas, posiciones = ubicacion
+    salida = np.full(forma, np.nan)
+    salida[filas, columnas] = compacto[posiciones, columnas]
+    return salida
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CÁLCULO VECTORIZADO
+# ══════════════════════════════════════════════════════════════════════════════
+
+def calcular_indicadores_universo(precios, maximos=None, minimos=None):
+    """
+    Todos los indicadores de todos los tickers en una sola pasada.
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] de cierres
+        maximos, minimos: DataFrames opcionales (mismas fechas; los tickers
+                          sin máximo/mínimo usan el cierre, como en
+                          calcular_indicadores)
+
+    RETORNA:
+        dict indicador → DataFrame [fecha × ticker] con las columnas de
+        COLUMNAS_INDICADORES y ATR (NaN para tickers sin máximo/mínimo)
+    """
+    cierre = precios.to_numpy(dtype=np.float64)
+    validos = ~np.isnan(cierre)
+    con_rango = np.zeros(cierre.shape[1], dtype=bool)
+
+    def _alinear(tabla):
+        if tabla is None:
+            return cierre
+        tabla = tabla.reindex(index=precios.index, columns=precios.columns)
+        valores = tabla.to_numpy(dtype=np.float64)
+        con_rango[:] |= tabla.notna().any().to_numpy()
+        return np.where(np.isnan(valores), cierre, valores)
+
+    maximo, minimo = _alinear(maximos), _alinear(minimos)
+    if maximos is None or minimos is None:
+        con_rango[:] = False
+
+    x, ubicacion = _compactar(cierre, validos)
+    x_max, _ = _compactar(maximo, validos)
+    x_min, _ = _compactar(minimo, validos)
+
+    resultados = {
+        'SMA_20': sma(x, 20),
+        'SMA_50': sma(x, 50),
+        'EMA_12': ema(x, 12),
+        'EMA_26': ema(x, 26),
+        'RSI': rsi(x)
+    }
+    resultados['MACD'], resultados['MACD_senal'], resultados['MACD_hist'] = macd(x)
+    resultados['BB_media'], resultados['BB_sup'], resultados['BB_inf'] = bandas_bollinger(x)
+    resultados['SOPORTE'] = extremos_moviles(x_min)[0]
+    resultados['RESISTENCIA'] = extremos_moviles(x_max)[1]
+    resultados['ATR'] = np.where(con_rango, atr(x_max, x_min, x), np.nan)
+
+    return {nombre: pd.DataFrame(_expandir(valores, cierre.shape, ubicacion),
+                                 index=precios.index, columns=precios.columns)
+            for nombre, valores in resultados.items()}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CACHÉ POR TICKER
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _huella_ticker(precios, maximos, minimos, ticker):
+    serie = precios[ticker].dropna()
+    arreglos = [serie.to_numpy(dtype=np.float64), serie.index.to_numpy(dtype='datetime64[ns]')]
+    for tabla in (maximos, minimos):
+        if tabla is not None and ticker in tabla:
+            arreglos.append(tabla[ticker].reindex(serie.index).to_numpy(dtype=np.float64))
+    return huella_serie(*arreglos)
+
+
+def _leer_indice(dir_cache):
+    try:
+        with open(os.path.join(dir_cache, ARCHIVO_INDICE), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _guardar_indice(indice, dir_cache):
+    ruta = os.path.join(dir_cache, ARCHIVO_INDICE)
+    temporal = ruta + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=1, sort_keys=True)
+    os.replace(temporal, ruta)
+
+
+def _guardar_ticker(ruta, fechas, valores):
+    temporal = ruta + ".tmp.npz"
+    np.savez(temporal, fechas=fechas.astype('datetime64[ns]').astype(np.int64), valores=valores)
+    os.replace(temporal, ruta)
+
+
+def _leer_ticker(ruta):
+    with np.load(ruta, allow_pickle=False) as datos:
+        return datos['fechas'].astype('datetime64[ns]'), datos['valores']
+
+
+def indicadores_universo(precios=None, maximos=None, minimos=None, dir_cache=DIR_CACHE):
+    """
+    Indicadores de todo el universo con caché en disco por ticker.
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (None = cargar_universo() con
+                 precio_cierre, precio_maximo y precio_minimo del catálogo)
+        dir_cache: carpeta de la caché (None = sin caché)
+
+    RETORNA:
+        dict indicador → DataFrame [fecha × ticker] (ver calcular_indicadores_universo)
+    """
+    if precios is None:
+        precios = cargar_universo()
+        maximos = cargar_universo(columna='precio_maximo')
+        minimos = cargar_universo(columna='precio_minimo')
+        maximos = None if maximos.empty else maximos
+        minimos = None if minimos.empty else minimos
+    if dir_cache is None:
+        return calcular_indicadores_universo(precios, maximos, minimos)
+
+    columnas = COLUMNAS_INDICADORES + ['ATR']
+    ruta = lambda ticker: os.path.join(dir_cache, f"{ticker}.npz")
+    indice = _leer_indice(dir_cache)
+    huellas = {t: _huella_ticker(precios, maximos, minimos, t) for t in precios.columns}
+    pendientes = [t for t in precios.columns
+                  if indice.get(t) != huellas[t] or not os.path.exists(ruta(t))]
+
+    # [indicador × fecha × ticker]
+    salida = np.full((len(columnas), len(precios), len(precios.columns)), np.nan)
+    fechas = precios.index.to_numpy(dtype='datetime64[ns]')
+
+    if pendientes:
+        subconjunto = lambda tabla: None if tabla is None else tabla[[t for t in pendientes if t in tabla]]
+        nuevos = calcular_indicadores_universo(precios[pendientes], subconjunto(maximos),
+                                               subconjunto(minimos))
+        nuevos = np.stack([nuevos[nombre].to_numpy() for nombre in columnas])
+        os.makedirs(dir_cache, exist_ok=True)
+        for k, ticker in enumerate(pendientes):
+            j = precios.columns.get_loc(ticker)
+            salida[:, :, j] = nuevos[:, :, k]
+            validos = precios[ticker].notna().to_numpy()
+            _guardar_ticker(ruta(ticker), fechas[validos], nuevos[:, validos, k].T)
+            indice[ticker] = huellas[ticker]
+        _guardar_indice(indice, dir_cache)
+
+    for j, ticker in enumerate(precios.columns):
+        if ticker in pendientes:
+            continue
+        fechas_ticker, valores = _leer_ticker(ruta(ticker))
+        salida[:, np.searchsorted(fechas, fechas_ticker), j] = valores.T
+
+    return {nombre: pd.DataFrame(salida[k], index=precios.index, columns=precios.columns)
+            for k, nombre in enumerate(columnas)}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SEÑALES POR ACTIVO
+# ══════════════════════════════════════════════════════════════════════════════
+
+def señales_universo(precios=None, indicadores=None, **kwargs):
+    """
+    Lectura del último día de cada ticker (mismo contenido que
+    indicadores_tecnicos.resumen_tecnico, una fila por ticker).
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (None = catálogo completo)
+        indicadores: resultado de indicadores_universo (None = se calcula)
+        kwargs: se pasan a indicadores_universo (maximos, minimos, dir_cache)
+
+    RETORNA:
+        DataFrame indexado por ticker con fecha, precio, sma20, sma50, rsi,
+        tendencia, rsi_señal, soporte, resistencia, macd_hist, atr,
+        precio_vs_sma20 y precio_vs_sma50 (%)
+    """
+    if precios is None:
+        precios = cargar_universo()
+    if indicadores is None:
+        indicadores = indicadores_universo(precios, **kwargs)
+
+    filas = {}
+    for ticker in precios.columns:
+        serie = precios[ticker].dropna()
+        if serie.empty:
+            continue
+        fecha = serie.index[-1]
+        ultimo = {nombre: tabla.at[fecha, ticker] for nombre, tabla in indicadores.items()}
+        precio = serie.iloc[-1]
+        filas[ticker] = {
+            'fecha': fecha,
+            'precio': precio,
+            'sma20': ultimo['SMA_20'],
+            'sma50': ultimo['SMA_50'],
+            'rsi': ultimo['RSI'],
+            'tendencia': clasificar_tendencia(precio, ultimo['SMA_20'], ultimo['SMA_50']),
+            'rsi_señal': clasificar_rsi(ultimo['RSI']),
+            'soporte': ultimo['SOPORTE'],
+            'resistencia': ultimo['RESISTENCIA'],
+            'macd_hist': ultimo['MACD_hist'],
+            'atr': ultimo['ATR'],
+            'precio_vs_sma20': (precio / ultimo['SMA_20'] - 1) * 100,
+            'precio_vs_sma50': (precio / ultimo['SMA_50'] - 1) * 100
+        }
+
+    tabla = pd.DataFrame.from_dict(filas, orient='index')
+    tabla.index.name = 'ticker'
+    return tabla
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+    from indicadores_tecnicos import calcular_indicadores
+
+    print("=" * 70)
+    print("INDICADORES TÉCNICOS DEL UNIVERSO")
+    print("=" * 70)
+
+    # 200 tickers con calendarios distintos (feriados y fechas de inicio propias)
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range('2015-01-01', periods=2500, name='fecha')
+    n = 200
+    matriz = 70 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(fechas), n)), axis=0))
+    matriz[rng.random(matriz.shape) < 0.03] = np.nan
+    for j, inicio in enumerate(rng.integers(0, 1500, n)):
+        matriz[:inicio, j] = np.nan
+    precios = pd.DataFrame(matriz, index=fechas, columns=[f"T{j:03d}" for j in range(n)])
+
+    inicio = time.perf_counter()
+    indicadores = calcular_indicadores_universo(precios)
+    print(f"\n  ✓ {len(indicadores)} indicadores de {n} tickers × {len(fechas)} días: "
+          f"{time.perf_counter() - inicio:.2f} s (una sola llamada)")
+
+    # Cada columna coincide con calcular_indicadores sobre la serie sola
+    iguales = True
+    for ticker in precios.columns[:20]:
+        df = precios[[ticker]].dropna().rename(columns={ticker: 'precio'})
+        calcular_indicadores(df)
+        for nombre in COLUMNAS_INDICADORES:
+            propio = indicadores[nombre][ticker].dropna()
+            iguales &= np.allclose(propio.reindex(df.index), df[nombre], equal_nan=True)
+    print(f"  {'✓' if iguales else '✗'} Coincide con calcular_indicadores ticker por ticker")
+
+    dir_cache = tempfile.mkdtemp()
+    for intento in ('cálculo', 'caché'):
+        inicio = time.perf_counter()
+        indicadores_universo(precios, dir_cache=dir_cache)
+        print(f"  ✓ indicadores_universo ({intento}): {time.perf_counter() - inicio:.2f} s")
+
+    # Un día nuevo en un solo ticker: solo ese se recalcula
+    precios.loc[fechas[-1], 'T000'] *= 1.01
+    inicio = time.perf_counter()
+    indicadores_universo(precios, dir_cache=dir_cache)
+    print(f"  ✓ Un ticker modificado: {time.perf_counter() - inicio:.2f} s")
+
+    tabla = señales_universo(precios.iloc[:, :8], dir_cache=None)
+    columnas = ['precio', 'sma20', 'sma50', 'rsi', 'tendencia', 'rsi_señal']
+    print(f"\n{tabla[columnas].round(2).to_string()}")
+    print("=" * 70)
@@ -0,0 +1,134 @@
+"""
+NORMALIZACIÓN DE TEXTOS (VECTORIZADA)
+Limpieza de columnas completas con patrones precompilados
+
+Reemplaza los bucles fila por fila (Series.apply con varios re.sub, o
+word_tokenize por fila) por operaciones del accessor .str sobre la columna
+completa, con los patrones combinados y compilados una sola vez.
+
+Los textos resultantes se "internan" (sys.intern sobre los valores únicos):
+los titulares repetidos comparten un único objeto en memoria y las
+comparaciones/hash posteriores son más baratas.
+
+FORMAS EXPUESTAS:
+    normalizar_serie      → limpieza general (minúsculas, sin URLs/menciones/hashtags)
+    normalizar_claves     → clave del caché de sentimiento (solo espacios; VADER
+                            distingue mayúsculas y signos)
+    preprocesar_tfidf     → solo palabras alfabéticas sin stopwords, para TF-IDF
+"""
+
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PATRONES PRECOMPILADOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+PATRON_RUIDO = re.compile(r'http\S+|@\w+|#\w+')   # URLs, menciones y hashtags en una pasada
+PATRON_ESPACIOS = re.compile(r'\s+')
+PATRON_PALABRA = re.compile(r'[^\W\d_]+')         # Solo letras (equivale a token.isalpha())
+
+# ══════════════════════════════════════════════════════════════════════════════
+# UTILIDADES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _como_serie(textos):
+    """Series de str (NaN/None → "")"""
+    serie = textos if isinstance(textos, pd.Series) else pd.Series(list(textos), dtype=object)
+    return serie.fillna('').astype(str)
+
+
+def internar(serie):
+    """
+    Interna los valores únicos de una Series de textos y la reconstruye.
+
+    RETORNA:
+        Series (dtype object) con el mismo índice; textos iguales son el
+        mismo objeto
+    """
+    codigos, unicos = pd.factorize(serie)
+    internados = np.array([sys.intern(u) for u in unicos] + [''], dtype=object)
+    return pd.Series(internados[codigos], index=serie.index, dtype=object)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# API PÚBLICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def normalizar_clave(texto):
+    """
+    Forma normalizada usada como clave del caché de sentimiento (un texto).
+
+    Solo colapsa espacios: VADER distingue mayúsculas y signos de puntuación,
+    así que cualquier otra normalización cambiaría el score.
+    """
+    return ' '.join(texto.split())
+
+
+def normalizar_claves(textos):
+    """Versión vectorizada de normalizar_clave para una columna completa"""
+    serie = _como_serie(textos)
+    return internar(serie.str.replace(PATRON_ESPACIOS, ' ', regex=True).str.strip())
+
+
+def normalizar_serie(textos):
+    """
+    Limpieza general de una columna de textos.
+
+    OPERACIONES:
+        - Convertir a minúsculas
+        - Remover URLs, menciones, hashtags
+        - Normalización de espacios
+
+    RETORNA:
+        Series con los textos limpios (internados)
+    """
+    serie = _como_serie(textos)
+    limpia = (serie.str.lower()
+              .str.replace(PATRON_RUIDO, '', regex=True)
+              .str.replace(PATRON_ESPACIOS, ' ', regex=True)
+              .str.strip())
+    return internar(limpia)
+
+
+def preprocesar_tfidf(textos, stop_words=None):
+    """
+    Texto listo para TfidfVectorizer: palabras alfabéticas sin stopwords,
+    unidas por espacios (reemplaza word_tokenize + filtro por fila).
+    """
+    serie = normalizar_serie(textos)
+    posiciones = pd.RangeIndex(len(serie))
+    tokens = serie.set_axis(posiciones).str.findall(PATRON_PALABRA).explode()
+    if stop_words:
+        tokens = tokens[~tokens.isin(stop_words)]
+    unidos = tokens.dropna().groupby(level=0).agg(' '.join)
+    return internar(unidos.reindex(posiciones, fill_value='').set_axis(serie.index))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    titulares = pd.Series([
+        "OPEP anuncia recorte de producción, precios del #petróleo suben https://t.co/x",
+        "Oil prices surge as @OPEC cuts output",
+        "  Crude   slumps on weak demand fears  "
+    ] * 50000)
+
+    print("=" * 70)
+    print("NORMALIZACIÓN DE TEXTOS")
+    print("=" * 70)
+
+    inicio = time.time()
+    limpios = normalizar_serie(titulares)
+    print(f"\n  ✓ {len(titulares):,} textos normalizados en {time.time() - inicio:.2f} s")
+    print(f"  Ejemplo original: {titulares.iloc[0]}")
+    print(f"  Ejemplo limpio:   {limpios.iloc[0]}")
+    print(f"  Clave de caché:   {normalizar_claves(titulares.iloc[2:3]).iloc[0]!r}")
+    print(f"  TF-IDF:           {preprocesar_tfidf(titulares.iloc[:1], {'de', 'del'}).iloc[0]}")
+    print("=" * 70)
@@ -0,0 +1,302 @@
+"""
+PIPELINE DE SENTIMIENTO EN STREAMING
+descarga → filtro → limpieza → puntuación → agregación → CSV, por lotes
+
+Cada etapa es un generador que recibe y entrega lotes (DataFrames de hasta
+`tam_lote` filas), así que las noticias fluyen de una etapa a la siguiente
+sin materializar el conjunto completo:
+
+    lotes = fuente_descargas()                    # o leer_csv_por_lotes(ruta)
+    lotes = etapa_filtrar(lotes)
+    lotes = etapa_limpiar(lotes)
+    lotes = etapa_puntuar(lotes)
+    lotes = etapa_agregar(lotes, acumulador)
+    lotes = etapa_ewma(lotes, estimador)
+    lotes = etapa_escribir_csv(lotes, ruta)
+    consumir(lotes)
+
+La memoria depende del tamaño de lote y no del volumen total (salvo el
+conjunto de firmas usado para descartar duplicados). Los primeros lotes se
+puntúan y escriben mientras las demás fuentes siguen descargando.
+
+USO:
+    python pipeline_streaming.py                   # descarga en vivo
+    python pipeline_streaming.py --csv base_datos_csv/noticias_reales.csv
+"""
+
+import os
+import re
+import importlib
+
+import numpy as np
+import pandas as pd
+
+from normalizacion_texto import normalizar_serie
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+TAM_LOTE = 500
+RUTA_SALIDA = "base_datos_csv/sentimientos_reales.csv"
+
+KEYWORDS = ['oil', 'crude', 'wti', 'brent', 'opec', 'petroleum', 'energy',
+            'barrel', 'price', 'production', 'inventory', 'petrol']
+
+COLUMNAS_SALIDA = ['noticia_id', 'fuente', 'fecha', 'texto', 'link',
+                   'score_compound', 'score_positivo', 'score_neutral',
+                   'score_negativo', 'clasificacion']
+
+_PATRON_KEYWORDS = re.compile('|'.join(map(re.escape, KEYWORDS)))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUENTES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def en_lotes(registros, tam_lote=TAM_LOTE):
+    """Agrupa un iterable de registros (dicts) en DataFrames de hasta tam_lote filas"""
+    lote = []
+    for registro in registros:
+        lote.append(registro)
+        if len(lote) >= tam_lote:
+            yield pd.DataFrame(lote)
+            lote = []
+    if lote:
+        yield pd.DataFrame(lote)
+
+
+def descargadores_por_defecto():
+    """Descargadores de 1b_descargar_noticias_reales (se ejecutan uno por uno)"""
+    modulo = importlib.import_module('1b_descargar_noticias_reales')
+    return [
+        lambda: modulo.obtener_google_news("oil prices WTI", max_noticias=30),
+        lambda: modulo.obtener_yahoo_finance_news("CL=F", max_noticias=20),
+        lambda: modulo.obtener_reddit_posts("oil", max_posts=15)
+    ]
+
+
+def fuente_descargas(descargadores=None, tam_lote=TAM_LOTE):
+    """
+    Fuente en vivo: ejecuta cada descargador y entrega sus noticias en lotes
+    apenas termina, sin esperar a las demás fuentes.
+
+    ENTRADA:
+        descargadores: lista de funciones sin argumentos que retornan list[dict]
+                       (None = Google News, Yahoo Finance y Reddit)
+    """
+    if descargadores is None:
+        descargadores = descargadores_por_defecto()
+
+    for descargar in descargadores:
+        yield from en_lotes(descargar(), tam_lote)
+
+
+def leer_csv_por_lotes(ruta, tam_lote=TAM_LOTE):
+    """Fuente desde archivo: lee el CSV por fragmentos (pd.read_csv chunksize)"""
+    with pd.read_csv(ruta, chunksize=tam_lote) as lector:
+        yield from lector
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ETAPAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _firmas(titulos):
+    """Firma simplificada (primeras 5 palabras ordenadas), igual que 1b"""
+    palabras = (titulos.str.lower()
+                .str.replace(r'[^a-z0-9\s]', '', regex=True)
+                .str.split().str[:5])
+    return palabras.map(lambda p: ' '.join(sorted(set(p))))
+
+
+def etapa_filtrar(lotes, columna_texto='titulo'):
+    """Conserva noticias con keywords de petróleo y descarta duplicados entre lotes"""
+    vistas = set()
+    for lote in lotes:
+        titulos = lote[columna_texto].fillna('').astype(str)
+        lote = lote[titulos.str.lower().str.contains(_PATRON_KEYWORDS)]
+        if lote.empty:
+            continue
+
+        firmas = _firmas(lote[columna_texto].astype(str))
+        nuevas = ~firmas.duplicated() & ~firmas.isin(vistas)
+        vistas.update(firmas[nuevas])
+
+        if nuevas.any():
+            yield lote[nuevas.values]
+
+
+def etapa_limpiar(lotes, columna_texto='titulo'):
+    """Agrega la columna '<columna>_limpio' a cada lote"""
+    for lote in lotes:
+        lote = lote.copy()
+        lote[f'{columna_texto}_limpio'] = normalizar_serie(lote[columna_texto])
+        yield lote
+
+
+def etapa_puntuar(lotes, columna_texto='titulo', motor='referencia'):
+    """Agrega scores VADER (con caché persistente) y clasificación a cada lote"""
+    from cache_sentimiento import CacheSentimiento
+    from sentimiento_lotes import clasificar_compound
+
+    # El caché se lee una vez por ejecución; cada lote solo agrega sus claves nuevas
+    cache = CacheSentimiento()
+    for lote in lotes:
+        scores = cache.puntuar(lote[columna_texto].fillna('').astype(str), motor=motor)
+        lote = lote.assign(score_compound=scores['compound'], score_positivo=scores['pos'],
+                           score_neutral=scores['neu'], score_negativo=scores['neg'],
+                           clasificacion=clasificar_compound(scores['compound']))
+        yield lote
+
+
+class AcumuladorSentimiento:
+    """
+    Sumas por (fecha, fuente) en el mismo formato que agregados_sentimiento,
+    de modo que serie_diaria(acumulador.tabla()) funciona directamente.
+    """
+
+    def __init__(self):
+        self._sumas = {}
+        self.n = 0
+        self.suma_compound = 0.0
+
+    def agregar(self, lote, columna_score='score_compound', columna_peso='peso'):
+        score = lote[columna_score].to_numpy(dtype=np.float64)
+        peso = (lote[columna_peso].to_numpy(dtype=np.float64) if columna_peso in lote.columns
+                else np.ones(len(lote)))
+
+        df = pd.DataFrame({
+            'fecha': pd.to_datetime(lote['fecha'], errors='coerce').dt.strftime('%Y-%m-%d').values,
+            'fuente': lote['fuente'].astype(str).values,
+            'suma_score': score,
+            'suma_ponderada': score * peso,
+            'suma_peso': peso,
+            'conteo': 1.0
+        })
+        for clave, fila in df.groupby(['fecha', 'fuente']).sum().iterrows():
+            previo = self._sumas.get(clave, np.zeros(4))
+            self._sumas[clave] = previo + fila.to_numpy()
+
+        self.n += len(lote)
+        self.suma_compound += float(score.sum())
+
+    @property
+    def promedio(self):
+        return self.suma_compound / self.n if self.n else 0.0
+
+    def tabla(self):
+        """DataFrame indexado por (fecha, fuente) con suma_score, suma_ponderada, suma_peso, conteo"""
+        from agregados_sentimiento import COLUMNAS_SUMA
+        indice = pd.MultiIndex.from_tuples(list(self._sumas), names=['fecha', 'fuente'])
+        return pd.DataFrame(list(self._sumas.values()), index=indice,
+                            columns=COLUMNAS_SUMA).sort_index()
+
+
+def etapa_agregar(lotes, acumulador):
+    """Actualiza el acumulador con cada lote y lo deja pasar sin cambios"""
+    for lote in lotes:
+        acumulador.agregar(lote)
+        yield lote
+
+
+def etapa_ewma(lotes, estimador, columna_score='score_compound'):
+    """Actualiza un EstimadorSentimientoEWMA titular por titular y deja pasar el lote"""
+    for lote in lotes:
+        estimador.actualizar_lote(lote, columna_score=columna_score)
+        yield lote
+
+
+def etapa_escribir_csv(lotes, ruta=RUTA_SALIDA, columnas=None, columna_texto='titulo'):
+    """
+    Escribe cada lote al CSV apenas llega (encabezado solo en el primero).
+
+    Con columnas=COLUMNAS_SALIDA produce el mismo formato que
+    3b_analisis_sentimiento_real (sentimientos_reales.csv).
+    """
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    escritos = 0
+    for lote in lotes:
+        salida = lote
+        if columnas is not None:
+            salida = lote.assign(
+                noticia_id=[f"NOT{escritos + i:04d}" for i in range(len(lote))],
+                texto=lote[columna_texto].fillna('').astype(str).str[:200]
+            ).reindex(columns=columnas)
+
+        salida.to_csv(ruta, mode='w' if escritos == 0 else 'a', header=escritos == 0,
+                      index=False, encoding='utf-8')
+        escritos += len(lote)
+        yield lote
+
+
+def consumir(lotes):
+    """Ejecuta el pipeline hasta agotar los lotes; retorna filas procesadas"""
+    return sum(len(lote) for lote in lotes)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PIPELINE COMPLETO
+# ══════════════════════════════════════════════════════════════════════════════
+
+def ejecutar_pipeline_sentimiento(fuente=None, ruta_salida=RUTA_SALIDA,
+                                  columna_texto='titulo', motor='referencia'):
+    """
+    Descarga (o lee), filtra, limpia, puntúa, agrega y escribe en streaming.
+
+    ENTRADA:
+        fuente: iterable de lotes (None = fuente_descargas())
+        ruta_salida: CSV con formato de sentimientos_reales.csv
+        motor: motor de sentimiento ('referencia' o 'vectorizado')
+
+    RETORNA:
+        n_procesadas, acumulador (AcumuladorSentimiento), estimador (EWMA)
+    """
+    from sentimiento_ewma import EstimadorSentimientoEWMA
+
+    if fuente is None:
+        fuente = fuente_descargas()
+
+    acumulador = AcumuladorSentimiento()
+    estimador = EstimadorSentimientoEWMA()
+
+    lotes = etapa_filtrar(fuente, columna_texto)
+    lotes = etapa_limpiar(lotes, columna_texto)
+    lotes = etapa_puntuar(lotes, columna_texto, motor=motor)
+    lotes = etapa_agregar(lotes, acumulador)
+    lotes = etapa_ewma(lotes, estimador)
+    lotes = etapa_escribir_csv(lotes, ruta_salida, columnas=COLUMNAS_SALIDA,
+                               columna_texto=columna_texto)
+
+    n_procesadas = 0
+    for lote in lotes:
+        n_procesadas += len(lote)
+        print(f"  ✓ Lote procesado: {len(lote)} noticias (acumulado: {n_procesadas}, "
+              f"sentimiento promedio: {acumulador.promedio:+.3f}, EWMA: {estimador.valor():+.3f})")
+
+    return n_procesadas, acumulador, estimador
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import sys
+
+    print("=" * 70)
+    print("PIPELINE DE SENTIMIENTO EN STREAMING")
+    print("=" * 70)
+
+    if '--csv' in sys.argv:
+        ruta_entrada = sys.argv[sys.argv.index('--csv') + 1]
+        print(f"\n  Fuente: {ruta_entrada} (lotes de {TAM_LOTE})")
+        fuente = leer_csv_por_lotes(ruta_entrada)
+    else:
+        print("\n  Fuente: descarga en vivo (Google News, Yahoo Finance, Reddit)")
+        fuente = fuente_descargas()
+
+    n, acumulador, estimador = ejecutar_pipeline_sentimiento(fuente)
+
+    print(f"\n  ✓ Total procesadas: {n}")
+    print(f"  ✓ Sentimiento promedio: {acumulador.promedio:+.3f}")
+    print(f"  ✓ Sentimiento EWMA:     {estimador.valor():+.3f}")
+    print(f"  ✓ Guardado: {RUTA_SALIDA}")
+    print("=" * 70)
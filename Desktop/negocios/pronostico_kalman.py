@@ -0,0 +1,362 @@
+"""
+PRONÓSTICO EN LÍNEA CON FILTRO DE KALMAN (NIVEL LOCAL / TENDENCIA LOCAL)
+Actualización O(1) por precio nuevo, sin reajustar el modelo
+
+MODELO DE ESPACIO DE ESTADOS:
+    y_t     = nivel_t + ε_t                          ε ~ N(0, r)
+    nivel_t = nivel_{t-1} + pendiente_{t-1} + η_t    η ~ N(0, q_nivel)
+    pend_t  = pend_{t-1} + ζ_t                       ζ ~ N(0, q_pendiente)
+
+    'nivel'     → pendiente fija en 0 (paseo aleatorio con ruido)
+    'tendencia' → nivel y pendiente estocásticos
+
+Con un estado de 2 componentes, cada precio nuevo cuesta una predicción y
+una corrección con escalares (sin matrices ni historia). El pronóstico a
+h pasos es nivel + h·pendiente, con varianza P_h[0,0] + r obtenida
+propagando la covarianza h pasos; el intervalo es media ± z·√varianza.
+
+Las varianzas de ruido se estiman una sola vez por máxima verosimilitud
+(rejilla de proporciones sobre la varianza de las diferencias) al crear el
+filtro de un ticker. El estado de todos los tickers se guarda en
+base_datos_csv/estado_kalman.json para retomar el flujo de precios.
+
+BARRA ACTUAL (precios con fecha):
+    fecha posterior a la última  → barra nueva (se guarda el estado previo)
+    misma fecha (mismo día)      → cierre revisado: se vuelve al estado
+                                   previo y se corrige con el precio nuevo
+    fecha anterior               → ValueError (tick repetido o desordenado)
+
+FECHAS DEL PRONÓSTICO:
+    Días calendario, como Prophet (registro_pronosticos y el tensor guardan
+    h en días calendario). El filtro avanza un paso por barra hábil, así que
+    cada fecha lleva el pronóstico de la barra que la resuelve: la primera
+    hábil en o después de esa fecha (un sábado o domingo, la del lunes).
+"""
+
+import os
+import json
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_ESTADO = "base_datos_csv/estado_kalman.json"
+
+MODELOS_KALMAN = ('nivel', 'tendencia')
+
+# Rejilla de estimación: fracción de var(Δy) atribuida a q_nivel y razón
+# q_pendiente / q_nivel
+FRACCIONES_NIVEL = (0.05, 0.1, 0.2, 0.35, 0.5, 0.65, 0.8, 0.9, 0.97)
+RAZONES_PENDIENTE = (1e-4, 1e-3, 1e-2)
+
+HISTORIA_ESTIMACION = 1000     # últimas observaciones usadas para estimar ruidos
+DIFUSA = 1e4                   # varianza inicial (en múltiplos de q_nivel + r)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FILTRO
+# ══════════════════════════════════════════════════════════════════════════════
+
+class FiltroKalman:
+    """Estado de un ticker: nivel, pendiente, covarianza 2×2 y ruidos"""
+
+    def __init__(self, q_nivel, q_pendiente, r, nivel, p_inicial, modelo='tendencia'):
+        if modelo not in MODELOS_KALMAN:
+            raise ValueError(f"Modelo desconocido: '{modelo}' (opciones: {', '.join(MODELOS_KALMAN)})")
+        self.modelo = modelo
+        self.q_nivel = float(q_nivel)
+        self.q_pendiente = float(q_pendiente) if modelo == 'tendencia' else 0.0
+        self.r = float(r)
+        self.nivel = float(nivel)
+        self.pendiente = 0.0
+        self.p11 = float(p_inicial)
+        self.p12 = 0.0
+        self.p22 = float(p_inicial) if modelo == 'tendencia' else 0.0
+        self.n = 0
+        self.log_verosimilitud = 0.0
+        self.ultima_fecha = None
+        self.previo = None          # estado antes de la barra actual (para revisarla)
+
+    _CAMPOS_ESTADO = ('nivel', 'pendiente', 'p11', 'p12', 'p22', 'n', 'log_verosimilitud')
+
+    def actualizar(self, precio, fecha=None):
+        """
+        Incorpora un precio (predicción + corrección). Costo O(1).
+
+        Con fecha, un precio del mismo día que la última barra la reemplaza
+        (se corrige desde el estado previo a esa barra) y uno anterior lanza
+        ValueError. Sin fecha, cada precio es una barra nueva.
+
+        RETORNA:
+            innovación (precio − predicción a 1 paso)
+        """
+        if fecha is not None:
+            dia = _dia(fecha)
+            if self.ultima_fecha is not None and dia < self.ultima_fecha:
+                raise ValueError(f"Precio del {dia.date()} anterior a la última barra "
+                                 f"({self.ultima_fecha.date()})")
+            if self.ultima_fecha is not None and dia == self.ultima_fecha:
+                if self.previo is None:
+                    raise ValueError(f"Sin estado previo para revisar la barra del {dia.date()}")
+                vars(self).update(self.previo)
+            else:
+                self.previo = {c: getattr(self, c) for c in self._CAMPOS_ESTADO}
+            self.ultima_fecha = dia
+        else:
+            self.previo = None
+
+        # Predicción
+        nivel = self.nivel + self.pendiente
+        p11 = self.p11 + 2 * self.p12 + self.p22 + self.q_nivel
+        p12 = self.p12 + self.p22
+        p22 = self.p22 + self.q_pendiente
+
+        # Corrección
+        innovacion = float(precio) - nivel
+        s = p11 + self.r
+        k1, k2 = p11 / s, p12 / s
+        self.nivel = nivel + k1 * innovacion
+        self.pendiente += k2 * innovacion
+        self.p11 = (1 - k1) * p11
+        self.p12 = (1 - k1) * p12
+        self.p22 = p22 - k2 * p12
+
+        # Las 2 primeras innovaciones dependen de la inicialización difusa
+        if self.n >= 2:
+            self.log_verosimilitud -= 0.5 * (math.log(2 * math.pi * s) + innovacion ** 2 / s)
+        self.n += 1
+        return innovacion
+
+    def pronosticar(self, pasos):
+        """
+        Media y varianza del precio a 1..pasos pasos.
+
+        RETORNA:
+            (media, varianza) como np.ndarray de largo `pasos`
+        """
+        h = np.arange(1, pasos + 1, dtype=np.float64)
+        media = self.nivel + h * self.pendiente
+
+        varianza = np.empty(pasos)
+        p11, p12, p22 = self.p11, self.p12, self.p22
+        for i in range(pasos):
+            p11 = p11 + 2 * p12 + p22 + self.q_nivel
+            p12 = p12 + p22
+            p22 = p22 + self.q_pendiente
+            varianza[i] = p11 + self.r
+        return media, varianza
+
+    def a_dict(self):
+        datos = dict(vars(self))
+        datos['ultima_fecha'] = self.ultima_fecha.isoformat() if self.ultima_fecha is not None else None
+        return datos
+
+    @classmethod
+    def desde_dict(cls, datos):
+        filtro = cls.__new__(cls)
+        filtro.previo = None
+        vars(filtro).update(datos)
+        if datos.get('ultima_fecha'):
+            filtro.ultima_fecha = pd.Timestamp(datos['ultima_fecha'])
+        return filtro
+
+
+def _dia(fecha):
+    """Fecha de la barra diaria (sin hora ni zona horaria)"""
+    fecha = pd.Timestamp(fecha)
+    if fecha.tzinfo is not None:
+        fecha = fecha.tz_localize(None)
+    return fecha.normalize()
+
+
+def _filtrar(y, q_nivel, q_pendiente, r, modelo):
+    filtro = FiltroKalman(q_nivel, q_pendiente, r, y[0], DIFUSA * (q_nivel + r), modelo)
+    for valor in y[1:]:
+        filtro.actualizar(valor)
+    return filtro
+
+
+def ajustar_filtro(serie, modelo='tendencia'):
+    """
+    Estima los ruidos por máxima verosimilitud y filtra la serie completa.
+
+    ENTRADA:
+        serie: pd.Series de precios indexada por fecha
+        modelo: 'nivel' o 'tendencia'
+
+    RETORNA:
+        FiltroKalman con el estado al último precio
+    """
+    serie = serie.dropna().sort_index()
+    y = serie.to_numpy(dtype=np.float64)
+    if len(y) < 10:
+        raise ValueError(f"Serie muy corta para estimar el filtro: {len(y)} observaciones")
+
+    muestra = y[-HISTORIA_ESTIMACION:]
+    var_diferencias = float(np.var(np.diff(muestra))) or 1e-8
+
+    razones = RAZONES_PENDIENTE if modelo == 'tendencia' else (0.0,)
+    mejor = None
+    for fraccion in FRACCIONES_NIVEL:
+        # var(Δy) ≈ q_nivel + 2r en el modelo de nivel local
+        q_nivel = fraccion * var_diferencias
+        r = (1 - fraccion) * var_diferencias / 2
+        for razon in razones:
+            filtro = _filtrar(muestra, q_nivel, razon * q_nivel, r, modelo)
+            if mejor is None or filtro.log_verosimilitud > mejor[0]:
+                mejor = (filtro.log_verosimilitud, q_nivel, razon * q_nivel, r)
+
+    _, q_nivel, q_pendiente, r = mejor
+    filtro = _filtrar(y[:-1], q_nivel, q_pendiente, r, modelo)
+    # El último precio entra con su fecha: queda el estado previo para revisar esa barra
+    filtro.actualizar(y[-1], serie.index[-1])
+    return filtro
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MOTOR MULTI-TICKER CON PUNTO DE CONTROL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MotorKalman:
+    """Filtros por ticker, alimentados precio a precio y guardados en disco"""
+
+    def __init__(self, filtros=None, modelo='tendencia'):
+        self.filtros = dict(filtros or {})
+        self.modelo = modelo
+
+    def ingerir(self, ticker, precio, fecha):
+        """
+        Un precio de un ticker ya inicializado (O(1)). Un precio del mismo
+        día que la última barra la revisa; uno anterior lanza ValueError.
+        """
+        return self.filtros[ticker.upper()].actualizar(precio, fecha)
+
+    def ingerir_serie(self, ticker, serie):
+        """
+        Crea el filtro del ticker si no existe; si existe, revisa la barra de
+        su última fecha (cierre corregido) e ingiere los precios posteriores.
+
+        RETORNA:
+            número de precios incorporados (incluida la barra revisada)
+        """
+        ticker = ticker.upper()
+        serie = serie.dropna().sort_index()
+        if ticker not in self.filtros:
+            self.filtros[ticker] = ajustar_filtro(serie, self.modelo)
+            return len(serie)
+
+        filtro = self.filtros[ticker]
+        if filtro.ultima_fecha is not None:
+            dias = pd.DatetimeIndex(serie.index)
+            if dias.tz is not None:
+                dias = dias.tz_localize(None)
+            serie = serie[dias.normalize() >= filtro.ultima_fecha]
+        for fecha, precio in serie.items():
+            filtro.actualizar(precio, fecha)
+        return len(serie)
+
+    def pronosticar(self, ticker, dias=10, nivel_confianza=0.80):
+        """
+        Pronóstico de un ticker con intervalo normal para los próximos `dias`
+        días calendario (cada fecha con el paso de la barra hábil que la
+        resuelve).
+
+        RETORNA:
+            DataFrame con fecha, prediccion, limite_inf, limite_sup
+            (mismo formato que generar_prediccion)
+        """
+        filtro = self.filtros[ticker.upper()]
+        inicio = filtro.ultima_fecha if filtro.ultima_fecha is not None else _dia(pd.Timestamp.today())
+        fechas = pd.date_range(inicio + pd.Timedelta(days=1), periods=dias, freq='D')
+
+        # Paso de cada fecha = barras hábiles desde la última hasta la que la resuelve
+        cierre = np.busday_offset(fechas.values.astype('datetime64[D]'), 0, roll='forward')
+        pasos = np.busday_count(np.datetime64(inicio.date()) + 1, cierre) + 1
+        media, varianza = filtro.pronosticar(int(pasos.max()))
+        media, varianza = media[pasos - 1], varianza[pasos - 1]
+
+        z = NormalDist().inv_cdf(0.5 + nivel_confianza / 2)
+        ancho = z * np.sqrt(varianza)
+        return pd.DataFrame({'fecha': fechas, 'prediccion': media,
+                             'limite_inf': media - ancho, 'limite_sup': media + ancho})
+
+    def guardar(self, ruta=RUTA_ESTADO):
+        """Punto de control: escribe a un temporal y reemplaza (no deja archivos a medias)"""
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        datos = {'modelo': self.modelo,
+                 'filtros': {t: f.a_dict() for t, f in self.filtros.items()}}
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f, indent=2)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_ESTADO, modelo='tendencia'):
+        """Motor desde el punto de control (vacío si no existe)"""
+        if not os.path.exists(ruta):
+            return cls(modelo=modelo)
+        with open(ruta, encoding='utf-8') as f:
+            datos = json.load(f)
+        filtros = {t: FiltroKalman.desde_dict(d) for t, d in datos['filtros'].items()}
+        return cls(filtros, datos.get('modelo', modelo))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("PRONÓSTICO EN LÍNEA CON FILTRO DE KALMAN")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    fechas = pd.bdate_range('2021-01-01', periods=1300)
+    nivel = 70 + np.cumsum(rng.normal(0.03, 0.8, len(fechas)))
+    serie = pd.Series(nivel + rng.normal(0, 0.5, len(fechas)), index=fechas)
+    historia, nuevos = serie.iloc[:-250], serie.iloc[-250:]
+
+    motor = MotorKalman()
+    inicio = time.perf_counter()
+    motor.ingerir_serie('WTI', historia)
+    filtro = motor.filtros['WTI']
+    print(f"\n  ✓ Filtro estimado en {time.perf_counter() - inicio:.2f} s "
+          f"(q_nivel={filtro.q_nivel:.3f}, q_pendiente={filtro.q_pendiente:.5f}, r={filtro.r:.3f})")
+
+    ruta = os.path.join(tempfile.mkdtemp(), 'estado_kalman.json')
+    motor.guardar(ruta)
+    motor = MotorKalman.cargar(ruta)
+
+    inicio = time.perf_counter()
+    errores = []
+    for fecha, precio in nuevos.items():
+        prediccion = motor.filtros['WTI'].pronosticar(1)[0][0]
+        errores.append(precio - prediccion)
+        motor.ingerir('WTI', precio, fecha)
+    por_tick = (time.perf_counter() - inicio) / len(nuevos) * 1e6
+    print(f"  ✓ {len(nuevos)} precios nuevos: {por_tick:.1f} µs por precio "
+          f"(RMSE a 1 paso {np.sqrt(np.mean(np.square(errores))):.3f})")
+
+    motor.guardar(ruta)
+    print(f"  ✓ Punto de control: {ruta}")
+
+    # Cierre revisado de la barra actual: se corrige desde el estado previo
+    ultima = nuevos.index[-1]
+    revisado = MotorKalman.cargar(ruta)
+    revisado.ingerir('WTI', nuevos.iloc[-1] + 1.0, ultima)
+    revisado.ingerir('WTI', nuevos.iloc[-1], ultima)
+    igual = np.isclose(revisado.filtros['WTI'].nivel, motor.filtros['WTI'].nivel)
+    print(f"  {'✓' if igual else '✗'} Barra revisada dos veces = estado original (sin doble ingesta)")
+    try:
+        revisado.ingerir('WTI', nuevos.iloc[-2], nuevos.index[-2])
+    except ValueError as error:
+        print(f"  ✓ Tick anterior rechazado: {error}")
+
+    print(f"\n{motor.pronosticar('WTI', 10).round(dict.fromkeys(['prediccion', 'limite_inf', 'limite_sup'], 2)).to_string(index=False)}")
+    print("=" * 70)
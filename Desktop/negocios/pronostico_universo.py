@@ -0,0 +1,215 @@
+"""
+PRONÓSTICO PARALELO DEL UNIVERSO DE TICKERS
+Ajusta y predice Prophet para WTI, Brent, empresas USA y BVL a la vez
+
+Cada serie se procesa en un proceso del pool (ProcessPoolExecutor). El
+ajuste de Stan es de un solo hilo, así que el paralelismo útil está entre
+series; para que los procesos no compitan por núcleos, cada trabajador
+limita sus hilos de BLAS/OpenMP a `hilos_por_proceso` (por defecto 1).
+
+Los modelos pasan por cache_modelos.ajustar_prophet, de modo que una
+segunda ejecución del día solo carga modelos y predice.
+
+SALIDA:
+    base_datos_csv/predicciones_universo.csv   (ticker, fecha, prediccion,
+                                                limite_inf, limite_sup)
+
+USO:
+    python pronostico_universo.py                 # todo el universo, 30 días
+    python pronostico_universo.py 10 WTI BRENT    # horizonte y tickers
+    python pronostico_universo.py 10 --rapido     # perfil rápido de Prophet
+"""
+
+import os
+import time
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from catalogo_precios import BASE_DIR, listar_tickers, leer_serie_precio
+from configuracion_prophet import parametros_prophet, predecir_horizonte
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_SALIDA = f"{BASE_DIR}/predicciones_universo.csv"
+
+DIAS_PREDICCION = 30
+MIN_OBSERVACIONES = 60
+
+_VARIABLES_HILOS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRABAJADOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+def inicializar_trabajador(hilos=1):
+    """Limita hilos nativos del proceso y silencia el log de cmdstanpy"""
+    for variable in _VARIABLES_HILOS:
+        os.environ[variable] = str(hilos)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(hilos)
+    except ImportError:
+        pass
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+
+
+@contextmanager
+def hilos_limitados(hilos=1):
+    """
+    Fija las variables de hilos BLAS/OpenMP mientras dura el bloque; los
+    procesos hijos creados dentro las heredan desde su arranque.
+    """
+    previas = {v: os.environ.get(v) for v in _VARIABLES_HILOS}
+    for variable in _VARIABLES_HILOS:
+        os.environ[variable] = str(hilos)
+    try:
+        yield
+    finally:
+        for variable, valor in previas.items():
+            if valor is None:
+                os.environ.pop(variable, None)
+            else:
+                os.environ[variable] = valor
+
+
+def pronosticar_serie(ticker, serie, dias=DIAS_PREDICCION, parametros=None,
+                      dir_cache=None, perfil='completo'):
+    """
+    Ajusta Prophet sobre una serie de precios y predice `dias` días.
+
+    Sin `parametros` explícitos se usan los del perfil ('completo' o 'rapido').
+
+    RETORNA:
+        (forecast_futuro, resumen): DataFrame con ticker, fecha, prediccion,
+        limite_inf, limite_sup y dict con precio_actual, precio_predicho,
+        cambio_porcentual, modo y segundos
+    """
+    from cache_modelos import ajustar_prophet, DIR_CACHE
+
+    inicio = time.time()
+    df_prophet = pd.DataFrame({'ds': serie.index, 'y': serie.values}).dropna()
+    if parametros is None:
+        parametros = parametros_prophet(df_prophet['ds'], perfil, ticker=ticker)
+
+    model, modo = ajustar_prophet(df_prophet, nombre=ticker.lower(),
+                                  dir_cache=dir_cache or DIR_CACHE, **parametros)
+    forecast_futuro = predecir_horizonte(model, dias)
+    forecast_futuro = forecast_futuro[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    forecast_futuro.columns = ['fecha', 'prediccion', 'limite_inf', 'limite_sup']
+    forecast_futuro.insert(0, 'ticker', ticker)
+
+    precio_actual = float(df_prophet['y'].iloc[-1])
+    precio_predicho = float(forecast_futuro['prediccion'].iloc[-1])
+    resumen = {
+        'ticker': ticker,
+        'precio_actual': precio_actual,
+        'precio_predicho': precio_predicho,
+        'cambio_porcentual': (precio_predicho - precio_actual) / precio_actual * 100,
+        'modo': modo,
+        'segundos': time.time() - inicio
+    }
+    return forecast_futuro.reset_index(drop=True), resumen
+
+
+def _tarea(ticker, ruta, dias, parametros, dir_cache, perfil):
+    serie = leer_serie_precio(ruta).dropna()
+    if len(serie) < MIN_OBSERVACIONES:
+        raise ValueError(f"solo {len(serie)} observaciones (mínimo {MIN_OBSERVACIONES})")
+    return pronosticar_serie(ticker, serie, dias, parametros, dir_cache, perfil)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RUNNER
+# ══════════════════════════════════════════════════════════════════════════════
+
+def pronosticar_universo(tickers=None, dias=DIAS_PREDICCION, base_dir=BASE_DIR,
+                         ruta_salida=RUTA_SALIDA, n_procesos=None, hilos_por_proceso=1,
+                         parametros=None, dir_cache=None, perfil='completo'):
+    """
+    Pronostica todas las series del universo en paralelo.
+
+    ENTRADA:
+        tickers: lista de tickers (None = todos los CSV de base_datos_csv)
+        dias: horizonte de predicción
+        n_procesos: procesos del pool (None = núcleos disponibles)
+        hilos_por_proceso: límite de hilos BLAS/OpenMP por proceso
+        perfil: 'completo' o 'rapido' (ver configuracion_prophet)
+        ruta_salida: CSV consolidado (None = no guardar)
+
+    RETORNA:
+        predicciones: DataFrame (ticker, fecha, prediccion, limite_inf, limite_sup)
+        resumen: DataFrame con una fila por ticker (incluye errores)
+    """
+    rutas = listar_tickers(base_dir)
+    if tickers is not None:
+        rutas = {t.upper(): rutas[t.upper()] for t in tickers if t.upper() in rutas}
+
+    if n_procesos is None:
+        n_procesos = os.cpu_count() or 1
+    n_procesos = max(1, min(n_procesos, len(rutas)))
+
+    predicciones, filas = [], []
+    with hilos_limitados(hilos_por_proceso):
+        with ProcessPoolExecutor(max_workers=n_procesos, initializer=inicializar_trabajador,
+                                 initargs=(hilos_por_proceso,)) as pool:
+            futuros = {pool.submit(_tarea, ticker, ruta, dias, parametros, dir_cache, perfil): ticker
+                       for ticker, ruta in rutas.items()}
+            for futuro in as_completed(futuros):
+                ticker = futuros[futuro]
+                try:
+                    forecast_futuro, resumen = futuro.result()
+                except Exception as e:
+                    print(f"  ⚠️ {ticker}: {e}")
+                    filas.append({'ticker': ticker, 'error': str(e)})
+                    continue
+                predicciones.append(forecast_futuro)
+                filas.append(resumen)
+                print(f"  ✓ {ticker:<10} {resumen['cambio_porcentual']:+6.2f}% "
+                      f"({resumen['modo']}, {resumen['segundos']:.1f} s)")
+
+    df_predicciones = (pd.concat(predicciones, ignore_index=True) if predicciones
+                       else pd.DataFrame(columns=['ticker', 'fecha', 'prediccion',
+                                                  'limite_inf', 'limite_sup']))
+    df_predicciones = df_predicciones.sort_values(['ticker', 'fecha']).reset_index(drop=True)
+    df_resumen = pd.DataFrame(filas) if filas else pd.DataFrame(columns=['ticker', 'error'])
+    df_resumen = df_resumen.sort_values('ticker').reset_index(drop=True)
+
+    if ruta_salida is not None and len(df_predicciones):
+        os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+        df_predicciones.to_csv(ruta_salida, index=False)
+
+    return df_predicciones, df_resumen
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import sys
+
+    argumentos = [a for a in sys.argv[1:] if a != '--rapido']
+    perfil = 'rapido' if '--rapido' in sys.argv else 'completo'
+    dias = int(argumentos[0]) if argumentos else DIAS_PREDICCION
+    tickers = argumentos[1:] or None
+
+    print("=" * 70)
+    print("PRONÓSTICO PARALELO DEL UNIVERSO DE TICKERS")
+    print("=" * 70)
+
+    inicio = time.time()
+    df_predicciones, df_resumen = pronosticar_universo(tickers, dias, perfil=perfil)
+
+    if 'segundos' in df_resumen.columns:
+        secuencial = df_resumen['segundos'].sum()
+        print(f"\n  ✓ Series pronosticadas: {df_predicciones['ticker'].nunique()}")
+        print(f"  ✓ Tiempo total: {time.time() - inicio:.1f} s "
+              f"(suma de series: {secuencial:.1f} s)")
+        print(f"  ✓ Guardado: {RUTA_SALIDA}")
+        print(f"\n{df_resumen.round(2).to_string(index=False)}")
+    print("=" * 70)
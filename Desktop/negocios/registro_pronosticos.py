@@ -0,0 +1,327 @@
+"""
+REGISTRO DE PRONÓSTICOS (LEDGER) Y PRECISIÓN MEDIDA
+Guarda cada pronóstico emitido y lo compara con el precio real al llegar
+
+Tres archivos en base_datos_csv/, todos de solo agregado:
+
+    registro_pronosticos.csv     un pronóstico por (ticker, modelo,
+                                 fecha_emision, fecha_objetivo)
+    registro_realizados.csv      el precio real de cada pronóstico resuelto
+    estadisticas_pronosticos.csv sumas acumuladas de error por
+                                 (ticker, modelo, h = días de anticipación)
+
+actualizar_registro() solo procesa los pronósticos pendientes cuya fecha
+objetivo ya tiene precio (el primer cierre en o después de esa fecha: un
+objetivo en sábado, domingo o feriado se resuelve con la sesión
+siguiente), agrega sus resultados y suma sus errores a las estadísticas;
+nunca recalcula lo ya resuelto. Con esas sumas, confianza_medida() reemplaza constantes como la
+C = 0.87 de modulo_4_integracion por 1 − MAPE observado.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from tensor_pronosticos import MODELO_DEFECTO, guardar_pronostico
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+BASE_DIR = "base_datos_csv"
+RUTA_REGISTRO = f"{BASE_DIR}/registro_pronosticos.csv"
+RUTA_REALIZADOS = f"{BASE_DIR}/registro_realizados.csv"
+RUTA_ESTADISTICAS = f"{BASE_DIR}/estadisticas_pronosticos.csv"
+
+CLAVE = ['ticker', 'modelo', 'fecha_emision', 'fecha_objetivo']
+
+COLUMNAS_REGISTRO = CLAVE + ['h', 'precio_emision', 'prediccion', 'limite_inf', 'limite_sup']
+COLUMNAS_REALIZADOS = CLAVE + ['h', 'fecha_precio', 'real', 'error', 'error_pct',
+                               'dentro_intervalo', 'acierto_direccion']
+COLUMNAS_SUMAS = ['n', 'suma_error', 'suma_abs', 'suma_cuadrado', 'suma_abs_pct',
+                  'dentro_intervalo', 'acierto_direccion']
+
+# Nombres de columnas de pronóstico en los distintos scripts → esquema del registro
+_ALIAS = {
+    'ds': 'fecha', 'precio_predicho': 'prediccion', 'yhat': 'prediccion',
+    'limite_inferior': 'limite_inf', 'yhat_lower': 'limite_inf',
+    'limite_superior': 'limite_sup', 'yhat_upper': 'limite_sup'
+}
+
+MIN_RESUELTOS = 10
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LECTURA / ESCRITURA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _leer(ruta, columnas):
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=columnas)
+    df = pd.read_csv(ruta)
+    for columna in ('fecha_emision', 'fecha_objetivo', 'fecha_precio'):
+        if columna in df.columns:
+            df[columna] = pd.to_datetime(df[columna])
+    return df
+
+
+def _agregar(df, ruta):
+    """Agrega filas al CSV (encabezado solo si el archivo es nuevo)"""
+    if df.empty:
+        return
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    nuevo = not os.path.exists(ruta)
+    df.to_csv(ruta, mode='w' if nuevo else 'a', header=nuevo, index=False,
+              date_format='%Y-%m-%d')
+
+
+def cargar_registro(ruta=RUTA_REGISTRO):
+    return _leer(ruta, COLUMNAS_REGISTRO)
+
+
+def cargar_realizados(ruta=RUTA_REALIZADOS):
+    return _leer(ruta, COLUMNAS_REALIZADOS)
+
+
+def cargar_estadisticas(ruta=RUTA_ESTADISTICAS):
+    return _leer(ruta, ['ticker', 'modelo', 'h'] + COLUMNAS_SUMAS)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# REGISTRO DE PRONÓSTICOS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _normalizar_fecha(fechas):
+    fechas = pd.to_datetime(pd.Series(fechas))
+    if fechas.dt.tz is not None:
+        fechas = fechas.dt.tz_localize(None)
+    return fechas.dt.normalize()
+
+
+def registrar_pronostico(forecast, ticker, modelo, fecha_emision, precio_emision,
+                         ruta=RUTA_REGISTRO):
+    """
+    Agrega un pronóstico al registro (idempotente: las claves ya registradas
+    se ignoran, así que re-ejecutar el mismo día no duplica filas). El
+    tensor recibe solo las filas aceptadas, de modo que registro y tensor
+    guardan el mismo valor (la primera escritura).
+
+    ENTRADA:
+        forecast: DataFrame de fechas futuras con fecha/ds y prediccion
+                  (acepta precio_predicho, yhat, limite_inferior, yhat_lower, ...)
+        ticker, modelo: identificadores (p.ej. 'WTI', 'prophet_script2'; una
+                        etiqueta por script, ver tensor_pronosticos.MODELOS_REGISTRADOS)
+        fecha_emision: última fecha con precio conocido al pronosticar
+        precio_emision: último precio conocido
+
+    RETORNA:
+        número de filas nuevas
+    """
+    df = forecast.rename(columns=_ALIAS)
+    fecha_emision = _normalizar_fecha([fecha_emision]).iloc[0]
+
+    nuevas = pd.DataFrame({
+        'ticker': ticker.upper(),
+        'modelo': modelo,
+        'fecha_emision': fecha_emision,
+        'fecha_objetivo': _normalizar_fecha(df['fecha']).values,
+        'precio_emision': float(precio_emision),
+        'prediccion': df['prediccion'].to_numpy(dtype=np.float64),
+        'limite_inf': df['limite_inf'].to_numpy(dtype=np.float64) if 'limite_inf' in df else np.nan,
+        'limite_sup': df['limite_sup'].to_numpy(dtype=np.float64) if 'limite_sup' in df else np.nan
+    })
+    nuevas = nuevas[nuevas['fecha_objetivo'] > fecha_emision]
+    nuevas.insert(4, 'h', (nuevas['fecha_objetivo'] - fecha_emision).dt.days)
+
+    existentes = cargar_registro(ruta)
+    if len(existentes):
+        ya = pd.MultiIndex.from_frame(existentes[CLAVE])
+        nuevas = nuevas[~pd.MultiIndex.from_frame(nuevas[CLAVE]).isin(ya)]
+
+    _agregar(nuevas[COLUMNAS_REGISTRO], ruta)
+    # Mantener el tensor multi-horizonte (consulta directa de "el valor a h días")
+    # con las mismas filas aceptadas: ambos conservan la primera escritura
+    if len(nuevas):
+        guardar_pronostico(nuevas.rename(columns={'fecha_objetivo': 'fecha'}), ticker, modelo,
+                           fecha_emision, os.path.dirname(ruta) or '.')
+    return len(nuevas)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ACTUALIZACIÓN INCREMENTAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _precios_registro(tickers):
+    """Precios de cierre de los tickers del registro (catalogo_precios)"""
+    from catalogo_precios import cargar_universo
+    return cargar_universo(tickers=list(tickers))
+
+
+def actualizar_registro(precios=None, ruta_registro=RUTA_REGISTRO,
+                        ruta_realizados=RUTA_REALIZADOS, ruta_estadisticas=RUTA_ESTADISTICAS):
+    """
+    Resuelve los pronósticos pendientes cuya fecha objetivo ya tiene precio.
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (None = cargar desde base_datos_csv)
+
+    RETORNA:
+        DataFrame con los pronósticos resueltos en esta llamada
+    """
+    registro = cargar_registro(ruta_registro)
+    if registro.empty:
+        return pd.DataFrame(columns=COLUMNAS_REALIZADOS)
+
+    realizados = cargar_realizados(ruta_realizados)
+    pendientes = registro
+    if len(realizados):
+        resueltas = pd.MultiIndex.from_frame(realizados[CLAVE])
+        pendientes = registro[~pd.MultiIndex.from_frame(registro[CLAVE]).isin(resueltas)]
+
+    if precios is None:
+        precios = _precios_registro(pendientes['ticker'].unique())
+    if pendientes.empty or precios.empty:
+        return pd.DataFrame(columns=COLUMNAS_REALIZADOS)
+
+    # Precios en formato largo; "real" = primer cierre en o después de la fecha
+    # objetivo (siempre posterior a la emisión, porque el objetivo lo es)
+    largos = (precios.rename_axis('fecha_precio').reset_index()
+              .melt(id_vars='fecha_precio', var_name='ticker', value_name='real')
+              .dropna().sort_values('fecha_precio'))
+    ultima_fecha = largos.groupby('ticker')['fecha_precio'].max()
+
+    # Solo objetivos que ya tienen algún cierre en o después de su fecha
+    pendientes = pendientes[pendientes['fecha_objetivo'] <=
+                            pendientes['ticker'].map(ultima_fecha)]
+    if pendientes.empty:
+        return pd.DataFrame(columns=COLUMNAS_REALIZADOS)
+
+    resueltos = pd.merge_asof(pendientes.sort_values('fecha_objetivo'), largos,
+                              left_on='fecha_objetivo', right_on='fecha_precio',
+                              by='ticker', direction='forward')
+    resueltos = resueltos.dropna(subset=['real'])
+    if resueltos.empty:
+        return pd.DataFrame(columns=COLUMNAS_REALIZADOS)
+
+    resueltos['error'] = resueltos['prediccion'] - resueltos['real']
+    resueltos['error_pct'] = resueltos['error'] / resueltos['real']
+    resueltos['dentro_intervalo'] = ((resueltos['real'] >= resueltos['limite_inf'])
+                                     & (resueltos['real'] <= resueltos['limite_sup'])).astype(int)
+    resueltos['acierto_direccion'] = (
+        np.sign(resueltos['prediccion'] - resueltos['precio_emision'])
+        == np.sign(resueltos['real'] - resueltos['precio_emision'])).astype(int)
+
+    resueltos = resueltos[COLUMNAS_REALIZADOS].sort_values(CLAVE).reset_index(drop=True)
+    _agregar(resueltos, ruta_realizados)
+    _sumar_estadisticas(resueltos, ruta_estadisticas)
+    return resueltos
+
+
+def _sumar_estadisticas(resueltos, ruta=RUTA_ESTADISTICAS):
+    """Suma los errores nuevos a las estadísticas acumuladas por (ticker, modelo, h)"""
+    delta = resueltos.assign(
+        n=1,
+        suma_error=resueltos['error'],
+        suma_abs=resueltos['error'].abs(),
+        suma_cuadrado=resueltos['error'] ** 2,
+        suma_abs_pct=resueltos['error_pct'].abs()
+    ).groupby(['ticker', 'modelo', 'h'])[COLUMNAS_SUMAS].sum()
+
+    previas = cargar_estadisticas(ruta)
+    if len(previas):
+        delta = previas.set_index(['ticker', 'modelo', 'h'])[COLUMNAS_SUMAS].add(delta, fill_value=0)
+
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    delta.reset_index().to_csv(ruta, index=False)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MÉTRICAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def resumen_precision(ticker=None, modelo=None, h_max=None, ruta=RUTA_ESTADISTICAS):
+    """
+    Métricas a partir de las sumas acumuladas (sin releer los realizados).
+
+    RETORNA:
+        DataFrame por (ticker, modelo) con n, sesgo, mae, rmse, mape,
+        cobertura (fracción dentro del intervalo) y acierto_direccion
+    """
+    estadisticas = cargar_estadisticas(ruta)
+    if ticker is not None:
+        estadisticas = estadisticas[estadisticas['ticker'] == ticker.upper()]
+    if modelo is not None:
+        estadisticas = estadisticas[estadisticas['modelo'] == modelo]
+    if h_max is not None:
+        estadisticas = estadisticas[estadisticas['h'] <= h_max]
+    if estadisticas.empty:
+        return pd.DataFrame(columns=['ticker', 'modelo', 'n', 'sesgo', 'mae', 'rmse', 'mape',
+                                     'cobertura', 'acierto_direccion'])
+
+    sumas = estadisticas.groupby(['ticker', 'modelo'])[COLUMNAS_SUMAS].sum()
+    n = sumas['n']
+    return pd.DataFrame({
+        'n': n.astype(int),
+        'sesgo': sumas['suma_error'] / n,
+        'mae': sumas['suma_abs'] / n,
+        'rmse': np.sqrt(sumas['suma_cuadrado'] / n),
+        'mape': sumas['suma_abs_pct'] / n * 100,
+        'cobertura': sumas['dentro_intervalo'] / n,
+        'acierto_direccion': sumas['acierto_direccion'] / n
+    }).reset_index()
+
+
+def confianza_medida(ticker='WTI', modelo=MODELO_DEFECTO, h_max=None, defecto=0.87,
+                     min_resueltos=MIN_RESUELTOS, ruta=RUTA_ESTADISTICAS):
+    """
+    Confianza del modelo = 1 − MAPE observado (en [0, 1]).
+
+    Mientras haya menos de `min_resueltos` pronósticos resueltos retorna
+    `defecto`.
+    """
+    resumen = resumen_precision(ticker, modelo, h_max, ruta)
+    if resumen.empty or resumen['n'].iloc[0] < min_resueltos:
+        return defecto
+    return float(np.clip(1 - resumen['mape'].iloc[0] / 100, 0, 1))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 70)
+    print("REGISTRO DE PRONÓSTICOS Y PRECISIÓN MEDIDA")
+    print("=" * 70)
+
+    tmp = tempfile.mkdtemp()
+    rutas = dict(ruta_registro=os.path.join(tmp, 'registro.csv'),
+                 ruta_realizados=os.path.join(tmp, 'realizados.csv'),
+                 ruta_estadisticas=os.path.join(tmp, 'estadisticas.csv'))
+
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range('2025-01-01', periods=120, freq='D')
+    precios = pd.DataFrame({'WTI': 75 + np.cumsum(rng.normal(0, 1, len(fechas)))}, index=fechas)
+
+    # Un pronóstico ingenuo (con ruido) a 10 días emitido cada día durante 30 días
+    for i in range(60, 90):
+        emision = fechas[i]
+        futuras = pd.date_range(emision + pd.Timedelta(days=1), periods=10, freq='D')
+        prediccion = precios['WTI'].iloc[i] + rng.normal(0, 0.5, 10)
+        forecast = pd.DataFrame({'fecha': futuras, 'prediccion': prediccion,
+                                 'limite_inf': prediccion - 3, 'limite_sup': prediccion + 3})
+        registrar_pronostico(forecast, 'WTI', 'demo', emision, precios['WTI'].iloc[i],
+                             ruta=rutas['ruta_registro'])
+
+    # Los precios llegan en dos tandas: solo se resuelven los pendientes
+    for hasta in (80, 120):
+        nuevos = actualizar_registro(precios.iloc[:hasta], **rutas)
+        print(f"\n  ✓ Precios hasta {fechas[hasta - 1].date()}: {len(nuevos)} pronósticos resueltos")
+
+    nuevos = actualizar_registro(precios, **rutas)
+    print(f"  ✓ Re-ejecución sin precios nuevos: {len(nuevos)} resueltos")
+
+    resumen = resumen_precision(ruta=rutas['ruta_estadisticas'])
+    print(f"\n{resumen.round(3).to_string(index=False)}")
+    print(f"\n  ✓ Confianza medida (C): "
+          f"{confianza_medida('WTI', 'demo', ruta=rutas['ruta_estadisticas']):.3f}")
+    print("=" * 70)
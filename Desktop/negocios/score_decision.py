@@ -0,0 +1,279 @@
+"""
+SCORE DE DECISIÓN VECTORIZADO
+La fórmula 0.40 / 0.30 / 0.30 de generar_recomendacion para cualquier
+cantidad de fechas en una sola llamada
+
+    Score = 0.40 × Predicción + 0.30 × Técnico + 0.30 × Sentimiento
+
+    Predicción    cambio esperado −10% → 0, +10% → 1 (recortado a [0, 1])
+    Técnico       0.5 × tendencia (ALCISTA 0.7 / LATERAL 0.5 / BAJISTA 0.3)
+                  + 0.5 × RSI / 100
+    Sentimiento   [-1, +1] → [0, 1]
+
+BANDAS DE ACCIÓN (np.select):
+    Score ≥ 0.65        → COMPRAR FUERTE
+    Score ≥ 0.55        → COMPRAR
+    0.45 < Score < 0.55 → MANTENER
+    0.35 < Score ≤ 0.45 → VENDER
+    Score ≤ 0.35        → VENDER FUERTE
+
+generar_recomendacion usa estas mismas funciones para el día de hoy, y
+score_historico reconstruye la serie completa: el cambio pronosticado sale
+del tensor de pronósticos (lo que el modelo predijo ESE día, sin mirar el
+futuro), la parte técnica de las columnas de calcular_indicadores y el
+sentimiento del último valor conocido en cada fecha. El horizonte `dias` es
+el mismo paso que generar_recomendacion lee hoy (la última fila del
+pronóstico, h días calendario después del último precio), así que la
+última fila de score_historico es el score de hoy con cualquiera de los
+motores (Prophet o Kalman).
+"""
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import normalizar_fechas
+from tensor_pronosticos import BASE_DIR, MODELO_DEFECTO, cargar_tensor
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+PESO_PREDICCION = 0.40
+PESO_TECNICO = 0.30
+PESO_SENTIMIENTO = 0.30
+
+PUNTAJE_TENDENCIA = {'ALCISTA': 0.7, 'BAJISTA': 0.3, 'LATERAL': 0.5}
+CAMBIO_MAXIMO = 10.0            # % de cambio que satura la señal de predicción
+
+# Bandas de mayor a menor: (acción, icono, riesgo, color del riesgo)
+BANDAS = [
+    ('COMPRAR FUERTE', '🟢🟢', 'MEDIO-ALTO', 'yellow'),
+    ('COMPRAR', '🟢', 'MEDIO', 'green'),
+    ('MANTENER', '🟡', 'BAJO', 'blue'),
+    ('VENDER', '🔴', 'MEDIO', 'orange'),
+    ('VENDER FUERTE', '🔴🔴', 'ALTO', 'red')
+]
+SIN_DATOS = 'SIN DATOS'
+
+# ══════════════════════════════════════════════════════════════════════════════
+# NORMALIZACIÓN Y FÓRMULA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def clasificar_tendencias(precio, sma20, sma50):
+    """Versión vectorizada de indicadores_tecnicos.clasificar_tendencia"""
+    precio, sma20, sma50 = (np.asarray(a, dtype=np.float64) for a in (precio, sma20, sma50))
+    return np.select([(precio > sma20) & (sma20 > sma50), (precio < sma20) & (sma20 < sma50)],
+                     ['ALCISTA', 'BAJISTA'], 'LATERAL')
+
+
+def calcular_score(cambio_prediccion, tendencia, rsi, sentimiento):
+    """
+    Score integrado para arreglos (o escalares) de entradas.
+
+    ENTRADA:
+        cambio_prediccion: cambio esperado en %
+        tendencia: 'ALCISTA' / 'BAJISTA' / 'LATERAL'
+        rsi: RSI en [0, 100]
+        sentimiento: score en [-1, +1]
+
+    RETORNA:
+        dict con pred_norm, tecnico_norm, sent_norm y score (arreglos)
+    """
+    cambio = np.asarray(cambio_prediccion, dtype=np.float64)
+    tendencia = np.asarray(tendencia)
+    rsi = np.asarray(rsi, dtype=np.float64)
+    sentimiento = np.asarray(sentimiento, dtype=np.float64)
+
+    pred_norm = np.clip((cambio + CAMBIO_MAXIMO) / (2 * CAMBIO_MAXIMO), 0, 1)
+    tecnico_tendencia = np.select([tendencia == t for t in PUNTAJE_TENDENCIA],
+                                  list(PUNTAJE_TENDENCIA.values()), PUNTAJE_TENDENCIA['LATERAL'])
+    tecnico_norm = 0.5 * tecnico_tendencia + 0.5 * (rsi / 100)
+    sent_norm = (sentimiento + 1) / 2
+
+    score = (PESO_PREDICCION * pred_norm +
+             PESO_TECNICO * tecnico_norm +
+             PESO_SENTIMIENTO * sent_norm)
+    return {'pred_norm': pred_norm, 'tecnico_norm': tecnico_norm, 'sent_norm': sent_norm,
+            'score': score}
+
+
+def indice_banda(score):
+    """Posición en BANDAS de cada score (−1 si el score es NaN)"""
+    score = np.asarray(score, dtype=np.float64)
+    return np.select([np.isnan(score), score >= 0.65, score >= 0.55, score > 0.45, score > 0.35],
+                     [-1, 0, 1, 2, 3], 4)
+
+
+def accion_por_score(score):
+    """Acción recomendada para cada score (SIN DATOS si es NaN)"""
+    acciones = np.array([b[0] for b in BANDAS] + [SIN_DATOS])
+    return acciones[indice_banda(score)]
+
+
+def banda(score):
+    """Acción, icono, riesgo y color de un score escalar"""
+    accion, icono, riesgo, color = BANDAS[int(indice_banda(score))]
+    return {'accion': accion, 'accion_icono': icono, 'riesgo': riesgo, 'color_riesgo': color}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RECONSTRUCCIÓN HISTÓRICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def cambio_pronosticado(precio, dias=10, ticker='WTI', modelo=MODELO_DEFECTO, base_dir=BASE_DIR):
+    """
+    Cambio % que el modelo pronosticaba a `dias` días en cada fecha de emisión.
+
+    ENTRADA:
+        precio: Series de precios indexada por fecha
+
+    RETORNA:
+        Series indexada como `precio` (NaN donde no se emitió pronóstico)
+    """
+    tensor = cargar_tensor(modelo, base_dir)
+    if ticker not in tensor.tickers or dias > tensor.horizonte_max:
+        return pd.Series(np.nan, index=precio.index)
+    yhat = tensor.corte_horizonte(dias)[ticker]
+    yhat.index = normalizar_fechas(yhat.index).values
+    yhat = yhat[~yhat.index.duplicated(keep='last')]
+    pronostico = yhat.reindex(normalizar_fechas(precio.index).values).to_numpy()
+    return pd.Series((pronostico / precio.to_numpy(dtype=np.float64) - 1) * 100, index=precio.index)
+
+
+def score_historico(df, sentimiento=None, cambio_prediccion=None, dias=10, ticker='WTI',
+                    modelo=MODELO_DEFECTO, base_dir=BASE_DIR):
+    """
+    Score de decisión completo para cada fecha de la historia (sin bucles por día).
+
+    ENTRADA:
+        df: DataFrame con fecha, precio, SMA_20, SMA_50 y RSI
+            (indicadores_tecnicos.calcular_indicadores)
+        sentimiento: Series por fecha en [-1, +1] (p.ej. rolling_7d); en cada
+                     fecha se usa el último valor conocido, 0 (neutral) antes
+                     del primero
+        cambio_prediccion: Series por fecha con el cambio esperado en %
+                           (None = tensor de pronósticos del modelo); sin
+                           pronóstico ese día cuenta como neutral (0%)
+        dias: horizonte del pronóstico en días calendario (el de la última
+              fila del pronóstico que usa generar_recomendacion)
+        modelo: etiqueta del tensor del motor que emitió los pronósticos
+
+    RETORNA:
+        DataFrame con fecha, precio, tendencia, cambio_prediccion,
+        pred_norm, tecnico_norm, sent_norm, score, accion y
+        con_prediccion (si ese día había pronóstico emitido). El score es
+        NaN mientras no hay SMA 50 / RSI.
+    """
+    fechas = normalizar_fechas(df['fecha']).values
+    precio = pd.Series(df['precio'].to_numpy(dtype=np.float64), index=fechas)
+
+    if cambio_prediccion is None:
+        cambio = cambio_pronosticado(precio, dias, ticker, modelo, base_dir).to_numpy()
+    else:
+        cambio = cambio_prediccion.copy()
+        cambio.index = normalizar_fechas(cambio.index).values
+        cambio = cambio[~cambio.index.duplicated(keep='last')].reindex(fechas).to_numpy(dtype=np.float64)
+
+    if sentimiento is None:
+        sent = np.zeros(len(fechas))
+    else:
+        serie = sentimiento.copy()
+        serie.index = normalizar_fechas(serie.index).values
+        serie = serie[~serie.index.duplicated(keep='last')].sort_index().dropna()
+        posicion = np.searchsorted(serie.index.values, fechas, side='right') - 1
+        sent = np.where(posicion >= 0, serie.to_numpy(dtype=np.float64)[np.clip(posicion, 0, None)], 0.0)
+
+    sma20, sma50 = df['SMA_20'].to_numpy(dtype=np.float64), df['SMA_50'].to_numpy(dtype=np.float64)
+    rsi = df['RSI'].to_numpy(dtype=np.float64)
+    tendencia = clasificar_tendencias(precio.to_numpy(), sma20, sma50)
+
+    componentes = calcular_score(np.nan_to_num(cambio, nan=0.0), tendencia, rsi, sent)
+    score = np.where(np.isnan(sma50), np.nan, componentes['score'])
+
+    return pd.DataFrame({
+        'fecha': fechas,
+        'precio': precio.to_numpy(),
+        'tendencia': tendencia,
+        'cambio_prediccion': cambio,
+        'pred_norm': componentes['pred_norm'],
+        'tecnico_norm': componentes['tecnico_norm'],
+        'sent_norm': componentes['sent_norm'],
+        'score': score,
+        'accion': accion_por_score(score),
+        'con_prediccion': ~np.isnan(cambio)
+    })
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import os
+    import time
+
+    from indicadores_tecnicos import calcular_indicadores, clasificar_tendencia
+
+    print("=" * 70)
+    print("SCORE DE DECISIÓN VECTORIZADO")
+    print("=" * 70)
+
+    rng = np.random.default_rng(0)
+    n = 5000
+    fechas = pd.bdate_range('2005-01-01', periods=n)
+    df = pd.DataFrame({'fecha': fechas, 'precio': 70 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))})
+    calcular_indicadores(df)
+    sentimiento = pd.Series(np.tanh(np.cumsum(rng.normal(0, 0.1, n))), index=fechas)
+    cambio = pd.Series(rng.normal(0, 4, n), index=fechas)
+
+    inicio = time.perf_counter()
+    historia = score_historico(df, sentimiento, cambio)
+    print(f"\n  ✓ {n} fechas en {(time.perf_counter() - inicio) * 1e3:.1f} ms (una llamada)")
+
+    # Referencia: la fórmula escalar de generar_recomendacion, día por día
+    def score_escalar(cambio, tendencia, rsi, sentimiento):
+        pred_norm = max(0, min(1, (cambio + 10) / 20))
+        tecnico = 0.5 * {'ALCISTA': 0.7, 'BAJISTA': 0.3}.get(tendencia, 0.5) + 0.5 * rsi / 100
+        return 0.40 * pred_norm + 0.30 * tecnico + 0.30 * (sentimiento + 1) / 2
+
+    validos = historia['score'].notna().to_numpy()
+    referencia = [score_escalar(c, clasificar_tendencia(p, s20, s50), r, s)
+                  for c, p, s20, s50, r, s in zip(cambio, df['precio'], df['SMA_20'], df['SMA_50'],
+                                                  df['RSI'], sentimiento)]
+    iguales = np.allclose(historia['score'].to_numpy()[validos], np.array(referencia)[validos])
+    print(f"  {'✓' if iguales else '✗'} Coincide con la fórmula escalar en {validos.sum()} fechas")
+
+    # Con pronósticos reales del tensor: la última fila es el score de hoy
+    # (misma fórmula y mismo paso que generar_recomendacion) con ambos motores
+    import tempfile
+    from pronostico_kalman import MotorKalman
+    from registro_pronosticos import registrar_pronostico
+
+    ruta_registro = os.path.join(tempfile.mkdtemp(), 'registro_pronosticos.csv')
+    base_dir = os.path.dirname(ruta_registro)
+    recientes = df.iloc[-60:]
+    motor = MotorKalman()
+    motor.ingerir_serie('WTI', df.set_index('fecha')['precio'].iloc[:-60])
+    for fecha, precio in zip(recientes['fecha'], recientes['precio']):
+        motor.ingerir('WTI', precio, fecha)
+        # 'kalman': días calendario con el paso hábil que resuelve cada fecha;
+        # Prophet: días calendario (predecir_horizonte, freq='D')
+        kalman = motor.pronosticar('WTI', 10)
+        prophet = kalman.assign(prediccion=precio * (1 + rng.normal(0, 0.03)))
+        registrar_pronostico(kalman, 'WTI', 'kalman', fecha, precio, ruta_registro)
+        registrar_pronostico(prophet, 'WTI', 'prophet_sistema_completo', fecha, precio, ruta_registro)
+
+    hoy = df.iloc[-1]
+    for modelo, forecast in (('kalman', kalman), ('prophet_sistema_completo', prophet)):
+        historia = score_historico(df, sentimiento, dias=10, modelo=modelo, base_dir=base_dir)
+        cambio_hoy = (forecast['prediccion'].iloc[-1] / hoy['precio'] - 1) * 100
+        score_hoy = calcular_score(cambio_hoy, clasificar_tendencia(hoy['precio'], hoy['SMA_20'], hoy['SMA_50']),
+                                   hoy['RSI'], sentimiento.iloc[-1])['score']
+        iguales = np.isclose(historia['score'].iloc[-1], score_hoy)
+        completos = historia['con_prediccion'].iloc[-60:].all()
+        print(f"  {'✓' if iguales else '✗'} {modelo}: última fila = score de hoy ({float(score_hoy):.4f}); "
+              f"{'✓' if completos else '✗'} pronóstico a 10 días en los 60 días de emisión")
+
+    print(f"\n  Días por acción:")
+    for accion, dias in historia['accion'].value_counts().items():
+        print(f"    {accion:<15} {dias:>5}")
+    print("=" * 70)
@@ -0,0 +1,439 @@
+"""
+SENSIBILIDAD AL PETRÓLEO: BETAS Y MATRIZ DE CORRELACIÓN MÓVILES
+Todos los tickers del catálogo contra WTI y Brent, en una sola pasada
+
+Las recomendaciones (listas fijas de DEMO_sistema_recomendacion, "comprar
+XOM/CVX, vender aerolíneas" de 5_integracion_completa) suponían la
+sensibilidad al petróleo sin medirla. Aquí, con rendimientos logarítmicos
+diarios y una ventana móvil:
+
+    correlaciones   matriz [fecha × ticker × ticker] de Pearson por pares
+    betas           [fecha × ticker × factor]: cov(r_i, r_f) / var(r_f),
+                    factor = WTI, BRENT
+
+CÁLCULO:
+    Lote       sumas acumuladas de n, x, y, x², y², xy para todos los pares
+               (solo días en que ambos tienen rendimiento): cada ventana sale
+               de restar dos filas, sin bucles por fecha. Se arma un término
+               a la vez y por bloques de filas de la matriz, así la memoria
+               de trabajo queda acotada por ELEMENTOS_BLOQUE y no crece con
+               fecha × ticker². Las betas se calculan aparte contra las
+               columnas de los factores ([fecha × ticker] por término).
+    Streaming  MotorSensibilidad guarda las sumas de la ventana y los
+               últimos `ventana` rendimientos; cada día nuevo suma la fila
+               que entra y resta la que sale (O(ticker²) por día, como
+               productos de matrices).
+
+Resultados y estado del motor se guardan juntos en
+base_datos_csv/sensibilidad_petroleo.npz (sin pickle); actualizar_sensibilidad()
+solo procesa las fechas nuevas del catálogo.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import cargar_universo
+from volatilidad import rendimientos_log
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_SENSIBILIDAD = "base_datos_csv/sensibilidad_petroleo.npz"
+
+FACTORES = ('WTI', 'BRENT')
+VENTANA = 60                    # días hábiles de la ventana móvil
+ELEMENTOS_BLOQUE = 2 ** 23      # [fecha × ticker × ticker] por término en el lote (64 MB)
+
+# Perfil según la beta y la correlación actuales contra el primer factor (WTI)
+UMBRAL_BETA = 0.15
+UMBRAL_CORRELACION = 0.20
+PERFILES = ('PRO-PETRÓLEO', 'ANTI-PETRÓLEO', 'NEUTRAL')
+
+# ══════════════════════════════════════════════════════════════════════════════
+# NÚCLEO VECTORIZADO
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _factores(r):
+    """
+    ENTRADA:
+        r: [T × N] rendimientos (NaN = sin dato)
+
+    RETORNA:
+        (rendimientos con 0 donde falta, 1.0 donde hay dato), ambos [T × N]
+    """
+    valido = ~np.isnan(r)
+    return np.where(valido, r, 0.0), valido.astype(np.float64)
+
+
+def _pares(x, vx, y, vy):
+    """
+    Factores de los términos de las sumas por pares (0 donde falta alguno de
+    los dos): el término del par (i, j) en el día t es a[t, i]·b[t, j].
+
+    ENTRADA:
+        x, vx: _factores de los tickers de las filas de la matriz [T × A]
+        y, vy: _factores de los tickers de las columnas [T × B]
+
+    RETORNA:
+        lista de (a, b) para n, x, y, xx, yy, xy
+    """
+    return [(vx, vy), (x, vy), (vx, y), (x * x, vy), (vx, y * y), (x, y)]
+
+
+def _sumas_totales(x, vx, y, vy):
+    """Sumas por pares sobre todas las filas [6 × A × B] (productos de matrices)"""
+    return np.stack([a.T @ b for a, b in _pares(x, vx, y, vy)])
+
+
+def _sumas_moviles(x, vx, y, vy, ventana):
+    """
+    Sumas por pares de la ventana que termina en cada fecha, [T × A × B]
+    por término. Cada término se acumula en su propio arreglo y se le resta
+    la suma de `ventana` filas antes.
+    """
+    sumas = []
+    for a, b in _pares(x, vx, y, vy):
+        termino = a[:, :, None] * b[:, None, :]
+        np.cumsum(termino, axis=0, out=termino)
+        termino[ventana:] -= termino[:-ventana].copy()
+        sumas.append(termino)
+    return sumas
+
+
+def _correlacion(n, sx, sy, sxx, syy, sxy, min_periodos):
+    """Correlación de Pearson a partir de las sumas por pares"""
+    cov = n * sxy - sx * sy
+    var_x = np.clip(n * sxx - sx * sx, 0, None)
+    var_y = np.clip(n * syy - sy * sy, 0, None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denominador = np.sqrt(var_x * var_y)
+        corr = np.where((n >= min_periodos) & (denominador > 1e-18), cov / denominador, np.nan)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _beta(n, sx, sy, sxx, syy, sxy, min_periodos):
+    """Beta de x sobre y a partir de las sumas por pares"""
+    cov = n * sxy - sx * sy
+    var_y = np.clip(n * syy - sy * sy, 0, None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((n >= min_periodos) & (var_y > 1e-18), cov / var_y, np.nan)
+
+
+def _min_periodos(ventana):
+    return max(3, ventana // 2)
+
+
+def calcular_sensibilidad(precios, factores=FACTORES, ventana=VENTANA):
+    """
+    Betas y matriz de correlación móviles de todo el universo (sin guardar).
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (debe incluir los factores)
+        factores: tickers contra los que se miden las betas
+        ventana: días de la ventana móvil
+
+    RETORNA:
+        dict con 'fechas', 'tickers', 'factores', 'ventana',
+        'correlaciones' [fecha × ticker × ticker] y 'betas'
+        [fecha × ticker × factor] (float32)
+    """
+    precios = precios.sort_index()
+    factores = [f for f in factores if f in precios.columns]
+    if not factores:
+        raise ValueError(f"Ningún factor ({', '.join(FACTORES)}) está en los precios")
+
+    rendimientos = rendimientos_log(precios)
+    x, v = _factores(rendimientos.to_numpy(dtype=np.float64))
+    T, N = x.shape
+    min_periodos = _min_periodos(ventana)
+
+    # Correlaciones por bloques de filas: [T × filas × N] por término
+    correlaciones = np.empty((T, N, N), dtype=np.float32)
+    filas = max(1, ELEMENTOS_BLOQUE // max(T * N, 1))
+    for inicio in range(0, N, filas):
+        bloque = slice(inicio, inicio + filas)
+        correlaciones[:, bloque] = _correlacion(*_sumas_moviles(x[:, bloque], v[:, bloque], x, v, ventana),
+                                                min_periodos)
+
+    # Betas solo contra las columnas de los factores: [T × N × factor] por término
+    columnas = [precios.columns.get_loc(f) for f in factores]
+    betas = _beta(*_sumas_moviles(x, v, x[:, columnas], v[:, columnas], ventana), min_periodos)
+    return {
+        'fechas': rendimientos.index,
+        'tickers': list(precios.columns),
+        'factores': factores,
+        'ventana': ventana,
+        'correlaciones': correlaciones,
+        'betas': betas.astype(np.float32)
+    }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STREAMING (UN DÍA A LA VEZ)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MotorSensibilidad:
+    """Sumas por pares de la ventana móvil, actualizadas día a día"""
+
+    def __init__(self, tickers, factores=FACTORES, ventana=VENTANA, buffer=None, posicion=0,
+                 sumas=None, precios_anteriores=None, ultima_fecha=None, desde_resincronizar=0):
+        self.tickers = list(tickers)
+        self.factores = [f for f in factores if f in self.tickers]
+        self.ventana = ventana
+        n = len(self.tickers)
+        self.buffer = buffer if buffer is not None else np.full((ventana, n), np.nan)
+        self.posicion = posicion
+        self.sumas = sumas if sumas is not None else np.zeros((6, n, n))
+        self.precios_anteriores = (precios_anteriores if precios_anteriores is not None
+                                   else np.full(n, np.nan))
+        self.ultima_fecha = ultima_fecha
+        self.desde_resincronizar = desde_resincronizar
+
+    def actualizar(self, precios, fecha):
+        """
+        Incorpora los precios de un día (NaN = el ticker no cotizó).
+
+        ENTRADA:
+            precios: arreglo [ticker] en el orden de self.tickers
+            fecha: día de los precios
+
+        RETORNA:
+            (correlaciones [ticker × ticker], betas [ticker × factor]) o
+            (None, None) si es el primer día (aún no hay rendimiento)
+        """
+        precios = np.asarray(precios, dtype=np.float64)
+        primero = self.ultima_fecha is None
+        self.ultima_fecha = pd.Timestamp(fecha).strftime('%Y-%m-%d')
+        if primero:
+            self.precios_anteriores = precios
+            return None, None
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            r = np.log(precios) - np.log(self.precios_anteriores)
+        self.precios_anteriores = precios
+
+        saliente = self.buffer[self.posicion].copy()
+        self.buffer[self.posicion] = r
+        self.posicion = (self.posicion + 1) % self.ventana
+        self.desde_resincronizar += 1
+        if self.desde_resincronizar >= self.ventana:
+            # Recalcular desde el buffer corrige el error acumulado de restar
+            x, v = _factores(self.buffer)
+            self.sumas = _sumas_totales(x, v, x, v)
+            self.desde_resincronizar = 0
+        else:
+            entra, sale = _factores(r[None, :]), _factores(saliente[None, :])
+            self.sumas += _sumas_totales(*entra, *entra)
+            self.sumas -= _sumas_totales(*sale, *sale)
+        return self.metricas()
+
+    def metricas(self):
+        min_periodos = _min_periodos(self.ventana)
+        columnas = [self.tickers.index(f) for f in self.factores]
+        return (_correlacion(*self.sumas, min_periodos),
+                _beta(*self.sumas[:, :, columnas], min_periodos))
+
+    @classmethod
+    def desde_historia(cls, precios, factores=FACTORES, ventana=VENTANA):
+        """Estado tras toda la historia: basta con los últimos ventana + 1 días"""
+        motor = cls(precios.columns, factores, ventana)
+        for fecha, fila in zip(precios.index[-(ventana + 1):],
+                               precios.iloc[-(ventana + 1):].to_numpy(dtype=np.float64)):
+            motor.actualizar(fila, fecha)
+        return motor
+
+    def continua(self, precios):
+        """True si los tickers son los mismos y el último día procesado no cambió"""
+        if self.ultima_fecha is None or list(precios.columns) != self.tickers:
+            return False
+        fecha = pd.Timestamp(self.ultima_fecha)
+        if fecha not in precios.index:
+            return False
+        return bool(np.allclose(precios.loc[fecha].to_numpy(dtype=np.float64),
+                                self.precios_anteriores, equal_nan=True))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENCIA Y ACTUALIZACIÓN INCREMENTAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+def guardar_sensibilidad(resultado, motor, ruta=RUTA_SENSIBILIDAD):
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f"{ruta}.tmp.npz"
+    np.savez(temporal,
+             fechas=resultado['fechas'].to_numpy(dtype='datetime64[ns]').astype(np.int64),
+             tickers=np.array(resultado['tickers'], dtype=str),
+             factores=np.array(resultado['factores'], dtype=str),
+             ventana=np.array(resultado['ventana']),
+             correlaciones=resultado['correlaciones'],
+             betas=resultado['betas'],
+             buffer=motor.buffer, posicion=np.array(motor.posicion), sumas=motor.sumas,
+             precios_anteriores=motor.precios_anteriores,
+             ultima_fecha=np.array(motor.ultima_fecha or '', dtype=str),
+             desde_resincronizar=np.array(motor.desde_resincronizar))
+    os.replace(temporal, ruta)
+
+
+def cargar_sensibilidad(ruta=RUTA_SENSIBILIDAD):
+    """
+    RETORNA:
+        (resultado, motor) guardados, o (None, None) si no hay archivo válido
+    """
+    if not os.path.exists(ruta):
+        return None, None
+    try:
+        with np.load(ruta, allow_pickle=False) as datos:
+            resultado = {
+                'fechas': pd.DatetimeIndex(datos['fechas'].astype('datetime64[ns]'), name='fecha'),
+                'tickers': datos['tickers'].tolist(),
+                'factores': datos['factores'].tolist(),
+                'ventana': int(datos['ventana']),
+                'correlaciones': datos['correlaciones'],
+                'betas': datos['betas']
+            }
+            motor = MotorSensibilidad(resultado['tickers'], resultado['factores'], resultado['ventana'],
+                                      buffer=datos['buffer'], posicion=int(datos['posicion']),
+                                      sumas=datos['sumas'], precios_anteriores=datos['precios_anteriores'],
+                                      ultima_fecha=str(datos['ultima_fecha']) or None,
+                                      desde_resincronizar=int(datos['desde_resincronizar']))
+        return resultado, motor
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+def actualizar_sensibilidad(precios=None, factores=FACTORES, ventana=VENTANA, ruta=RUTA_SENSIBILIDAD):
+    """
+    Mantiene al día las betas y correlaciones guardadas.
+
+    Si el archivo corresponde a los mismos tickers, factores y ventana, y el
+    último día procesado no cambió, solo se agregan los días nuevos; si no,
+    se recalcula todo en lote.
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (None = catalogo_precios.cargar_universo())
+
+    RETORNA:
+        dict como calcular_sensibilidad
+    """
+    if precios is None:
+        precios = cargar_universo()
+    precios = precios.sort_index()
+
+    resultado, motor = cargar_sensibilidad(ruta)
+    incremental = (motor is not None and motor.ventana == ventana
+                   and motor.factores == [f for f in factores if f in precios.columns]
+                   and motor.continua(precios))
+
+    if not incremental:
+        resultado = calcular_sensibilidad(precios, factores, ventana)
+        guardar_sensibilidad(resultado, MotorSensibilidad.desde_historia(precios, factores, ventana), ruta)
+        return resultado
+
+    nuevos = precios[precios.index > pd.Timestamp(motor.ultima_fecha)]
+    if len(nuevos):
+        correlaciones, betas = [], []
+        for fecha, fila in zip(nuevos.index, nuevos.to_numpy(dtype=np.float64)):
+            corr, beta = motor.actualizar(fila, fecha)
+            correlaciones.append(corr.astype(np.float32))
+            betas.append(beta.astype(np.float32))
+        resultado['fechas'] = resultado['fechas'].append(nuevos.index).rename('fecha')
+        resultado['correlaciones'] = np.concatenate([resultado['correlaciones'], correlaciones])
+        resultado['betas'] = np.concatenate([resultado['betas'], betas])
+        guardar_sensibilidad(resultado, motor, ruta)
+    return resultado
+
+# ══════════════════════════════════════════════════════════════════════════════
+# LECTURAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def matriz_correlacion(resultado, fecha=None):
+    """Matriz de correlación [ticker × ticker] de una fecha (None = la última)"""
+    t = -1 if fecha is None else resultado['fechas'].get_indexer([pd.Timestamp(fecha)], method='pad')[0]
+    return pd.DataFrame(resultado['correlaciones'][t], index=resultado['tickers'],
+                        columns=resultado['tickers'])
+
+
+def sensibilidad_actual(resultado):
+    """
+    Beta y correlación de hoy de cada ticker contra cada factor.
+
+    RETORNA:
+        DataFrame indexado por ticker con beta_{factor}, corr_{factor} y
+        perfil (PRO-PETRÓLEO / ANTI-PETRÓLEO / NEUTRAL según el primer factor)
+    """
+    tickers, factores = resultado['tickers'], resultado['factores']
+    tabla = pd.DataFrame(index=pd.Index(tickers, name='ticker'))
+    for k, factor in enumerate(factores):
+        tabla[f'beta_{factor.lower()}'] = resultado['betas'][-1, :, k].astype(np.float64)
+        tabla[f'corr_{factor.lower()}'] = resultado['correlaciones'][-1, :, tickers.index(factor)]
+
+    principal = factores[0].lower()
+    beta, corr = tabla[f'beta_{principal}'], tabla[f'corr_{principal}']
+    tabla['perfil'] = np.select([(beta > UMBRAL_BETA) & (corr > UMBRAL_CORRELACION),
+                                 (beta < -UMBRAL_BETA) & (corr < -UMBRAL_CORRELACION)],
+                                PERFILES[:2], PERFILES[2])
+    return tabla
+
+
+def activos_por_perfil(tabla):
+    """{perfil: tickers ordenados por |beta|} sin contar los propios factores"""
+    principal = [c for c in tabla.columns if c.startswith('beta_')][0]
+    factores = {c[len('beta_'):].upper() for c in tabla.columns if c.startswith('beta_')}
+    tabla = tabla[~tabla.index.isin(factores)]
+    orden = tabla[principal].abs().sort_values(ascending=False).index
+    return {perfil: [t for t in orden if tabla.at[t, 'perfil'] == perfil] for perfil in PERFILES}
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("SENSIBILIDAD AL PETRÓLEO (BETAS Y CORRELACIONES MÓVILES)")
+    print("=" * 70)
+
+    # Factor WTI, Brent casi igual y acciones con betas conocidas
+    rng = np.random.default_rng(0)
+    T = 1500
+    fechas = pd.bdate_range('2019-01-01', periods=T)
+    r_wti = rng.normal(0, 0.02, T)
+    reales = {'XOM': 0.6, 'CVX': 0.5, 'DAL': -0.4, 'UAL': -0.5, 'BVN_LM': 0.0}
+    rendimientos = {'WTI': r_wti, 'BRENT': 0.9 * r_wti + rng.normal(0, 0.005, T)}
+    for ticker, b in reales.items():
+        rendimientos[ticker] = b * r_wti + rng.normal(0, 0.012, T)
+    precios = pd.DataFrame({t: 50 * np.exp(np.cumsum(r)) for t, r in rendimientos.items()}, index=fechas)
+    precios.iloc[rng.integers(0, T, 40), -1] = np.nan          # feriados de Lima
+
+    inicio = time.perf_counter()
+    lote = calcular_sensibilidad(precios)
+    print(f"\n  ✓ Betas y matriz {len(lote['tickers'])}×{len(lote['tickers'])} en "
+          f"{len(lote['fechas'])} fechas: {(time.perf_counter() - inicio) * 1e3:.1f} ms (una pasada)")
+
+    # Comparación con pandas rolling (pares válidos, misma ventana)
+    r = rendimientos_log(precios)
+    referencia = r['XOM'].rolling(VENTANA, min_periods=_min_periodos(VENTANA)).corr(r['BVN_LM'])
+    propio = lote['correlaciones'][:, lote['tickers'].index('XOM'), lote['tickers'].index('BVN_LM')]
+    print(f"  {'✓' if np.allclose(propio, referencia, atol=1e-5, equal_nan=True) else '✗'} "
+          f"Correlación coincide con rolling().corr() de pandas")
+
+    # Incremental: historia + 200 días nuevos
+    ruta = os.path.join(tempfile.mkdtemp(), 'sensibilidad.npz')
+    actualizar_sensibilidad(precios.iloc[:-200], ruta=ruta)
+    inicio = time.perf_counter()
+    incremental = actualizar_sensibilidad(precios, ruta=ruta)
+    por_dia = (time.perf_counter() - inicio) / 200 * 1e3
+    iguales = (np.allclose(incremental['correlaciones'], lote['correlaciones'], atol=1e-5, equal_nan=True)
+               and np.allclose(incremental['betas'], lote['betas'], atol=1e-5, equal_nan=True))
+    print(f"  ✓ 200 días nuevos: {por_dia:.2f} ms por día (incremental)")
+    print(f"  {'✓' if iguales else '✗'} Incremental coincide con el lote")
+
+    tabla = sensibilidad_actual(incremental)
+    tabla['beta_real'] = pd.Series(reales)
+    print(f"\n{tabla[['beta_wti', 'beta_real', 'corr_wti', 'corr_brent', 'perfil']].round(2).to_string()}")
+    print(f"\n  {activos_por_perfil(tabla)}")
+    print("=" * 70)
@@ -0,0 +1,219 @@
+"""
+ESTIMADOR ONLINE DE SENTIMIENTO (EWMA PONDERADO POR FUENTE)
+Estado O(1) por fuente y global, actualizable titular por titular
+
+Alternativa al rolling 7d recalculado sobre el histórico: cada titular
+actualiza sumas con decaimiento exponencial en tiempo continuo
+
+    factor = 0.5 ** (Δt / vida_media)
+    S ← S·factor + score·peso      (suma ponderada)
+    N ← N·factor + 1               (conteo efectivo)
+    W ← W·factor + peso            (peso efectivo)
+
+y el score actual se lee al instante:
+
+    valor()               = S / N   (promedio de score × peso, misma escala
+                                     que score_ponderado / rolling_7d)
+    valor(por_peso=True)  = S / W   (promedio de score ponderado por fuente)
+
+Los titulares que llegan fuera de orden se descuentan según su antigüedad
+respecto al último instante visto. El estado se guarda en JSON para un
+proceso daemon o ejecuciones sucesivas.
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_ESTADO = "base_datos_csv/estado_sentimiento_ewma.json"
+
+VIDA_MEDIA_DIAS = 3.5    # Un titular pesa la mitad tras 3.5 días (~ventana de 7 días)
+PESO_DEFECTO = 0.7
+
+_SEGUNDOS_DIA = 86400.0
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ESTADO EXPONENCIAL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _SumaExponencial:
+    """Sumas S, N, W con decaimiento exponencial y su último instante (en días)"""
+
+    __slots__ = ('suma', 'conteo', 'peso', 't')
+
+    def __init__(self, suma=0.0, conteo=0.0, peso=0.0, t=None):
+        self.suma = suma
+        self.conteo = conteo
+        self.peso = peso
+        self.t = t
+
+    def actualizar(self, valor, peso, t, vida_media):
+        if self.t is None:
+            self.t = t
+
+        if t >= self.t:
+            # Decaer el estado hasta el nuevo instante
+            factor = 0.5 ** ((t - self.t) / vida_media)
+            self.suma *= factor
+            self.conteo *= factor
+            self.peso *= factor
+            self.t = t
+            descuento = 1.0
+        else:
+            # Titular atrasado: se descuenta a sí mismo
+            descuento = 0.5 ** ((self.t - t) / vida_media)
+
+        self.suma += valor * peso * descuento
+        self.conteo += descuento
+        self.peso += peso * descuento
+
+    def valor(self, por_peso=False):
+        divisor = self.peso if por_peso else self.conteo
+        return self.suma / divisor if divisor > 0 else 0.0
+
+    def conteo_efectivo(self, t, vida_media):
+        """Número efectivo de titulares vigentes en el instante t"""
+        if self.t is None:
+            return 0.0
+        return self.conteo * 0.5 ** (max(t - self.t, 0.0) / vida_media)
+
+    def a_dict(self):
+        return {'suma': self.suma, 'conteo': self.conteo, 'peso': self.peso, 't': self.t}
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ESTIMADOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _a_dias(fecha):
+    """Fecha (str, datetime, Timestamp o None=ahora) → días desde epoch"""
+    fecha = pd.Timestamp.now() if fecha is None else pd.Timestamp(fecha)
+    if fecha.tzinfo is not None:
+        fecha = fecha.tz_convert(None)
+    return fecha.value / 1e9 / _SEGUNDOS_DIA
+
+
+class EstimadorSentimientoEWMA:
+    """
+    Sentimiento de mercado con decaimiento exponencial, por fuente y global.
+
+    USO:
+        estimador = EstimadorSentimientoEWMA(pesos_fuente=FUENTES_PESOS)
+        estimador.actualizar(score=0.42, fuente='Reuters', fecha='2025-01-05')
+        estimador.valor()            # global
+        estimador.valor('Reuters')   # por fuente
+    """
+
+    def __init__(self, vida_media_dias=VIDA_MEDIA_DIAS, pesos_fuente=None,
+                 peso_defecto=PESO_DEFECTO):
+        self.vida_media_dias = float(vida_media_dias)
+        self.pesos_fuente = dict(pesos_fuente or {})
+        self.peso_defecto = float(peso_defecto)
+        self.global_ = _SumaExponencial()
+        self.fuentes = {}
+
+    def actualizar(self, score, fuente='Desconocida', fecha=None, peso=None):
+        """Incorpora un titular en tiempo constante"""
+        if peso is None or peso != peso:
+            peso = self.pesos_fuente.get(fuente, self.peso_defecto)
+        t = _a_dias(fecha)
+
+        self.global_.actualizar(float(score), float(peso), t, self.vida_media_dias)
+        if fuente not in self.fuentes:
+            self.fuentes[fuente] = _SumaExponencial()
+        self.fuentes[fuente].actualizar(float(score), float(peso), t, self.vida_media_dias)
+
+    def actualizar_lote(self, df, columna_score='score'):
+        """Incorpora un DataFrame con score, fuente, fecha y (opcional) peso, fila por fila"""
+        pesos = df['peso'] if 'peso' in df.columns else [None] * len(df)
+        for score, fuente, fecha, peso in zip(df[columna_score], df['fuente'], df['fecha'], pesos):
+            self.actualizar(score, fuente, fecha, peso)
+
+    def valor(self, fuente=None, por_peso=False):
+        """Score actual (global o de una fuente) en O(1)"""
+        estado = self.global_ if fuente is None else self.fuentes.get(fuente)
+        return estado.valor(por_peso) if estado is not None else 0.0
+
+    def conteo_efectivo(self, fuente=None, fecha=None):
+        """Titulares efectivos vigentes (indica cuánta evidencia respalda el score)"""
+        estado = self.global_ if fuente is None else self.fuentes.get(fuente)
+        if estado is None:
+            return 0.0
+        return estado.conteo_efectivo(_a_dias(fecha), self.vida_media_dias)
+
+    def resumen(self, por_peso=False, fecha=None):
+        """DataFrame con el score por fuente y sus titulares efectivos a `fecha` (None = ahora)"""
+        t = _a_dias(fecha)
+        filas = [{'fuente': f, 'score': e.valor(por_peso),
+                  'conteo_efectivo': e.conteo_efectivo(t, self.vida_media_dias)}
+                 for f, e in self.fuentes.items()]
+        return pd.DataFrame(filas, columns=['fuente', 'score', 'conteo_efectivo'])
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Persistencia
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def a_dict(self):
+        return {
+            'vida_media_dias': self.vida_media_dias,
+            'pesos_fuente': self.pesos_fuente,
+            'peso_defecto': self.peso_defecto,
+            'global': self.global_.a_dict(),
+            'fuentes': {f: e.a_dict() for f, e in self.fuentes.items()}
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        estimador = cls(datos['vida_media_dias'], datos['pesos_fuente'], datos['peso_defecto'])
+        estimador.global_ = _SumaExponencial(**datos['global'])
+        estimador.fuentes = {f: _SumaExponencial(**e) for f, e in datos['fuentes'].items()}
+        return estimador
+
+    def guardar(self, ruta=RUTA_ESTADO):
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def cargar(cls, ruta=RUTA_ESTADO, **kwargs):
+        """Carga el estado guardado; si no existe, crea un estimador nuevo con kwargs"""
+        if os.path.exists(ruta):
+            try:
+                with open(ruta, encoding='utf-8') as f:
+                    return cls.desde_dict(json.load(f))
+            except (ValueError, KeyError):
+                pass
+        return cls(**kwargs)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("ESTIMADOR ONLINE DE SENTIMIENTO (EWMA)")
+    print("=" * 70)
+
+    pesos = {'Reuters': 1.0, 'Bloomberg': 1.0, 'Google News': 0.6}
+    estimador = EstimadorSentimientoEWMA(vida_media_dias=3.5, pesos_fuente=pesos)
+
+    rng = np.random.default_rng(0)
+    fechas = pd.date_range('2025-01-01', periods=30, freq='D')
+    for fecha in fechas:
+        for fuente in pesos:
+            estimador.actualizar(rng.normal(0.1, 0.3), fuente, fecha)
+
+    print(f"\n  ✓ Sentimiento global (score × peso): {estimador.valor():+.4f}")
+    print(f"  ✓ Sentimiento global (por peso):     {estimador.valor(por_peso=True):+.4f}")
+    print(f"  ✓ Titulares efectivos vigentes:      {estimador.conteo_efectivo(fecha=fechas[-1]):.1f}")
+    print(f"\n{estimador.resumen(fecha=fechas[-1]).to_string(index=False)}")
+
+    copia = EstimadorSentimientoEWMA.desde_dict(json.loads(json.dumps(estimador.a_dict())))
+    print(f"\n  ✓ Estado serializable: {np.isclose(copia.valor(), estimador.valor())}")
+    print("=" * 70)
@@ -0,0 +1,146 @@
+"""
+MOTOR DE SENTIMIENTO POR LOTES (VADER)
+Puntuación masiva de titulares repartida entre procesos
+
+Reemplaza los bucles fila por fila (iterrows / Series.apply) sobre
+SentimentIntensityAnalyzer.polarity_scores por una sola llamada que recibe
+una columna de textos y devuelve arreglos NumPy pos/neu/neg/compound.
+
+Los lotes grandes se parten en fragmentos y se reparten en un pool de
+procesos; cada proceso crea UNA sola instancia del analizador al iniciar.
+Los lotes pequeños se puntúan en el proceso actual (crear procesos cuesta
+más que puntuar unos cientos de titulares).
+
+Con motor='vectorizado' se usa vader_vectorizado.MotorVaderVectorizado
+(mismos scores, reglas aplicadas sobre arreglos NumPy, sin pool).
+
+NOTA (Windows): el pool de procesos solo debe usarse desde código protegido
+por `if __name__ == "__main__":`.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+COLUMNAS_VADER = ('pos', 'neu', 'neg', 'compound')
+
+UMBRAL_PARALELO = 20000   # Textos mínimos para usar el pool de procesos
+TAM_FRAGMENTO = 5000      # Textos por tarea enviada a cada proceso
+
+# Analizador del proceso actual (uno por trabajador)
+_analizador = None
+_motor_vectorizado = None
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TRABAJADORES
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _inicializar_trabajador():
+    """Crea la instancia única del analizador para este proceso"""
+    global _analizador
+    _analizador = SentimentIntensityAnalyzer()
+
+
+def _puntuar_fragmento(textos):
+    """Puntúa una lista de textos y devuelve matriz [n × 4] (pos, neu, neg, compound)"""
+    if _analizador is None:
+        _inicializar_trabajador()
+
+    polaridad = _analizador.polarity_scores
+    salida = np.empty((len(textos), len(COLUMNAS_VADER)), dtype=np.float64)
+    for i, texto in enumerate(textos):
+        scores = polaridad(texto)
+        salida[i] = (scores['pos'], scores['neu'], scores['neg'], scores['compound'])
+    return salida
+
+# ══════════════════════════════════════════════════════════════════════════════
+# API PÚBLICA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def puntuar_textos(textos, n_procesos=None, tam_fragmento=TAM_FRAGMENTO,
+                   umbral_paralelo=UMBRAL_PARALELO, motor='referencia'):
+    """
+    Calcula scores VADER para una columna completa de textos.
+
+    ENTRADA:
+        textos: Series, lista o arreglo de textos (NaN/None se tratan como "")
+        n_procesos: procesos del pool (None = todos los núcleos)
+        tam_fragmento: textos por tarea del pool
+        umbral_paralelo: debajo de este tamaño se puntúa sin pool
+        motor: 'referencia' (vaderSentiment) o 'vectorizado' (NumPy)
+
+    RETORNA:
+        dict con arreglos NumPy float64 'pos', 'neu', 'neg', 'compound'
+        (mismo orden que la entrada)
+    """
+    global _motor_vectorizado
+    if motor == 'vectorizado':
+        if _motor_vectorizado is None:
+            from vader_vectorizado import MotorVaderVectorizado
+            _motor_vectorizado = MotorVaderVectorizado()
+        return _motor_vectorizado.puntuar(textos)
+    if motor != 'referencia':
+        raise ValueError(f"Motor desconocido: {motor}")
+
+    textos = ['' if t is None or t != t else str(t) for t in textos]
+    n = len(textos)
+
+    if n_procesos is None:
+        n_procesos = os.cpu_count() or 1
+
+    if n < umbral_paralelo or n_procesos <= 1:
+        matriz = _puntuar_fragmento(textos)
+    else:
+        fragmentos = [textos[i:i + tam_fragmento] for i in range(0, n, tam_fragmento)]
+        with ProcessPoolExecutor(max_workers=n_procesos,
+                                 initializer=_inicializar_trabajador) as pool:
+            matriz = np.concatenate(list(pool.map(_puntuar_fragmento, fragmentos)))
+
+    return {col: matriz[:, i] for i, col in enumerate(COLUMNAS_VADER)}
+
+
+def clasificar_compound(compound, umbral=0.05):
+    """
+    Clasifica scores compound en POSITIVO/NEGATIVO/NEUTRAL (vectorizado).
+
+    Score ≥ +umbral → POSITIVO
+    Score ≤ -umbral → NEGATIVO
+    Otro            → NEUTRAL
+    """
+    compound = np.asarray(compound)
+    return np.select([compound >= umbral, compound <= -umbral],
+                     ["POSITIVO", "NEGATIVO"], default="NEUTRAL")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    titulares = [
+        "OPEP anuncia recorte de producción, precios del petróleo suben",
+        "Oil prices surge as OPEC cuts output",
+        "Crude slumps on weak demand fears",
+        "Market awaits weekly inventory data"
+    ] * 25000
+
+    print("=" * 70)
+    print("MOTOR DE SENTIMIENTO POR LOTES")
+    print("=" * 70)
+
+    inicio = time.time()
+    scores = puntuar_textos(titulares)
+    duracion = time.time() - inicio
+
+    print(f"\n  ✓ {len(titulares):,} titulares puntuados en {duracion:.1f} segundos")
+    print(f"  Procesos: {os.cpu_count()}")
+    print(f"  Compound promedio: {scores['compound'].mean():+.3f}")
+    print("=" * 70)
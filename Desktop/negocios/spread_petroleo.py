@@ -0,0 +1,463 @@
+"""
+SPREAD BRENT − WTI: SERIE ALINEADA, Z-SCORE, COBERTURA Y REVERSIÓN A LA MEDIA
+Característica precalculada e incremental para el recomendador
+
+generar_dashboard y descargar_datos_petroleo restaban el último precio de
+cada DataFrame (que ni siquiera tenían que ser del mismo día). Aquí se
+construye la serie completa, alineada por fecha, con:
+
+    spread            brent − wti
+    zscore            (spread − media) / σ en una ventana móvil (σ poblacional)
+    beta, alfa        regresión móvil brent = alfa + beta·wti (ratio de cobertura)
+    spread_cubierto   brent − beta·wti
+    vida_media        días para que una desviación se reduzca a la mitad:
+                      regresión móvil Δs_t = c + λ·s_{t-1}  →  −ln 2 / ln(1 + λ)
+                      (NaN si λ ≥ 0: en esa ventana el spread no revierte)
+    regimen           AMPLIO (z > umbral), ESTRECHO (z < −umbral), NORMAL o
+                      SIN_DATOS
+
+CÁLCULO:
+    Lote       todas las regresiones salen de medias móviles de momentos
+               (x, y, x², x·y, ...) apiladas en un arreglo 2-D: una llamada a
+               indicadores_tecnicos.sma por ventana, sin bucles por fecha.
+    Streaming  MotorSpread guarda solo las sumas de cada ventana y se
+               actualiza en O(1) por barra; su estado se guarda en
+               base_datos_csv/estado_spread.json.
+
+actualizar_spread() mantiene base_datos_csv/spread_wti_brent.csv agregando
+solo las fechas nuevas del catálogo.
+"""
+
+import os
+import json
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import cargar_universo, normalizar_fechas
+from indicadores_tecnicos import sma
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+RUTA_SPREAD = "base_datos_csv/spread_wti_brent.csv"
+RUTA_ESTADO = "base_datos_csv/estado_spread.json"
+
+VENTANA_Z = 60                  # días para media y σ del spread
+VENTANA_COBERTURA = 60          # días de la regresión brent ~ wti
+VENTANA_VIDA_MEDIA = 120        # días de la regresión Δs ~ s_{t-1}
+UMBRAL_Z = 2.0
+
+COLUMNAS_SPREAD = ['wti', 'brent', 'spread', 'media', 'desviacion', 'zscore', 'beta', 'alfa',
+                   'spread_cubierto', 'vida_media', 'regimen']
+
+NAN = float('nan')
+
+# ══════════════════════════════════════════════════════════════════════════════
+# ALINEACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _como_serie(precios):
+    """Series indexada por fecha, o DataFrame con fecha y precio / precio_cierre"""
+    if isinstance(precios, pd.Series):
+        serie = precios.copy()
+        serie.index = normalizar_fechas(serie.index).values
+        return serie
+    columna = 'precio' if 'precio' in precios else 'precio_cierre'
+    return pd.Series(precios[columna].to_numpy(dtype=np.float64),
+                     index=normalizar_fechas(precios['fecha']).values)
+
+
+def alinear_precios(wti, brent):
+    """
+    Precios de WTI y Brent en las mismas fechas (solo días en que cotizan ambos).
+
+    ENTRADA:
+        wti, brent: Series por fecha o DataFrames con columnas fecha y precio
+                    (o precio_cierre)
+
+    RETORNA:
+        DataFrame indexado por fecha con columnas wti y brent
+    """
+    wti, brent = _como_serie(wti), _como_serie(brent)
+    precios = pd.concat({'wti': wti[~wti.index.duplicated(keep='last')],
+                         'brent': brent[~brent.index.duplicated(keep='last')]}, axis=1, join='inner')
+    precios = precios.dropna().sort_index()
+    precios.index.name = 'fecha'
+    return precios
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CÁLCULO VECTORIZADO (LOTE)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _pendiente(media_x, media_y, media_xx, media_xy):
+    """Pendiente de MCO a partir de momentos: cov(x, y) / var(x)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (media_xy - media_x * media_y) / (media_xx - media_x * media_x)
+
+
+def _vida_media(lam):
+    """λ de Δs = c + λ·s_{t-1} → vida media en días (NaN si no hay reversión)"""
+    lam = np.asarray(lam, dtype=np.float64)
+    revierte = (lam < 0) & (lam > -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(revierte, -np.log(2) / np.log1p(np.where(revierte, lam, 0.0)), np.nan)
+
+
+def _regimen(z, umbral=UMBRAL_Z):
+    z = np.asarray(z, dtype=np.float64)
+    return np.select([np.isnan(z), z > umbral, z < -umbral],
+                     ['SIN_DATOS', 'AMPLIO', 'ESTRECHO'], 'NORMAL')
+
+
+def calcular_spread(precios, ventana_z=VENTANA_Z, ventana_cobertura=VENTANA_COBERTURA,
+                    ventana_vida_media=VENTANA_VIDA_MEDIA, umbral_z=UMBRAL_Z):
+    """
+    Serie completa del spread con todas sus métricas móviles.
+
+    ENTRADA:
+        precios: DataFrame alineado con columnas wti y brent (alinear_precios)
+
+    RETORNA:
+        DataFrame indexado por fecha con COLUMNAS_SPREAD
+    """
+    wti = precios['wti'].to_numpy(dtype=np.float64)
+    brent = precios['brent'].to_numpy(dtype=np.float64)
+    spread = brent - wti
+    if len(spread) == 0:
+        return pd.DataFrame(columns=COLUMNAS_SPREAD, index=precios.index)
+
+    # Centrar en el primer valor mejora la precisión de E[x²] − E[x]²
+    x, y, s = wti - wti[0], brent - brent[0], spread - spread[0]
+
+    media_s, media_ss = sma(np.column_stack([s, s * s]), ventana_z).T
+    varianza = np.clip(media_ss - media_s * media_s, 0, None)
+    desviacion = np.sqrt(varianza)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zscore = np.where(desviacion > 0, (s - media_s) / desviacion, np.nan)
+
+    mx, my, mxx, mxy = sma(np.column_stack([x, y, x * x, x * y]), ventana_cobertura).T
+    beta = _pendiente(mx, my, mxx, mxy)
+    alfa = (my + brent[0]) - beta * (mx + wti[0])
+
+    anterior = np.concatenate([[np.nan], s[:-1]])
+    cambio = np.concatenate([[np.nan], np.diff(s)])
+    mp, md, mpp, mpd = sma(np.column_stack([anterior, cambio, anterior * anterior, anterior * cambio]),
+                           ventana_vida_media).T
+
+    tabla = pd.DataFrame({
+        'wti': wti,
+        'brent': brent,
+        'spread': spread,
+        'media': media_s + spread[0],
+        'desviacion': desviacion,
+        'zscore': zscore,
+        'beta': beta,
+        'alfa': alfa,
+        'spread_cubierto': brent - beta * wti,
+        'vida_media': _vida_media(_pendiente(mp, md, mpp, mpd)),
+        'regimen': _regimen(zscore, umbral_z)
+    }, index=precios.index)
+    tabla.index.name = 'fecha'
+    return tabla
+
+
+def vida_media(spread):
+    """Vida media (días) de la reversión del spread sobre toda la muestra"""
+    s = np.asarray(spread, dtype=np.float64)
+    s = s[~np.isnan(s)]
+    if len(s) < 3:
+        return NAN
+    anterior, cambio = s[:-1] - s[0], np.diff(s)
+    lam = _pendiente(anterior.mean(), cambio.mean(), (anterior * anterior).mean(),
+                     (anterior * cambio).mean())
+    return float(_vida_media(lam))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# STREAMING (O(1) POR BARRA)
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _VentanaSumas:
+    """
+    Sumas de los productos de las últimas `ventana` filas. Las sumas se
+    recalculan desde el buffer cada `ventana` filas para no acumular error.
+    """
+
+    __slots__ = ('ventana', 'filas', 'sumas', 'desde_resincronizar')
+
+    def __init__(self, ventana, filas=(), sumas=None, desde_resincronizar=0):
+        self.ventana = ventana
+        self.filas = deque((tuple(f) for f in filas), maxlen=ventana)
+        self.sumas = list(sumas) if sumas is not None else None
+        self.desde_resincronizar = desde_resincronizar
+
+    def agregar(self, fila):
+        fila = tuple(fila)
+        if self.sumas is None:
+            self.sumas = [0.0] * len(fila)
+        if len(self.filas) == self.ventana:
+            for k, v in enumerate(self.filas[0]):
+                self.sumas[k] -= v
+        self.filas.append(fila)
+        for k, v in enumerate(fila):
+            self.sumas[k] += v
+        self.desde_resincronizar += 1
+        if self.desde_resincronizar >= self.ventana:
+            self.sumas = [math.fsum(col) for col in zip(*self.filas)]
+            self.desde_resincronizar = 0
+
+    @property
+    def medias(self):
+        """Medias de cada columna (None si la ventana no está completa)"""
+        if len(self.filas) < self.ventana:
+            return None
+        return [suma / self.ventana for suma in self.sumas]
+
+    def a_dict(self):
+        return {'ventana': self.ventana, 'filas': list(self.filas), 'sumas': self.sumas,
+                'desde_resincronizar': self.desde_resincronizar}
+
+
+class MotorSpread:
+    """Métricas del spread actualizadas barra a barra (mismas fórmulas que calcular_spread)"""
+
+    def __init__(self, ventana_z=VENTANA_Z, ventana_cobertura=VENTANA_COBERTURA,
+                 ventana_vida_media=VENTANA_VIDA_MEDIA, umbral_z=UMBRAL_Z, referencias=None,
+                 ventanas=None, ultimo=None, ultima_fecha=None):
+        self.umbral_z = umbral_z
+        self.referencias = referencias           # (wti, brent, spread) de la primera barra
+        self.ventanas = ventanas or {
+            'z': _VentanaSumas(ventana_z),
+            'cobertura': _VentanaSumas(ventana_cobertura),
+            'vida_media': _VentanaSumas(ventana_vida_media)
+        }
+        self.ultimo = ultimo                     # (wti, brent) de la última barra
+        self.ultima_fecha = ultima_fecha
+
+    def parametros(self):
+        return (self.ventanas['z'].ventana, self.ventanas['cobertura'].ventana,
+                self.ventanas['vida_media'].ventana, self.umbral_z)
+
+    def actualizar(self, wti, brent, fecha=None):
+        """
+        Incorpora una barra (precios del mismo día).
+
+        RETORNA:
+            dict con las columnas de COLUMNAS_SPREAD para esa barra
+        """
+        wti, brent = float(wti), float(brent)
+        spread = brent - wti
+        if self.referencias is None:
+            self.referencias = (wti, brent, spread)
+        ref_x, ref_y, ref_s = self.referencias
+        x, y, s = wti - ref_x, brent - ref_y, spread - ref_s
+
+        self.ventanas['z'].agregar((s, s * s))
+        self.ventanas['cobertura'].agregar((x, y, x * x, x * y))
+        if self.ultimo is not None:
+            anterior = (self.ultimo[1] - self.ultimo[0]) - ref_s
+            cambio = s - anterior
+            self.ventanas['vida_media'].agregar((anterior, cambio, anterior * anterior,
+                                                 anterior * cambio))
+        self.ultimo = (wti, brent)
+        if fecha is not None:
+            self.ultima_fecha = pd.Timestamp(fecha).strftime('%Y-%m-%d')
+
+        media = desviacion = zscore = beta = alfa = lam = NAN
+        medias = self.ventanas['z'].medias
+        if medias is not None:
+            media = medias[0] + ref_s
+            desviacion = math.sqrt(max(medias[1] - medias[0] ** 2, 0.0))
+            zscore = (s - medias[0]) / desviacion if desviacion > 0 else NAN
+        medias = self.ventanas['cobertura'].medias
+        if medias is not None:
+            beta = float(_pendiente(*medias))
+            alfa = (medias[1] + ref_y) - beta * (medias[0] + ref_x)
+        medias = self.ventanas['vida_media'].medias
+        if medias is not None:
+            lam = float(_pendiente(*medias))
+
+        return {
+            'wti': wti,
+            'brent': brent,
+            'spread': spread,
+            'media': media,
+            'desviacion': desviacion,
+            'zscore': zscore,
+            'beta': beta,
+            'alfa': alfa,
+            'spread_cubierto': brent - beta * wti,
+            'vida_media': float(_vida_media(lam)),
+            'regimen': str(_regimen(zscore, self.umbral_z))
+        }
+
+    @classmethod
+    def desde_historia(cls, precios, **kwargs):
+        """
+        Estado equivalente a haber procesado toda la historia: basta con
+        recorrer las últimas barras que caben en la ventana más larga.
+        """
+        motor = cls(**kwargs)
+        ventana_z, ventana_cobertura, ventana_vida_media, _ = motor.parametros()
+        cola = precios.iloc[-max(ventana_z, ventana_cobertura, ventana_vida_media + 1):]
+        for fecha, wti, brent in zip(cola.index, cola['wti'], cola['brent']):
+            motor.actualizar(wti, brent, fecha)
+        return motor
+
+    def continua(self, precios):
+        """True si la última barra procesada sigue igual en `precios`"""
+        if self.ultima_fecha is None or self.ultimo is None:
+            return False
+        fecha = pd.Timestamp(self.ultima_fecha)
+        if fecha not in precios.index:
+            return False
+        return bool(np.allclose(precios.loc[fecha, ['wti', 'brent']].to_numpy(dtype=np.float64),
+                                self.ultimo))
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Persistencia
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def a_dict(self):
+        return {
+            'umbral_z': self.umbral_z,
+            'referencias': self.referencias,
+            'ventanas': {nombre: v.a_dict() for nombre, v in self.ventanas.items()},
+            'ultimo': self.ultimo,
+            'ultima_fecha': self.ultima_fecha
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        ventanas = {nombre: _VentanaSumas(**v) for nombre, v in datos['ventanas'].items()}
+        referencias = tuple(datos['referencias']) if datos['referencias'] is not None else None
+        ultimo = tuple(datos['ultimo']) if datos['ultimo'] is not None else None
+        return cls(umbral_z=datos['umbral_z'], referencias=referencias, ventanas=ventanas,
+                   ultimo=ultimo, ultima_fecha=datos['ultima_fecha'])
+
+
+def guardar_motor(motor, ruta=RUTA_ESTADO):
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(motor.a_dict(), f)
+    os.replace(temporal, ruta)
+
+
+def cargar_motor(ruta=RUTA_ESTADO):
+    """MotorSpread guardado (None si no existe o está dañado)"""
+    if not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            return MotorSpread.desde_dict(json.load(f))
+    except (ValueError, KeyError, TypeError):
+        return None
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CARACTERÍSTICA PRECALCULADA
+# ══════════════════════════════════════════════════════════════════════════════
+
+def cargar_spread(ruta=RUTA_SPREAD):
+    """Serie precalculada del spread (DataFrame vacío si aún no existe)"""
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=COLUMNAS_SPREAD, index=pd.DatetimeIndex([], name='fecha'))
+    return pd.read_csv(ruta, index_col='fecha', parse_dates=['fecha'])
+
+
+def actualizar_spread(precios=None, ruta=RUTA_SPREAD, ruta_estado=RUTA_ESTADO):
+    """
+    Mantiene al día la serie precalculada del spread.
+
+    Si el estado guardado sigue siendo consistente con los precios (misma
+    última barra, mismas ventanas) solo se procesan las fechas nuevas y se
+    agregan al CSV; si no, se recalcula todo en lote.
+
+    ENTRADA:
+        precios: DataFrame con columnas wti y brent (None = WTI y BRENT del catálogo)
+
+    RETORNA:
+        DataFrame con la serie completa (COLUMNAS_SPREAD)
+    """
+    if precios is None:
+        universo = cargar_universo(tickers=['WTI', 'BRENT'])
+        if not {'WTI', 'BRENT'}.issubset(universo.columns):
+            raise ValueError("Faltan precios de WTI o Brent en el catálogo")
+        precios = universo.rename(columns={'WTI': 'wti', 'BRENT': 'brent'})[['wti', 'brent']].dropna()
+
+    motor = cargar_motor(ruta_estado)
+    incremental = (motor is not None and os.path.exists(ruta) and motor.continua(precios)
+                   and motor.parametros() == MotorSpread().parametros())
+
+    if incremental:
+        nuevos = precios[precios.index > pd.Timestamp(motor.ultima_fecha)]
+        if len(nuevos):
+            filas = [motor.actualizar(wti, brent, fecha)
+                     for fecha, wti, brent in zip(nuevos.index, nuevos['wti'], nuevos['brent'])]
+            tabla = pd.DataFrame(filas, index=nuevos.index, columns=COLUMNAS_SPREAD)
+            tabla.index.name = 'fecha'
+            tabla.to_csv(ruta, mode='a', header=False)
+            guardar_motor(motor, ruta_estado)
+        return cargar_spread(ruta)
+
+    tabla = calcular_spread(precios)
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    tabla.to_csv(ruta)
+    guardar_motor(MotorSpread.desde_historia(precios), ruta_estado)
+    return tabla
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("SPREAD BRENT − WTI")
+    print("=" * 70)
+
+    # WTI lognormal y spread Ornstein-Uhlenbeck con vida media conocida
+    rng = np.random.default_rng(0)
+    n, vida_real, beta_real = 3000, 15.0, 1.05
+    fechas = pd.bdate_range('2013-01-01', periods=n)
+    wti = 70 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    phi = 0.5 ** (1 / vida_real)
+    desvio = np.zeros(n)
+    for t in range(1, n):
+        desvio[t] = phi * desvio[t - 1] + rng.normal(0, 0.4)
+    brent = 2 + beta_real * wti + desvio
+    df_wti = pd.DataFrame({'fecha': fechas, 'precio': wti})
+    df_brent = pd.DataFrame({'fecha': fechas, 'precio': brent}).drop(index=[10, 500, 1200])
+
+    precios = alinear_precios(df_wti, df_brent)
+    inicio = time.perf_counter()
+    tabla = calcular_spread(precios)
+    print(f"\n  ✓ Serie alineada: {len(precios)} días (se descartan fechas sin ambos precios)")
+    print(f"  ✓ Cálculo en lote: {(time.perf_counter() - inicio) * 1e3:.1f} ms")
+    print(f"  ✓ Ratio de cobertura (mediana): {tabla['beta'].median():.3f} (real {beta_real})")
+    print(f"  ✓ Vida media muestral del spread cubierto: "
+          f"{vida_media(brent - beta_real * wti):.1f} días (real {vida_real})")
+
+    # Streaming: historia + 500 barras nuevas, comparado con el lote
+    directorio = tempfile.mkdtemp()
+    ruta, ruta_estado = os.path.join(directorio, 'spread.csv'), os.path.join(directorio, 'estado.json')
+    actualizar_spread(precios.iloc[:-500], ruta, ruta_estado)
+    inicio = time.perf_counter()
+    incremental = actualizar_spread(precios, ruta, ruta_estado)
+    print(f"  ✓ 500 barras nuevas en {(time.perf_counter() - inicio) * 1e3:.1f} ms (incremental)")
+
+    numericas = [c for c in COLUMNAS_SPREAD if c != 'regimen']
+    iguales = np.allclose(incremental[numericas].to_numpy(dtype=np.float64),
+                          tabla[numericas].to_numpy(dtype=np.float64), equal_nan=True)
+    iguales &= (incremental['regimen'] == tabla['regimen']).all()
+    print(f"  {'✓' if iguales else '✗'} Incremental coincide con el lote")
+
+    print(f"\n  Régimen actual: {tabla['regimen'].iloc[-1]} (z = {tabla['zscore'].iloc[-1]:+.2f})")
+    print(f"  Días por régimen: {tabla['regimen'].value_counts().to_dict()}")
+    print("=" * 70)
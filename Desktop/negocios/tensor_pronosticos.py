@@ -0,0 +1,292 @@
+"""
+TENSOR DE PRONÓSTICOS MULTI-HORIZONTE
+Pronósticos de todos los tickers en un arreglo denso con consulta directa
+
+Cada script leía "el valor a 10 días" a su manera: iloc[9] en
+modulo_4_integracion, iloc[-1] en 3b_analisis_sentimiento_real y la
+primera fila posterior al último precio en 5_integracion_completa. Aquí
+los pronósticos de un modelo se guardan como
+
+    valores   float32 [ticker × fecha_emision × horizonte × 3]
+              campos (yhat, limite_inf, limite_sup); NaN = sin dato
+    tickers   índice de la 1ª dimensión
+    fechas    datetime64[D] de la 2ª dimensión (fecha de emisión)
+
+con horizonte h = 1..H días calendario desde la fecha de emisión (el
+mismo h del registro_pronosticos). Consultar cualquier ticker/horizonte es
+un acceso directo al arreglo a través de dos diccionarios, sin leer CSV.
+
+Se guarda como base_datos_csv/tensor_pronosticos_{modelo}.npz (sin
+pickle); registro_pronosticos.registrar_pronostico lo mantiene al día.
+
+Cada script que ajusta su propio Prophet registra con su propia etiqueta
+de modelo (ver MODELOS_REGISTRADOS), para no mezclar configuraciones ni
+fuentes de datos distintas en un mismo tensor o MAPE.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+BASE_DIR = "base_datos_csv"
+CAMPOS = ('yhat', 'limite_inf', 'limite_sup')
+HORIZONTE_MAX = 30
+
+# Etiqueta de modelo de cada escritor del registro y del tensor
+MODELOS_REGISTRADOS = {
+    'prophet_script2': '2_prediccion_prophet.py (pipeline 1 → 2 → 3 → 5)',
+    'prophet_todo_en_uno': 'SISTEMA_COMPLETO_TODO_EN_UNO.py',
+    'prophet_sistema_completo': "SISTEMA_RECOMENDACION_PETROLEO.py, perfil 'completo'",
+    'prophet_sistema_rapido': "SISTEMA_RECOMENDACION_PETROLEO.py, perfil 'rapido'",
+    'prophet_codigo_completo': "codigo.py, perfil 'completo'",
+    'prophet_codigo_rapido': "codigo.py, perfil 'rapido'",
+    'kalman': 'SISTEMA_RECOMENDACION_PETROLEO.py con MOTOR_PREDICCION = "kalman"'
+}
+MODELO_DEFECTO = 'prophet_script2'
+
+
+def ruta_tensor(modelo=MODELO_DEFECTO, base_dir=BASE_DIR):
+    return f"{base_dir}/tensor_pronosticos_{modelo}.npz"
+
+
+def _dia(fecha):
+    """Fecha (str, Timestamp, datetime64) → datetime64[D] sin zona horaria"""
+    fecha = pd.Timestamp(fecha)
+    if fecha.tzinfo is not None:
+        fecha = fecha.tz_localize(None)
+    return np.datetime64(fecha.normalize().date(), 'D')
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TENSOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TensorPronosticos:
+    """Pronósticos [ticker × fecha_emision × horizonte × campo] en float32"""
+
+    def __init__(self, valores=None, tickers=(), fechas=(), horizonte_max=HORIZONTE_MAX):
+        if valores is None:
+            valores = np.full((0, 0, horizonte_max, len(CAMPOS)), np.nan, dtype=np.float32)
+        self.valores = valores
+        self.tickers = list(tickers)
+        self.fechas = np.asarray(fechas, dtype='datetime64[D]')
+        self._reindexar()
+
+    def _reindexar(self):
+        self.indice_ticker = {t: i for i, t in enumerate(self.tickers)}
+        self.indice_fecha = {f: j for j, f in enumerate(self.fechas)}
+        # Última fecha de emisión con algún dato, por ticker (-1 = ninguna)
+        con_datos = ~np.isnan(self.valores[..., 0]).all(axis=2)
+        posiciones = np.where(con_datos, np.arange(con_datos.shape[1]), -1)
+        self.ultima_emision = posiciones.max(axis=1, initial=-1)
+
+    @property
+    def horizonte_max(self):
+        return self.valores.shape[2]
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Escritura
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _posicion(self, ticker, fecha):
+        """Índices (i, j) del ticker y la fecha, ampliando el arreglo si son nuevos"""
+        if ticker not in self.indice_ticker:
+            self.tickers.append(ticker)
+            self.valores = np.concatenate(
+                [self.valores, np.full((1,) + self.valores.shape[1:], np.nan, np.float32)], axis=0)
+            self.indice_ticker[ticker] = len(self.tickers) - 1
+            self.ultima_emision = np.append(self.ultima_emision, -1)
+        if fecha not in self.indice_fecha:
+            # Mantener las fechas ordenadas: insertar en su posición
+            j = int(np.searchsorted(self.fechas, fecha))
+            self.fechas = np.insert(self.fechas, j, fecha)
+            self.valores = np.insert(self.valores, j, np.nan, axis=1)
+            self.indice_fecha = {f: k for k, f in enumerate(self.fechas)}
+            self.ultima_emision = np.where(self.ultima_emision >= j, self.ultima_emision + 1,
+                                           self.ultima_emision)
+        return self.indice_ticker[ticker], self.indice_fecha[fecha]
+
+    def agregar(self, forecast, ticker, fecha_emision):
+        """
+        Escribe un pronóstico (fecha, prediccion, limite_inf, limite_sup) en la
+        celda del ticker y la fecha de emisión. Las fechas que no caen en
+        1..horizonte_max días después de la emisión se ignoran.
+        """
+        ticker = ticker.upper()
+        emision = _dia(fecha_emision)
+        fechas = pd.to_datetime(forecast['fecha'])
+        if fechas.dt.tz is not None:
+            fechas = fechas.dt.tz_localize(None)
+        h = (fechas.dt.normalize().to_numpy(dtype='datetime64[D]') - emision).astype(np.int64)
+        validos = (h >= 1) & (h <= self.horizonte_max)
+        if not validos.any():
+            return 0
+
+        i, j = self._posicion(ticker, emision)
+        for k, campo in enumerate(CAMPOS):
+            columna = 'prediccion' if campo == 'yhat' else campo
+            if columna in forecast:
+                self.valores[i, j, h[validos] - 1, k] = \
+                    forecast[columna].to_numpy(dtype=np.float32)[validos]
+        self.ultima_emision[i] = max(self.ultima_emision[i], j)
+        return int(validos.sum())
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Consulta
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _indices(self, ticker, fecha_emision):
+        i = self.indice_ticker.get(ticker.upper())
+        if i is None:
+            raise KeyError(f"Ticker sin pronósticos: {ticker}")
+        if fecha_emision is None:
+            j = int(self.ultima_emision[i])
+            if j < 0:
+                raise KeyError(f"Ticker sin pronósticos: {ticker}")
+        else:
+            j = self.indice_fecha.get(_dia(fecha_emision))
+            if j is None:
+                raise KeyError(f"Sin pronóstico de {ticker} emitido el {fecha_emision}")
+        return i, j
+
+    def valor(self, ticker, h, campo='yhat', fecha_emision=None):
+        """
+        Pronóstico a h días de un ticker (None en fecha_emision = el más reciente).
+
+        RETORNA:
+            float (NaN si esa celda no tiene dato)
+        """
+        i, j = self._indices(ticker, fecha_emision)
+        return float(self.valores[i, j, h - 1, CAMPOS.index(campo)])
+
+    def curva(self, ticker, fecha_emision=None):
+        """Todos los horizontes de una emisión: DataFrame h × (yhat, limite_inf, limite_sup)"""
+        i, j = self._indices(ticker, fecha_emision)
+        return pd.DataFrame(self.valores[i, j].astype(np.float64), columns=list(CAMPOS),
+                            index=pd.RangeIndex(1, self.horizonte_max + 1, name='h'))
+
+    def fecha_emision(self, ticker):
+        """Fecha de emisión del pronóstico más reciente de un ticker"""
+        i, j = self._indices(ticker, None)
+        return pd.Timestamp(self.fechas[j])
+
+    def corte_horizonte(self, h, campo='yhat'):
+        """Matriz [fecha_emision × ticker] del pronóstico a h días"""
+        return pd.DataFrame(self.valores[:, :, h - 1, CAMPOS.index(campo)].T,
+                            index=pd.DatetimeIndex(self.fechas, name='fecha_emision'),
+                            columns=self.tickers)
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Persistencia
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def guardar(self, ruta):
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        np.savez_compressed(ruta, valores=self.valores,
+                            tickers=np.array(self.tickers, dtype=str),
+                            fechas=self.fechas.astype(np.int64))
+
+    @classmethod
+    def cargar(cls, ruta, horizonte_max=HORIZONTE_MAX):
+        """Lee el tensor; si el archivo no existe retorna uno vacío"""
+        if not os.path.exists(ruta):
+            return cls(horizonte_max=horizonte_max)
+        with np.load(ruta, allow_pickle=False) as datos:
+            return cls(datos['valores'], datos['tickers'].tolist(),
+                       datos['fechas'].astype('datetime64[D]'))
+
+    @classmethod
+    def desde_registro(cls, registro, modelo=MODELO_DEFECTO, horizonte_max=HORIZONTE_MAX):
+        """Construye el tensor a partir de registro_pronosticos.cargar_registro()"""
+        df = registro[(registro['modelo'] == modelo)
+                      & registro['h'].between(1, horizonte_max)]
+        codigos_t, tickers = pd.factorize(df['ticker'], sort=True)
+        fechas_dia = df['fecha_emision'].to_numpy(dtype='datetime64[D]')
+        codigos_f, fechas = pd.factorize(fechas_dia, sort=True)
+
+        valores = np.full((len(tickers), len(fechas), horizonte_max, len(CAMPOS)),
+                          np.nan, dtype=np.float32)
+        h = df['h'].to_numpy(dtype=np.int64) - 1
+        valores[codigos_t, codigos_f, h] = \
+            df[['prediccion', 'limite_inf', 'limite_sup']].to_numpy(dtype=np.float32)
+        return cls(valores, list(tickers), np.asarray(fechas, dtype='datetime64[D]'))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES DE CONVENIENCIA
+# ══════════════════════════════════════════════════════════════════════════════
+
+_CACHE = {}
+
+
+def guardar_pronostico(forecast, ticker, modelo, fecha_emision, base_dir=BASE_DIR):
+    """Agrega un pronóstico al tensor del modelo y lo guarda"""
+    ruta = ruta_tensor(modelo, base_dir)
+    tensor = TensorPronosticos.cargar(ruta)
+    escritos = tensor.agregar(forecast, ticker, fecha_emision)
+    tensor.guardar(ruta)
+    _CACHE.pop(ruta, None)
+    return escritos
+
+
+def cargar_tensor(modelo=MODELO_DEFECTO, base_dir=BASE_DIR):
+    """Tensor del modelo (se lee una vez por proceso mientras el archivo no cambie)"""
+    ruta = ruta_tensor(modelo, base_dir)
+    marca = os.path.getmtime(ruta) if os.path.exists(ruta) else None
+    if ruta not in _CACHE or _CACHE[ruta][0] != marca:
+        _CACHE[ruta] = (marca, TensorPronosticos.cargar(ruta))
+    return _CACHE[ruta][1]
+
+
+def pronostico_horizonte(ticker='WTI', h=10, campo='yhat', modelo=MODELO_DEFECTO,
+                         fecha_emision=None, base_dir=BASE_DIR):
+    """Atajo: valor del pronóstico a h días (el más reciente si no se indica emisión)"""
+    return cargar_tensor(modelo, base_dir).valor(ticker, h, campo, fecha_emision)
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("TENSOR DE PRONÓSTICOS MULTI-HORIZONTE")
+    print("=" * 70)
+
+    tmp = tempfile.mkdtemp()
+    rng = np.random.default_rng(0)
+    tickers = ['WTI', 'BRENT', 'XOM', 'CVX', 'BVN_LM']
+    emisiones = pd.date_range('2025-01-01', periods=250, freq='D')
+
+    tensor = TensorPronosticos()
+    inicio = time.perf_counter()
+    for ticker in tickers:
+        for emision in emisiones:
+            futuras = pd.date_range(emision + pd.Timedelta(days=1), periods=HORIZONTE_MAX)
+            yhat = 70 + rng.normal(0, 1, HORIZONTE_MAX).cumsum()
+            tensor.agregar(pd.DataFrame({'fecha': futuras, 'prediccion': yhat,
+                                         'limite_inf': yhat - 2, 'limite_sup': yhat + 2}),
+                           ticker, emision)
+    print(f"\n  ✓ {len(tickers) * len(emisiones)} pronósticos agregados en "
+          f"{time.perf_counter() - inicio:.2f} s → forma {tensor.valores.shape}, "
+          f"{tensor.valores.nbytes / 1e6:.1f} MB")
+
+    ruta = ruta_tensor('demo', tmp)
+    tensor.guardar(ruta)
+    print(f"  ✓ Guardado: {os.path.getsize(ruta) / 1e6:.1f} MB en disco")
+
+    cargar_tensor('demo', tmp)
+    inicio = time.perf_counter()
+    for _ in range(10000):
+        pronostico_horizonte('XOM', 10, modelo='demo', base_dir=tmp)
+    print(f"  ✓ 10.000 consultas 'XOM a 10 días': {(time.perf_counter() - inicio) * 1e3:.1f} ms")
+
+    print(f"\n  XOM, emisión {tensor.fecha_emision('XOM').date()}:")
+    print(tensor.curva('XOM').head(10).round(2).to_string())
+    print("=" * 70)
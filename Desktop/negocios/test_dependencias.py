@@ -57,4 +57,16 @@ else:
     print("  python 1_descargar_datos.py")
     print("  python 5_integracion_completa.py")
 
+
+# Paridad del motor VADER vectorizado con la implementación de referencia
+if 'vaderSentiment' not in faltantes:
+    print("\nVerificando paridad del motor VADER vectorizado...")
+    from vader_vectorizado import comprobar_paridad
+    try:
+        resultado = comprobar_paridad()
+        print(f"✓ {resultado['n']:,} textos idénticos a vaderSentiment")
+    except RuntimeError as error:
+        print(f"✗ {error}")
+        sys.exit(1)
+
 print("=" * 60)
@@ -0,0 +1,520 @@
+"""
+MOTOR VADER VECTORIZADO (NumPy)
+Puntuación de sentimiento compatible con vaderSentiment, por lotes
+
+SentimentIntensityAnalyzer.polarity_scores procesa un texto a la vez y
+aplica cada regla palabra por palabra en Python. Este motor:
+
+    1. Tokeniza TODO el lote una sola vez (mismo criterio que VADER); los
+       textos repetidos se puntúan una sola vez
+    2. Asigna a cada token un id mediante una tabla hash (pd.factorize)
+       y consulta léxico, boosters y negaciones solo para los ids únicos
+    3. Aplica las reglas (boosters, negación, "no", "least", mayúsculas,
+       idiomas especiales y "but") como operaciones sobre arreglos de tokens
+    4. Suma por documento con np.bincount y normaliza como VADER
+
+Usa el mismo léxico y constantes del paquete vaderSentiment, de modo que los
+scores coinciden con la implementación de referencia. comprobar_paridad()
+lanza RuntimeError ante cualquier discrepancia; test_dependencias.py la
+ejecuta para proteger cambios futuros del motor.
+
+RENDIMIENTO MEDIDO: 5.3-5.9x sobre 50k textos únicos (por debajo del 10x
+buscado: la tokenización y la regla "but" siguen en Python). Con lotes de
+titulares repetidos la ganancia es mucho mayor, porque cada texto distinto
+se puntúa una sola vez.
+
+EXCEPCIÓN: la regla "but" de la referencia reubica valores con list.index(),
+que depende de que no haya valores repetidos. Para los documentos con "but" y
+dos o más valencias no nulas se reproduce ese paso exacto sobre la lista.
+"""
+
+import string
+from itertools import chain, repeat
+
+import numpy as np
+import pandas as pd
+from vaderSentiment.vaderSentiment import (SentimentIntensityAnalyzer, BOOSTER_DICT, NEGATE,
+                                           SPECIAL_CASES, N_SCALAR, C_INCR)
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+COLUMNAS_VADER = ('pos', 'neu', 'neg', 'compound')
+
+_PUNTUACION = string.punctuation
+_NEGACIONES = frozenset(NEGATE)
+
+
+def _frases_multipalabra(diccionario):
+    """Agrupa las frases de 2+ palabras por longitud: {n: [(palabras, valor), ...]}"""
+    frases = {}
+    for frase, valor in diccionario.items():
+        palabras = tuple(frase.split(' '))
+        if len(palabras) > 1:
+            frases.setdefault(len(palabras), []).append((palabras, valor))
+    return frases
+
+
+def _redondear(arreglo, decimales):
+    """
+    Redondeo idéntico a round() de Python (el usado por VADER).
+
+    np.round coincide salvo en valores casi a mitad de camino; solo esos se
+    redondean con round().
+    """
+    salida = np.round(arreglo, decimales)
+    escalado = arreglo * 10.0 ** decimales
+    empates = np.flatnonzero(np.abs(np.abs(escalado - np.floor(escalado)) - 0.5) < 1e-6)
+    for i in empates.tolist():
+        salida[i] = round(float(arreglo[i]), decimales)
+    return salida
+
+# ══════════════════════════════════════════════════════════════════════════════
+# MOTOR
+# ══════════════════════════════════════════════════════════════════════════════
+
+class MotorVaderVectorizado:
+    """
+    Motor de sentimiento VADER sobre arreglos NumPy.
+
+    USO:
+        motor = MotorVaderVectorizado()
+        scores = motor.puntuar(df['titulo'])   # dict pos/neu/neg/compound
+    """
+
+    def __init__(self):
+        referencia = SentimentIntensityAnalyzer()
+        self.lexicon = referencia.lexicon
+        self.emojis = referencia.emojis
+
+        # VADER reemplaza emojis carácter por carácter
+        self._emojis_simples = frozenset(e for e in self.emojis if len(e) == 1)
+
+        self._frases_especiales = _frases_multipalabra(SPECIAL_CASES)
+        self._frases_booster = _frases_multipalabra(BOOSTER_DICT)
+        self._but_referencia = SentimentIntensityAnalyzer._but_check
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Preprocesamiento
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _reemplazar_emojis(self, texto):
+        """Igual que polarity_scores: emoji → descripción, luego strip()"""
+        if texto.isascii() or self._emojis_simples.isdisjoint(texto):
+            return texto.strip()
+
+        salida = []
+        espacio_previo = True
+        for caracter in texto:
+            if caracter in self.emojis:
+                if not espacio_previo:
+                    salida.append(' ')
+                salida.append(self.emojis[caracter])
+                espacio_previo = False
+            else:
+                salida.append(caracter)
+                espacio_previo = caracter == ' '
+        return ''.join(salida).strip()
+
+    @staticmethod
+    def _tokenizar(textos):
+        """
+        Tokens de VADER para todo el lote: split() y quitar la puntuación de
+        los extremos salvo que queden 2 caracteres o menos (emoticones).
+
+        RETORNA:
+            tokens (lista plana), longitudes (tokens por texto)
+        """
+        separados = list(map(str.split, textos))
+        longitudes = np.fromiter(map(len, separados), dtype=np.int64, count=len(separados))
+        palabras = list(chain.from_iterable(separados))
+        limpias = list(map(str.strip, palabras, repeat(_PUNTUACION)))
+        cortas = np.fromiter(map(len, limpias), dtype=np.int64, count=len(limpias)) <= 2
+        tokens = [palabras[i] if corta else limpias[i] for i, corta in enumerate(cortas.tolist())]
+        return tokens, longitudes
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Reglas vectorizadas
+    # ──────────────────────────────────────────────────────────────────────────
+
+    def _coincidencias(self, frases, columnas, indice):
+        """Valor de la frase que coincide con las columnas de ids (NaN si ninguna)"""
+        valores = np.full(len(columnas[0]), np.nan)
+        for palabras, valor in frases.get(len(columnas), []):
+            ids = [indice.get(p, -2) for p in palabras]
+            if -2 in ids:
+                continue
+            mascara = np.ones(len(valores), dtype=bool)
+            for columna, id_palabra in zip(columnas, ids):
+                mascara &= columna == id_palabra
+            valores[mascara] = valor
+        return valores
+
+    def puntuar(self, textos):
+        """
+        Calcula scores VADER para un lote de textos.
+
+        ENTRADA:
+            textos: Series, lista o arreglo de textos (NaN/None se tratan como "")
+
+        RETORNA:
+            dict con arreglos NumPy float64 'pos', 'neu', 'neg', 'compound'
+        """
+        textos = ['' if t is None or t != t else str(t) for t in textos]
+        if not textos:
+            return {col: np.empty(0) for col in COLUMNAS_VADER}
+
+        # Textos repetidos se puntúan una vez y se reparten al final
+        codigos_texto, unicos_texto = pd.factorize(pd.Series(textos, dtype=object))
+        scores = self._puntuar_unicos([self._reemplazar_emojis(t) for t in unicos_texto])
+        return {col: valores[codigos_texto] for col, valores in scores.items()}
+
+    def _puntuar_unicos(self, textos):
+        """Aplica las reglas VADER sobre textos ya preprocesados"""
+        n = len(textos)
+
+        # ── 1. Tokenización del lote completo ──
+        tokens, longitudes = self._tokenizar(textos)
+
+        total_tokens = len(tokens)
+        if total_tokens == 0:
+            return {col: np.zeros(n) for col in COLUMNAS_VADER}
+
+        doc = np.repeat(np.arange(n), longitudes)
+        inicio_doc = np.cumsum(longitudes) - longitudes
+        posicion = np.arange(total_tokens) - inicio_doc[doc]
+        longitud_token = longitudes[doc]
+
+        mayus = np.fromiter(map(str.isupper, tokens), dtype=bool, count=total_tokens)
+        n_mayus = np.bincount(doc, weights=mayus, minlength=n)
+        dif_mayus_doc = (longitudes - n_mayus > 0) & (longitudes - n_mayus < longitudes)
+        dif_mayus = dif_mayus_doc[doc]
+
+        # ── 2. Ids por tabla hash y atributos por id único ──
+        codigos, unicos = pd.factorize(pd.Series(list(map(str.lower, tokens)), dtype=object))
+        indice = {u: i for i, u in enumerate(unicos)}
+
+        # Posición extra al final = centinela para vecinos fuera del documento (id -1)
+        lex = np.array([self.lexicon.get(u, np.nan) for u in unicos] + [np.nan])
+        en_lex = ~np.isnan(lex)
+        booster = np.array([BOOSTER_DICT.get(u, 0.0) for u in unicos] + [0.0])
+        es_booster = np.array([u in BOOSTER_DICT for u in unicos] + [False])
+        es_negacion = np.array([u in _NEGACIONES or "n't" in u for u in unicos] + [False])
+
+        def vecino(arreglo, k, relleno):
+            """Valor del token en posición i+k del mismo documento"""
+            salida = np.full(total_tokens, relleno, dtype=arreglo.dtype)
+            valido = (posicion + k >= 0) & (posicion + k < longitud_token)
+            salida[valido] = arreglo[np.flatnonzero(valido) + k]
+            return salida
+
+        def es(ids, palabra):
+            return ids == indice.get(palabra, -2)
+
+        previo = {d: vecino(codigos, -d, -1) for d in (1, 2, 3)}
+        siguiente = {d: vecino(codigos, d, -1) for d in (1, 2)}
+
+        # ── 3. Valencia base ──
+        activo = en_lex[codigos] & ~es_booster[codigos] & ~(es(codigos, "kind") & es(siguiente[1], "of"))
+        base = np.where(activo, lex[codigos], 0.0)
+        v = base.copy()
+
+        # "no" seguido de otra palabra del léxico no cuenta
+        v[activo & es(codigos, "no") & en_lex[siguiente[1]]] = 0.0
+
+        # Precedido por "no" (hasta 3 palabras, la 3ra solo con "or"/"nor")
+        precedido_no = (es(previo[1], "no") | es(previo[2], "no") |
+                        (es(previo[3], "no") & (es(previo[1], "or") | es(previo[1], "nor"))))
+        m = activo & precedido_no
+        v[m] = base[m] * N_SCALAR
+
+        # Énfasis por MAYÚSCULAS
+        m = activo & mayus & dif_mayus
+        v[m] = np.where(v[m] > 0, v[m] + C_INCR, v[m] - C_INCR)
+
+        # ── 4. Boosters, negaciones e idiomas en las 3 palabras previas ──
+        for k in range(3):
+            d = k + 1
+            ids_prev = previo[d]
+            cond = activo & (posicion > k) & ~en_lex[ids_prev]
+
+            s = booster[ids_prev]
+            s = np.where(v < 0, -s, s)
+            caps_prev = es_booster[ids_prev] & vecino(mayus, -d, False) & dif_mayus
+            s = np.where(caps_prev, np.where(v > 0, s + C_INCR, s - C_INCR), s)
+            if k == 1:
+                s = s * 0.95
+            elif k == 2:
+                s = s * 0.9
+            v = np.where(cond, v + s, v)
+
+            # Negación
+            so_this_1 = es(previo[1], "so") | es(previo[1], "this")
+            if k == 0:
+                amplificar = np.zeros(total_tokens, dtype=bool)
+                neutro = np.zeros(total_tokens, dtype=bool)
+            elif k == 1:
+                amplificar = es(previo[2], "never") & so_this_1
+                neutro = es(previo[2], "without") & es(previo[1], "doubt")
+            else:
+                so_this_2 = es(previo[2], "so") | es(previo[2], "this")
+                amplificar = (es(previo[3], "never") & so_this_2) | so_this_1
+                neutro = es(previo[3], "without") & (es(previo[2], "doubt") | es(previo[1], "doubt"))
+            negar = ~amplificar & ~neutro & es_negacion[ids_prev]
+            v = np.where(cond & amplificar, v * 1.25, v)
+            v = np.where(cond & negar, v * N_SCALAR, v)
+
+            # Idiomas especiales (solo con la 3ra palabra previa)
+            if k == 2:
+                v = np.where(cond, self._idiomas(v, codigos, previo, siguiente, indice), v)
+
+        # ── 5. "least" ──
+        least_1 = es(previo[1], "least") & ~en_lex[previo[1]]
+        c1 = (posicion > 1) & least_1
+        c1_negar = c1 & ~es(previo[2], "at") & ~es(previo[2], "very")
+        c2 = ~c1 & (posicion > 0) & least_1
+        v = np.where(activo & (c1_negar | c2), v * N_SCALAR, v)
+
+        # ── 6. "but": atenúa antes (×0.5) y amplifica después (×1.5) ──
+        es_but = es(codigos, "but")
+        docs_but, primero = np.unique(doc[es_but], return_index=True)
+        if len(docs_but):
+            pos_but = np.full(n, -1)
+            pos_but[docs_but] = posicion[np.flatnonzero(es_but)[primero]]
+            con_but = pos_but[doc] >= 0
+            factor = np.where(posicion < pos_but[doc], 0.5, np.where(posicion > pos_but[doc], 1.5, 1.0))
+            v_but = np.where(con_but, v * factor, v)
+
+            # Réplica exacta donde list.index() de la referencia puede confundir valores
+            no_nulos = np.bincount(doc, weights=(v != 0), minlength=n)
+            for j in docs_but[no_nulos[docs_but] >= 2]:
+                a, b = inicio_doc[j], inicio_doc[j] + longitudes[j]
+                v_but[a:b] = self._but_referencia(tokens[a:b], v[a:b].tolist())
+            v = v_but
+
+        return self._puntuar_valencias(v, doc, n, longitudes, textos)
+
+    def _idiomas(self, v, codigos, previo, siguiente, indice):
+        """Reproduce _special_idioms_check con comparaciones de ids"""
+        nuevo = v.copy()
+        especiales = self._frases_especiales
+        # Secuencias en orden de prioridad inverso: la primera de VADER gana
+        secuencias = [
+            [previo[3], previo[2]],                  # threetwo
+            [previo[3], previo[2], previo[1]],       # threetwoone
+            [previo[2], previo[1]],                  # twoone
+            [previo[2], previo[1], codigos],         # twoonezero
+            [previo[1], codigos],                    # onezero
+            [codigos, siguiente[1]],                 # zeroone
+            [codigos, siguiente[1], siguiente[2]],   # zeroonetwo
+        ]
+        for columnas in secuencias:
+            valores = self._coincidencias(especiales, columnas, indice)
+            nuevo = np.where(np.isnan(valores), nuevo, valores)
+
+        for columnas in ([previo[3], previo[2], previo[1]], [previo[3], previo[2]], [previo[2], previo[1]]):
+            valores = self._coincidencias(self._frases_booster, columnas, indice)
+            nuevo = np.where(np.isnan(valores), nuevo, nuevo + valores)
+        return nuevo
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # Agregación por documento
+    # ──────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _puntuar_valencias(v, doc, n, longitudes, textos):
+        """Equivalente vectorizado de score_valence"""
+        suma = np.bincount(doc, weights=v, minlength=n)
+
+        exclamaciones = np.minimum([t.count('!') for t in textos], 4) * 0.292
+        preguntas = np.array([t.count('?') for t in textos])
+        preguntas = np.where(preguntas > 3, 0.96, np.where(preguntas > 1, preguntas * 0.18, 0.0))
+        enfasis = exclamaciones + preguntas
+
+        suma = np.where(suma > 0, suma + enfasis, np.where(suma < 0, suma - enfasis, suma))
+        compound = np.clip(suma / np.sqrt(suma * suma + 15), -1.0, 1.0)
+
+        positivos = v > 0
+        negativos = v < 0
+        pos_suma = np.bincount(doc[positivos], weights=v[positivos] + 1, minlength=n)
+        neg_suma = np.bincount(doc[negativos], weights=v[negativos] - 1, minlength=n)
+        neutros = np.bincount(doc[v == 0], minlength=n).astype(np.float64)
+
+        domina_pos = pos_suma > np.abs(neg_suma)
+        domina_neg = pos_suma < np.abs(neg_suma)
+        pos_suma = np.where(domina_pos, pos_suma + enfasis, pos_suma)
+        neg_suma = np.where(domina_neg, neg_suma - enfasis, neg_suma)
+
+        total = pos_suma + np.abs(neg_suma) + neutros
+        con_tokens = longitudes > 0
+        total = np.where(con_tokens, total, 1.0)
+
+        return {
+            'pos': _redondear(np.where(con_tokens, np.abs(pos_suma / total), 0.0), 3),
+            'neu': _redondear(np.where(con_tokens, np.abs(neutros / total), 0.0), 3),
+            'neg': _redondear(np.where(con_tokens, np.abs(neg_suma / total), 0.0), 3),
+            'compound': _redondear(np.where(con_tokens, compound, 0.0), 4)
+        }
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PARIDAD CON LA IMPLEMENTACIÓN DE REFERENCIA
+# ══════════════════════════════════════════════════════════════════════════════
+
+CASOS_PARIDAD = [
+    # Ejemplos de la documentación de VADER
+    "VADER is smart, handsome, and funny.",
+    "VADER is smart, handsome, and funny!",
+    "VADER is very smart, handsome, and funny.",
+    "VADER is VERY SMART, handsome, and FUNNY.",
+    "VADER is VERY SMART, handsome, and FUNNY!!!",
+    "VADER is VERY SMART, uber handsome, and FRIGGIN FUNNY!!!",
+    "VADER is not smart, handsome, nor funny.",
+    "The book was good.",
+    "At least it isn't a horrible book.",
+    "The book was only kind of good.",
+    "The plot was good, but the characters are uncompelling and the dialog is not great.",
+    "Today SUX!",
+    "Today only kinda sux! But I'll get by, lol",
+    "Make sure you :) or :D today!",
+    "Catch utf-8 emoji such as 💘 and 💋 and 😁",
+    "Not bad at all",
+    "Sentiment analysis has never been good.",
+    "Sentiment analysis has never been this good!",
+    "Most automated sentiment analysis tools are shit.",
+    "With VADER, sentiment analysis is the shit!",
+    "Other sentiment analysis tools can be quite bad.",
+    "On the other hand, VADER is quite bad ass",
+    "VADER is such a badass!",
+    "Without a doubt, excellent idea.",
+    "Roger Dodger is one of the most compelling variations on this theme.",
+    "Roger Dodger is at least compelling as a variation on the theme.",
+    "Roger Dodger is one of the least compelling variations on this theme.",
+    "Not such a badass after all.",
+    "Without a doubt, an excellent idea.",
+    # Titulares del dominio
+    "Oil prices surge as OPEC cuts output",
+    "Crude slumps on weak demand fears",
+    "OPEP anuncia recorte de producción, precios del petróleo suben",
+    "Brent rallies but traders remain worried about a global recession??",
+    "No good news for crude bulls",
+    "Analysts say prices are not so bad, but not great either",
+    "",
+    "   ",
+]
+
+
+def _casos_sinteticos(n, semilla=42):
+    """Frases aleatorias que combinan léxico, boosters, negaciones y conectores"""
+    rng = np.random.default_rng(semilla)
+    lexico = list(SentimentIntensityAnalyzer().lexicon)
+    especiales = ["no", "not", "never", "without", "doubt", "so", "this", "but", "least",
+                  "at", "very", "kind", "of", "or", "nor", "sort", "just", "enough",
+                  "the", "shit", "bad", "ass", "kiss", "death", "isn't", "don't"]
+    vocabulario = (lexico[::25] + list(BOOSTER_DICT)[:40] + NEGATE[:20] + especiales * 3 +
+                   ["oil", "crude", "prices", "market", "OPEC", "barrel"] * 5)
+    signos = ["", "", "", "!", "!!", "?", "??", "???", ".", ","]
+
+    casos = []
+    for _ in range(n):
+        palabras = list(rng.choice(vocabulario, size=rng.integers(1, 14)))
+        palabras = [p.upper() if rng.random() < 0.1 else p for p in palabras]
+        casos.append(' '.join(palabras) + rng.choice(signos))
+    return casos
+
+
+def verificar_paridad(textos=None, n_sinteticos=5000, tolerancia=1e-4):
+    """
+    Compara el motor vectorizado con vaderSentiment.polarity_scores.
+
+    ENTRADA:
+        textos: textos a comparar (None = CASOS_PARIDAD + casos sintéticos)
+        n_sinteticos: frases aleatorias agregadas cuando textos es None
+        tolerancia: diferencia absoluta máxima aceptada por columna
+
+    RETORNA:
+        dict con 'n', 'max_diferencia' (por columna), 'ok' y 'discrepancias'
+        (DataFrame con los textos fuera de tolerancia)
+    """
+    if textos is None:
+        textos = CASOS_PARIDAD + _casos_sinteticos(n_sinteticos)
+    textos = list(textos)
+
+    referencia = SentimentIntensityAnalyzer()
+    esperado = pd.DataFrame([referencia.polarity_scores(t) for t in textos])
+    obtenido = pd.DataFrame(MotorVaderVectorizado().puntuar(textos))
+
+    diferencias = (esperado[list(COLUMNAS_VADER)] - obtenido[list(COLUMNAS_VADER)]).abs()
+    fuera = (diferencias > tolerancia).any(axis=1)
+
+    discrepancias = pd.DataFrame({'texto': textos})[fuera]
+    discrepancias['compound_ref'] = esperado.loc[fuera, 'compound']
+    discrepancias['compound_vec'] = obtenido.loc[fuera, 'compound']
+
+    return {
+        'n': len(textos),
+        'max_diferencia': diferencias.max().to_dict(),
+        'ok': not fuera.any(),
+        'discrepancias': discrepancias
+    }
+
+
+def comprobar_paridad(textos=None, n_sinteticos=5000, tolerancia=1e-4):
+    """
+    Igual que verificar_paridad, pero lanza RuntimeError si algún texto
+    queda fuera de tolerancia (para usar como verificación automática).
+
+    RETORNA:
+        el dict de verificar_paridad cuando no hay discrepancias
+    """
+    resultado = verificar_paridad(textos, n_sinteticos, tolerancia)
+    if not resultado['ok']:
+        ejemplos = resultado['discrepancias'].head(5).to_string(index=False)
+        raise RuntimeError(f"Motor vectorizado difiere de vaderSentiment en "
+                           f"{len(resultado['discrepancias'])} de {resultado['n']} textos:\n{ejemplos}")
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 70)
+    print("MOTOR VADER VECTORIZADO")
+    print("=" * 70)
+
+    # 1. Paridad
+    resultado = verificar_paridad()
+    print(f"\n  Textos comparados: {resultado['n']:,}")
+    for col, dif in resultado['max_diferencia'].items():
+        print(f"    Δ máx {col:<9} {dif:.6f}")
+    print(f"  {'✓' if resultado['ok'] else '✗'} Paridad con vaderSentiment: "
+          f"{len(resultado['discrepancias'])} discrepancias")
+
+    # 2. Rendimiento: textos únicos (peor caso) y titulares repetidos
+    unicos = list(dict.fromkeys(_casos_sinteticos(50000, semilla=7)))
+    titulares = [
+        "Oil prices surge as OPEC cuts output",
+        "Crude slumps on weak demand fears",
+        "Market awaits weekly inventory data, but analysts are NOT optimistic!",
+        "Brent holds steady"
+    ] * 25000
+
+    referencia = SentimentIntensityAnalyzer()
+    for nombre, lote in (("Únicos", unicos), ("Repetidos", titulares)):
+        inicio = time.perf_counter()
+        for t in lote:
+            referencia.polarity_scores(t)
+        t_ref = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        MotorVaderVectorizado().puntuar(lote)
+        t_vec = time.perf_counter() - inicio
+
+        print(f"\n  {nombre} ({len(lote):,} textos)")
+        print(f"    Referencia:   {t_ref:.2f} s")
+        print(f"    Vectorizado:  {t_vec:.2f} s ({t_ref / t_vec:.1f}x)")
+    print("=" * 70)
@@ -0,0 +1,269 @@
+"""
+VOLATILIDAD CONDICIONAL (EWMA / GARCH(1,1)) DE TODO EL UNIVERSO
+Nivel de riesgo y tamaño de posición a partir de la volatilidad medida
+
+    EWMA      σ²_t = λ·σ²_{t-1} + (1 − λ)·r²_{t-1}          (λ = 0.94, RiskMetrics)
+    GARCH     σ²_t = ω + α·r²_{t-1} + β·σ²_{t-1}
+              con ω = v̄·(1 − α − β)  (variance targeting, v̄ = varianza muestral)
+
+AJUSTE RÁPIDO POR MÁXIMA VEROSIMILITUD:
+    Con variance targeting solo quedan (α, β). Se evalúa una rejilla de
+    pares (α, persistencia α+β) y la recursión corre a la vez sobre un
+    arreglo [combinación × ticker]: un único recorrido por las fechas ajusta
+    todos los tickers. Cada ticker se queda con el par de mayor
+    log-verosimilitud gaussiana.
+
+Los días sin precio (tickers que no cotizan ese día) mantienen la varianza
+anterior y no entran en la verosimilitud. El resultado del día se guarda en
+base_datos_csv/cache_volatilidad/ y se reutiliza mientras los precios no
+cambien.
+"""
+
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from catalogo_precios import cargar_universo, huella_serie
+
+# ══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+DIR_CACHE = "base_datos_csv/cache_volatilidad"
+
+DIAS_ANIO = 252
+LAMBDA_EWMA = 0.94
+
+ALFAS = np.array([0.01, 0.02, 0.03, 0.05, 0.07, 0.09, 0.12, 0.15, 0.2, 0.25, 0.3])
+PERSISTENCIAS = np.array([0.8, 0.85, 0.9, 0.93, 0.95, 0.97, 0.98, 0.99, 0.995])
+
+# Volatilidad anual → nivel de riesgo (mismos niveles y colores del termómetro)
+UMBRALES_RIESGO = [(0.20, 'BAJO', 'blue'), (0.35, 'MEDIO', 'green'),
+                   (0.50, 'MEDIO-ALTO', 'yellow'), (np.inf, 'ALTO', 'red')]
+
+VOL_OBJETIVO = 0.20            # volatilidad anual objetivo de la posición
+MIN_OBSERVACIONES = 60         # rendimientos mínimos para estimar un ticker
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RECURSIONES VECTORIZADAS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def rendimientos_log(precios):
+    """Rendimientos logarítmicos diarios [fecha × ticker] (NaN donde falta precio)"""
+    return np.log(precios.astype(np.float64)).diff().iloc[1:]
+
+
+def _recursion(r, validos, omega, alfa, beta, var_inicial):
+    """
+    Varianza condicional para todas las combinaciones a la vez.
+
+    ENTRADA:
+        r, validos: [T × N] rendimientos (0 donde falta) y máscara
+        omega, alfa, beta: [G × N] (o difundibles a esa forma)
+        var_inicial: [N]
+
+    RETORNA:
+        (varianzas [T+1 × G × N] — la última fila es el pronóstico a 1 día,
+         log-verosimilitud [G × N])
+    """
+    T = r.shape[0]
+    forma = np.broadcast_shapes(np.shape(omega), np.shape(alfa), np.shape(beta), var_inicial.shape)
+    varianzas = np.empty((T + 1,) + forma)
+    varianzas[0] = var_inicial
+    log_v = np.zeros(forma)
+    for t in range(T):
+        var = varianzas[t]
+        r2 = r[t] ** 2
+        log_v -= np.where(validos[t], 0.5 * (np.log(var) + r2 / var), 0.0)
+        varianzas[t + 1] = np.where(validos[t], omega + alfa * r2 + beta * var, var)
+    return varianzas, log_v
+
+
+def _preparar(precios):
+    rendimientos = rendimientos_log(precios)
+    validos = rendimientos.notna().to_numpy()
+    r = rendimientos.fillna(0.0).to_numpy()
+    n = validos.sum(axis=0)
+    var_muestral = np.where(n > 1, (r ** 2).sum(axis=0) / np.maximum(n, 1), np.nan)
+    return rendimientos, r, validos, var_muestral
+
+
+def volatilidad_ewma(precios, lam=LAMBDA_EWMA):
+    """
+    Volatilidad EWMA diaria de cada ticker.
+
+    RETORNA:
+        DataFrame [fecha × ticker] con σ condicional (la fila final, con la
+        fecha siguiente a la última, es el pronóstico a 1 día)
+    """
+    rendimientos, r, validos, var_muestral = _preparar(precios)
+    varianzas, _ = _recursion(r, validos, 0.0, 1 - lam, lam, var_muestral)
+    fechas = rendimientos.index.append(pd.DatetimeIndex([rendimientos.index[-1] + pd.offsets.BDay()]))
+    return pd.DataFrame(np.sqrt(varianzas), index=fechas, columns=precios.columns)
+
+
+def ajustar_garch(precios, alfas=ALFAS, persistencias=PERSISTENCIAS):
+    """
+    GARCH(1,1) con variance targeting por rejilla de máxima verosimilitud.
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker]
+
+    RETORNA:
+        parametros: DataFrame por ticker con omega, alpha, beta, persistencia,
+                    log_verosimilitud, n
+        sigma: DataFrame [fecha × ticker] de σ condicional (última fila =
+               pronóstico a 1 día)
+    """
+    rendimientos, r, validos, var_muestral = _preparar(precios)
+
+    alfa, persistencia = np.meshgrid(alfas, persistencias, indexing='ij')
+    combinaciones = alfa < persistencia
+    alfa = alfa[combinaciones][:, None]                        # [G × 1]
+    beta = persistencia[combinaciones][:, None] - alfa
+    omega = var_muestral[None, :] * (1 - alfa - beta)          # [G × N]
+
+    varianzas, log_v = _recursion(r, validos, omega, alfa, beta, var_muestral)
+
+    mejor = np.argmax(np.nan_to_num(log_v, nan=-np.inf), axis=0)   # [N]
+    columnas = np.arange(len(precios.columns))
+    parametros = pd.DataFrame({
+        'omega': omega[mejor, columnas],
+        'alpha': alfa[mejor, 0],
+        'beta': beta[mejor, 0],
+        'persistencia': alfa[mejor, 0] + beta[mejor, 0],
+        'log_verosimilitud': log_v[mejor, columnas],
+        'n': validos.sum(axis=0)
+    }, index=pd.Index(precios.columns, name='ticker'))
+
+    fechas = rendimientos.index.append(pd.DatetimeIndex([rendimientos.index[-1] + pd.offsets.BDay()]))
+    sigma = pd.DataFrame(np.sqrt(varianzas[:, mejor, columnas]), index=fechas,
+                         columns=precios.columns)
+    return parametros, sigma
+
+# ══════════════════════════════════════════════════════════════════════════════
+# RIESGO Y TAMAÑO DE POSICIÓN
+# ══════════════════════════════════════════════════════════════════════════════
+
+def nivel_riesgo(vol_anual):
+    """Volatilidad anual (fracción) → (riesgo, color) del termómetro"""
+    for umbral, riesgo, color in UMBRALES_RIESGO:
+        if vol_anual < umbral:
+            return riesgo, color
+    return UMBRALES_RIESGO[-1][1:]
+
+
+def tamano_posicion(vol_anual, objetivo=VOL_OBJETIVO, maximo=1.0):
+    """Fracción del capital para que la posición tenga la volatilidad objetivo"""
+    if not vol_anual > 0:
+        return 0.0
+    return float(min(maximo, objetivo / vol_anual))
+
+# ══════════════════════════════════════════════════════════════════════════════
+# TABLA DEL UNIVERSO (CACHÉ DIARIA)
+# ══════════════════════════════════════════════════════════════════════════════
+
+def volatilidad_universo(precios=None, modelo='garch', dir_cache=DIR_CACHE, fecha=None):
+    """
+    Volatilidad actual de todos los tickers, con nivel de riesgo y tamaño
+    de posición. Se calcula una vez por día (y por contenido de precios).
+
+    ENTRADA:
+        precios: DataFrame [fecha × ticker] (None = catalogo_precios.cargar_universo())
+        modelo: 'garch' o 'ewma'
+        dir_cache: carpeta de la caché diaria (None = sin caché)
+
+    RETORNA:
+        DataFrame indexado por ticker con vol_diaria, vol_anual,
+        vol_largo_plazo, riesgo, color_riesgo, tamano_posicion (y los
+        parámetros del GARCH)
+    """
+    if modelo not in ('garch', 'ewma'):
+        raise ValueError(f"Modelo desconocido: '{modelo}' (opciones: garch, ewma)")
+    if precios is None:
+        precios = cargar_universo()
+    rendimientos = rendimientos_log(precios)
+    suficientes = (rendimientos.count() >= MIN_OBSERVACIONES) & (rendimientos.std() > 0)
+    if not suficientes.all():
+        print(f"  ⚠️ Sin historia suficiente para volatilidad: "
+              f"{', '.join(map(str, precios.columns[~suficientes]))}")
+    precios = precios.loc[:, suficientes]
+    if precios.empty:
+        raise ValueError("No hay precios suficientes para estimar volatilidad")
+
+    fecha = fecha or datetime.now().strftime('%Y-%m-%d')
+    huella = huella_serie(precios.to_numpy(dtype=np.float64),
+                          precios.index.to_numpy(dtype='datetime64[ns]'),
+                          np.array(precios.columns, dtype=str))
+    ruta = os.path.join(dir_cache, f"volatilidad_{modelo}_{fecha}.csv") if dir_cache else None
+    if ruta is not None and os.path.exists(ruta):
+        cache = pd.read_csv(ruta, index_col='ticker')
+        if (cache['huella'] == huella).all():
+            return cache.drop(columns='huella')
+
+    if modelo == 'garch':
+        tabla, sigma = ajustar_garch(precios)
+        largo_plazo = np.sqrt(tabla['omega'] / (1 - tabla['persistencia']))
+    else:
+        sigma = volatilidad_ewma(precios)
+        tabla = pd.DataFrame(index=pd.Index(precios.columns, name='ticker'))
+        largo_plazo = rendimientos_log(precios).std()
+
+    tabla['vol_diaria'] = sigma.iloc[-1]
+    tabla['vol_anual'] = tabla['vol_diaria'] * np.sqrt(DIAS_ANIO)
+    tabla['vol_largo_plazo'] = largo_plazo * np.sqrt(DIAS_ANIO)
+    niveles = [nivel_riesgo(v) for v in tabla['vol_anual']]
+    tabla['riesgo'] = [n[0] for n in niveles]
+    tabla['color_riesgo'] = [n[1] for n in niveles]
+    tabla['tamano_posicion'] = [tamano_posicion(v) for v in tabla['vol_anual']]
+
+    if ruta is not None:
+        os.makedirs(dir_cache, exist_ok=True)
+        tabla.assign(huella=huella).to_csv(ruta)
+    return tabla
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# EJEMPLO DE USO
+# ══════════════════════════════════════════════════════════════════════════════
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    print("=" * 70)
+    print("VOLATILIDAD CONDICIONAL (EWMA / GARCH)")
+    print("=" * 70)
+
+    # Series GARCH simuladas con parámetros conocidos
+    rng = np.random.default_rng(0)
+    T, reales = 2500, {'WTI': (0.08, 0.90), 'XOM': (0.05, 0.93), 'CVX': (0.12, 0.80)}
+    precios = {}
+    for ticker, (a, b) in reales.items():
+        v_bar = 0.02 ** 2
+        var, r = v_bar, np.empty(T)
+        for t in range(T):
+            r[t] = np.sqrt(var) * rng.standard_normal()
+            var = v_bar * (1 - a - b) + a * r[t] ** 2 + b * var
+        precios[ticker] = 70 * np.exp(np.cumsum(r))
+    precios = pd.DataFrame(precios, index=pd.bdate_range('2015-01-01', periods=T))
+
+    inicio = time.perf_counter()
+    parametros, _ = ajustar_garch(precios)
+    print(f"\n  ✓ GARCH de {precios.shape[1]} tickers × {T} días en "
+          f"{time.perf_counter() - inicio:.2f} s (una sola pasada)")
+    for ticker, (a, b) in reales.items():
+        print(f"    {ticker}: α={parametros.loc[ticker, 'alpha']:.2f} (real {a:.2f}), "
+              f"β={parametros.loc[ticker, 'beta']:.3f} (real {b:.2f})")
+
+    dir_cache = tempfile.mkdtemp()
+    for intento in ('cálculo', 'caché'):
+        inicio = time.perf_counter()
+        tabla = volatilidad_universo(precios, dir_cache=dir_cache)
+        print(f"  ✓ Tabla del universo ({intento}): {time.perf_counter() - inicio:.3f} s")
+
+    columnas = ['vol_anual', 'vol_largo_plazo', 'riesgo', 'tamano_posicion']
+    print(f"\n{tabla[columnas].round(3).to_string()}")
+    print("=" * 70)